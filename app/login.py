@@ -6,11 +6,13 @@ This module handles user authentication and registration for DineMate.
 Dependencies:
 - streamlit: For UI rendering 📺.
 - db: For database operations 🗄️.
+- sessions: For ending the chat session on logout 🪪.
 - logger: For structured logging 📜.
 """
 
 import streamlit as st
 from scripts.db import Database
+from scripts.sessions import end_session
 from scripts.logger import get_logger
 from scripts.config import STATIC_CSS_PATH
 import time
@@ -151,6 +153,7 @@ def register() -> None:
 def logout() -> None:
     """🚪 Log out the user and clear session state."""
     logger.info({"username": st.session_state.get("username"), "message": "User logging out"})
+    end_session(st.session_state)
     st.session_state["authenticated"] = False
     st.session_state["username"] = None
     st.session_state["role"] = None
@@ -0,0 +1,120 @@
+"""
+# DineMate Chatbot Metrics 📈
+
+This module shows admins where chatbot turns spend their time: time to first token,
+turn latency, tool loops, latency / error rates per graph node, tool and database
+query, and how many messages the guardrail prefilter and fast-path router answered
+without an LLM call, since the app process started.
+
+Dependencies:
+- streamlit: For UI rendering 📺.
+- pandas: For data display 📊.
+- metrics: For the in-process metrics registry 📈.
+- guardrails: For guardrail prefilter / verdict cache counters 🛡️.
+- router: For fast-path router counters 🚦.
+- logger: For structured logging 📜.
+"""
+
+import streamlit as st, pandas as pd
+from typing import Dict, List, Optional
+from scripts.config import METRICS_HOST, METRICS_PORT
+from scripts.guardrails import get_guardrail_stats
+from scripts.metrics import get_metrics
+from scripts.router import router_stats
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+def _ms(seconds: Optional[float]) -> str:
+    return "–" if seconds is None else f"{seconds * 1000:,.0f} ms"
+
+def latency_table(rows: List[Dict], label: str, column: str) -> pd.DataFrame:
+    """📊 Latency summary rows as a display table.
+
+    Args:
+        rows (List[Dict]): Rows from `MetricsRegistry.summary()`.
+        label (str): Label holding the series name (e.g. "node").
+        column (str): Display name of that label.
+
+    Returns:
+        pd.DataFrame: One row per series, slowest p95 first.
+    """
+    rows = sorted(rows, key=lambda r: r["p95"] or 0, reverse=True)
+    return pd.DataFrame([{
+        column: row.get(label, "–"), "📞 Calls": row["count"], "❌ Errors": row["errors"],
+        "⚠ Error Rate": f"{row['error_rate']:.1%}", "⏱️ Mean": _ms(row["mean"]),
+        "p50": _ms(row["p50"]), "p95": _ms(row["p95"]), "p99": _ms(row["p99"]),
+    } for row in rows])
+
+def show_fast_paths() -> None:
+    """🚦 Messages the guardrail prefilter / verdict cache and the fast-path router answered without an LLM call."""
+    guardrail, router = get_guardrail_stats(), router_stats.as_dict()
+    st.write("### 🚦 Fast Paths")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("🛡️ Guardrail Checks", guardrail["messages"])
+    col2.metric("🛡️ Answered Locally", f"{guardrail['skipped_fraction']:.1%}",
+                help=f"Prefilter passes: {guardrail['prefilter_passes']}, verdict cache hits: {guardrail['cache_hits']}, "
+                     f"remote calls: {guardrail['remote_calls']} ({guardrail['remote_errors']} errors)")
+    col3.metric("🚦 Router Turns", router["turns"])
+    col4.metric("🚦 Handled by Router", f"{router['handled_fraction']:.1%}",
+                help=f"Handled: {router['handled']}, fell through to the chatbot: {router['fell_through']}, "
+                     f"avg {router['avg_handled_ms']} ms per handled turn")
+    if router["by_intent"]:
+        st.dataframe(pd.DataFrame([{"🚦 Intent": intent, "📞 Turns": count}
+                                   for intent, count in sorted(router["by_intent"].items(), key=lambda kv: -kv[1])]),
+                     width="stretch", hide_index=True)
+
+def show_metrics_page() -> None:
+    """📈 Admin panel for chatbot latency metrics."""
+    st.markdown(
+        "<div class='header'><h1>📈 Chatbot Metrics</h1><p style='color: #E8ECEF;'>⏱️ Where every chatbot turn spends its time</p></div>",
+        unsafe_allow_html=True
+    )
+
+    if st.session_state.get("role") != "admin":
+        st.warning("⚠ Only admins can view metrics.", icon="🚫")
+        logger.warning({"role": st.session_state.get("role"), "message": "Access denied"})
+        return
+
+    metrics = get_metrics()
+    turns = metrics.summary("dinemate_turn_seconds", "dinemate_turn_errors_total")
+    ttft = metrics.summary("dinemate_time_to_first_token_seconds")
+    loops = metrics.summary("dinemate_turn_tool_loops")
+    if not turns:
+        st.info("✅ No chatbot turns yet since the app started.")
+    else:
+        turn, first, loop = turns[0], (ttft or [{}])[0], (loops or [{}])[0]
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("💬 Turns", turn["count"])
+        col2.metric("⚡ First Token p50", _ms(first.get("p50")))
+        col3.metric("⚡ First Token p95", _ms(first.get("p95")))
+        col4.metric("⏱️ Turn p95", _ms(turn["p95"]))
+        col5.metric("🛠️ Tool Loops / Turn", f"{loop['mean']:.2f}" if loop.get("mean") is not None else "–",
+                    help=f"Turn error rate: {turn['error_rate']:.1%}")
+
+    for title, name, errors, label, column in (
+        ("### 🧩 Graph Nodes", "dinemate_node_seconds", "dinemate_node_errors_total", "node", "🧩 Node"),
+        ("### 🛠️ Tools", "dinemate_tool_seconds", "dinemate_tool_errors_total", "tool", "🛠️ Tool"),
+        ("### 🗄️ Database Queries", "dinemate_db_query_seconds", "dinemate_db_query_errors_total", "query", "🗄️ Query"),
+    ):
+        rows = metrics.summary(name, errors)
+        st.write(title)
+        if rows:
+            st.dataframe(latency_table(rows, label, column), width="stretch", hide_index=True)
+        else:
+            st.caption("No calls recorded yet.")
+
+    show_fast_paths()
+
+    st.divider()
+    text = metrics.render()
+    with st.expander("📄 Prometheus Text"):
+        if METRICS_PORT > 0:
+            st.caption(f"Also served at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        st.code(text, language="text")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("⬇️ Download Metrics", text, file_name="dinemate_metrics.txt", mime="text/plain", width="stretch")
+    with col2:
+        if st.button("🔄 Refresh", width="stretch"):
+            st.rerun()
@@ -179,54 +179,56 @@ def create_hourly_demand_chart(df):
     )
     return fig
 
-def create_spending_distribution_chart(df):
+def create_spending_distribution_chart(df, bin_width):
     """💰 Generate histogram for customer spending with enhanced styling.
 
     Args:
-        df: DataFrame with order data (total_price).
+        df: DataFrame with precomputed histogram bins (bin_start, bin_end, count).
+        bin_width: Width of each bin in dollars.
 
     Returns:
         plotly.graph_objects.Figure: Histogram.
     """
     logger.info({"message": "Generating spending distribution chart"})
-    fig = px.histogram(
-        df, x="total_price", nbins=20, title="💰 Customer Spending Trends",
-        labels={"total_price": "Order Value ($)", "count": "Number of Orders"},
-        color_discrete_sequence=[COLOR_PALETTE[2]]
-    )
+    fig = go.Figure(go.Bar(
+        x=(df["bin_start"] + df["bin_end"]) / 2, y=df["count"], width=bin_width,
+        customdata=df[["bin_start", "bin_end"]], marker_color=COLOR_PALETTE[2]
+    ))
     fig.update_layout(
         template="plotly_dark", 
+        xaxis_title="Order Value ($)", yaxis_title="Number of Orders",
         xaxis=dict(showgrid=False, tickfont=dict(size=14, color="#FFFFFF")),
         yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)", tickfont=dict(size=14, color="#FFFFFF")),
         hovermode="x unified", plot_bgcolor="#1F2937", paper_bgcolor="#1F2937",
-        margin=dict(l=60, r=30, t=80, b=60),
-        title=dict(font=dict(size=20, color="#FFFFFF"), x=0.5, xanchor="center")
+        margin=dict(l=60, r=30, t=80, b=60), bargap=0,
+        title=dict(text="💰 Customer Spending Trends", font=dict(size=20, color="#FFFFFF"), x=0.5, xanchor="center")
     )
-    fig.update_traces(hovertemplate="Order Value: $%{x:.2f}<br>Orders: %{y}")
+    fig.update_traces(hovertemplate="Order Value: $%{customdata[0]:.2f}–$%{customdata[1]:.2f}<br>Orders: %{y}<extra></extra>")
     return fig
 
-def create_spending_boxplot_chart(df):
+def create_spending_boxplot_chart(stats):
     """📦 Generate box plot for order values with enhanced styling.
 
     Args:
-        df: DataFrame with order data (total_price).
+        stats: Precomputed box statistics (q1, median, q3, mean, lowerfence, upperfence).
 
     Returns:
         plotly.graph_objects.Figure: Box plot.
     """
     logger.info({"message": "Generating spending boxplot chart"})
-    fig = px.box(
-        df, y="total_price", title="📦 Order Value Distribution",
-        labels={"total_price": "Order Value ($)"}, color_discrete_sequence=[COLOR_PALETTE[3]]
-    )
+    fig = go.Figure(go.Box(
+        name="Order Value ($)", q1=[stats["q1"]], median=[stats["median"]], q3=[stats["q3"]],
+        mean=[stats["mean"]], lowerfence=[stats["lowerfence"]], upperfence=[stats["upperfence"]],
+        boxpoints=False, marker_color=COLOR_PALETTE[3]
+    ))
     fig.update_layout(
         template="plotly_dark", 
+        yaxis_title="Order Value ($)",
         yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)", tickfont=dict(size=14, color="#FFFFFF")),
         hovermode="x unified", plot_bgcolor="#1F2937", paper_bgcolor="#1F2937",
         margin=dict(l=60, r=30, t=80, b=60),
-        title=dict(font=dict(size=20, color="#FFFFFF"), x=0.5, xanchor="center")
+        title=dict(text="📦 Order Value Distribution", font=dict(size=20, color="#FFFFFF"), x=0.5, xanchor="center")
     )
-    fig.update_traces(hovertemplate="Order Value: $%{y:.2f}")
     return fig
 
 def create_status_pie_chart(df):
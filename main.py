@@ -6,7 +6,9 @@ This module sets up the Streamlit UI for the DineMate food ordering chatbot with
 Dependencies:
 - streamlit: For UI rendering 📺.
 - scripts.utils: For chatbot and session handling 🛠️.
+- scripts.graph: For the shared chat graph 📈.
 - scripts.streaming: For real-time streaming responses 🌐.
+- scripts.metrics: For the local /metrics endpoint 📈.
 - app modules: For specific pages (home, kitchen, analysis, etc.) 📄.
 - time: For UI delays ⏳.
 """
@@ -14,8 +16,10 @@ Dependencies:
 import streamlit as st, time, traceback
 import scripts.utils as utils
 from scripts.config import STATIC_CSS_PATH
-from scripts.streaming import StreamHandler, stream_graph_updates
-from app import kitchen, update_prices, login, order_management, home, add_remove_items, track_order, analysis
+from scripts.graph import get_graph
+from scripts.streaming import render_stream, stream_graph_updates
+from scripts.metrics import start_metrics_server
+from app import kitchen, update_prices, login, order_management, home, add_remove_items, track_order, analysis, metrics
 from scripts.logger import get_logger
 
 logger = get_logger(__name__)
@@ -32,6 +36,16 @@ except FileNotFoundError:
     logger.error({"message": "styles.css not found"})
     st.error("⚠ CSS file not found. Please ensure static/styles.css exists.")
 
+# ✅ Build the shared chat graph once per process, before the first customer message
+try:
+    get_graph()
+except Exception as e:
+    # The first chat message retries the build and reports the error to the user
+    logger.error({"error": str(e), "error_type": type(e).__name__, "message": "Graph warm-up failed"})
+
+# ✅ Serve /metrics once per process (no-op on reruns, or when METRICS_PORT=0)
+start_metrics_server()
+
 # ✅ Initialize session state for authentication
 if "authenticated" not in st.session_state:
     st.session_state["authenticated"] = False
@@ -60,7 +74,8 @@ ROLE_PAGES = {
         {"label": "🛡️ Update Prices", "tooltip": "Manage menu prices"},
         {"label": "👨‍🍳 Kitchen Orders", "tooltip": "Handle kitchen tasks"},
         {"label": "➕ Add/Remove Items", "tooltip": "Update menu items"},
-        {"label": "📶 Analysis", "tooltip": "Explore business insights"}
+        {"label": "📶 Analysis", "tooltip": "Explore business insights"},
+        {"label": "📈 Metrics", "tooltip": "Monitor chatbot latency"}
     ],
     "kitchen_staff": [
         {"label": "🏠 Home", "tooltip": "View DineMate overview"},
@@ -125,7 +140,7 @@ elif page == "🍔 DineMate AI":
             with st.chat_message("assistant", avatar="🍔"):
                 try:
                     with st.spinner("🍴 Processing your order..."):
-                        response = st.write_stream(stream_graph_updates(user_query))
+                        response = render_stream(stream_graph_updates(user_query))
                         st.session_state.messages.append({"role": "assistant", "content": response})
                         utils.print_qa(chatbot_main, user_query, response)
                         logger.info({"user": st.session_state["username"], "response": response, "message": "Chatbot response generated"})
@@ -200,6 +215,9 @@ elif page == "📦 Track Order":
 elif page == "📶 Analysis":
     analysis.show_analysis_page()
 
+elif page == "📈 Metrics":
+    metrics.show_metrics_page()
+
 # ✅ Logout Button in Sidebar
 st.sidebar.divider()
 if st.sidebar.button("🚪 Logout", width="stretch"):
@@ -6,45 +6,88 @@ This module implements the chatbot node for the DineMate foodbot.
 ## Dependencies
 - `json`: For JSON handling.
 - `textwrap`: For formatting prompts.
+- `threading`: For guarding the compiled agent cache.
 - `utils`: For LLM configuration.
-- `tools`: For get_menu, save_order, and check_status tools.
+- `tools`: For the chatbot tool set.
+- `tokens`: For the compaction token budget.
+- `budget`: For token accounting and the prompt budget.
+- `response_cache`: For the menu version hash.
+- `tool_memo`: For the per-turn tool result memo.
+- `tracing`: For sampled spans around the chatbot and summarizer.
 - `state`: For state definition.
 - `logger`: For logging.
 """
 
-import json, textwrap
-from langsmith import traceable
+import json, textwrap, threading, time
+from functools import lru_cache
+from typing import Any, Dict, Sequence, Tuple
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.constants import TAG_NOSTREAM
 from scripts.state import State
 from scripts.logger import get_logger
 from scripts.utils import configure_llm
 from scripts.config import MODEL_NAME, DEFAULT_MODEL_NAME
 from scripts.prompt import FOODBOT_PROMPT, SUMMARIZE_PROMPT
 from langchain_core.messages import SystemMessage, HumanMessage, RemoveMessage
-from scripts.config import LANGSMITH_PROJECT, SUMMARY_MESSAGE_THRESHOLD, KEEP_LAST_MESSAGES
-from scripts.tools import (get_full_menu, get_prices_for_items, save_order, check_order_status, 
-                    cancel_order, modify_order, get_order_details, introduce_developer)
+from scripts.config import SUMMARY_MAX_TOKENS
+from scripts.tools import ALL_TOOLS, get_full_menu
+from scripts.tokens import compaction_cut, count_message_tokens, count_tokens
+from scripts.response_cache import menu_version
+from scripts.tool_memo import memoized_tool_call
+from scripts.budget import apply_prompt_budget, get_token_ledger, ledger_scope, usage_tokens
+from scripts.tracing import traced
 
 logger = get_logger(__name__)
 
+# ===================================  Compiled agent  ==================================================
+# The system prompt never changes at runtime, so dedent it once at import time
+SYSTEM_PROMPT = textwrap.dedent(FOODBOT_PROMPT)
+
+_compiled_agents: Dict[Tuple[str, Tuple[str, ...]], Tuple[Any, Runnable]] = {}
+_compiled_lock = threading.Lock()
+
+def compile_agent(model_name: str = DEFAULT_MODEL_NAME, tools: Sequence = ALL_TOOLS) -> Runnable:
+    """🔧 Return the chat model bound to `tools`, building it once per (model, tool set).
+
+    Binding converts every tool into its JSON schema, so doing it per turn is wasted work.
+    The bound runnable is stateless and safe to share across sessions. It is rebuilt when
+    the registry hands out a different client for the model (reloaded or replaced).
+    """
+    key, llm = (model_name, tuple(t.name for t in tools)), configure_llm(model_name)
+    with _compiled_lock:
+        client, runnable = _compiled_agents.get(key, (None, None))
+        if client is not llm:
+            start = time.perf_counter()
+            runnable = llm.bind_tools(list(tools))
+            _compiled_agents[key] = (llm, runnable)
+            logger.info({"model": model_name, "tools": len(tools), "ms": round((time.perf_counter() - start) * 1000, 2),
+                         "message": "🔧 Agent compiled"})
+        return runnable
+# ==================================================================================================
+
 # =================================== Summarize conversation  ======================================
-@traceable(run_type="chain", name="DineMate_ChatFlow", project_name=LANGSMITH_PROJECT)
-async def summarize_conversation(state: State):
-    """Summarize the conversation history to save tokens."""
+@traced("summarize_conversation")
+async def summarize_conversation(state: State, config: RunnableConfig = None):
+    """Summarize the conversation history to save tokens.
+
+    Once the history exceeds `HISTORY_TOKEN_BUDGET`, only the messages older than the
+    recent window are summarized (the earlier ones are already folded into the summary).
+    Runs in the background after a turn (see `memory.py`), not before the chatbot.
+    """
     existing_summary = state.get("summary", "")
 
-    # We summarize everything except the very last few messages
-    # (we'll keep last 4–6 verbatim anyway)
-    if len(state["messages"]) < SUMMARY_MESSAGE_THRESHOLD:
-        return state  # too short → no need
+    cut = compaction_cut(state["messages"])
+    if cut == 0:
+        return {}  # within budget → no need
 
-    # Take all messages except the last 4
-    messages_to_summarize = state["messages"][:-KEEP_LAST_MESSAGES]
+    # Only the delta since the last summary: older messages were removed when it was written
+    messages_to_summarize = state["messages"][:cut]
 
     # Build content string from messages
     content = "\n".join(
         f"{msg.type.upper()}: {msg.content}"
         for msg in messages_to_summarize
-        if hasattr(msg, "content") and msg.content.strip()
+        if isinstance(msg.content, str) and msg.content.strip()
     )
 
     # Fill the prompt with existing_summary and new content
@@ -53,21 +96,25 @@ async def summarize_conversation(state: State):
         conversation=content
     )
 
+    instruction = "Produce the updated bullet-point summary now."
+    if count_tokens(existing_summary) > SUMMARY_MAX_TOKENS:
+        # Keep the prompt bounded: let the summary be condensed instead of only appended to
+        instruction += f" The summary is too long: condense it to under {SUMMARY_MAX_TOKENS} tokens, keeping order IDs."
     prompt = [
         SystemMessage(content=filled_system_content),
-        HumanMessage(content="Produce the updated bullet-point summary now.")
+        HumanMessage(content=instruction)
     ]
 
     try:
-        llm = configure_llm(MODEL_NAME, force_reload=True)
-        summary_msg = await llm.ainvoke(prompt)
+        llm = configure_llm(MODEL_NAME)
+        # The summary is internal state; keep its tokens out of the chat stream
+        summary_msg = await llm.ainvoke(prompt, config={"tags": [TAG_NOSTREAM]})
         new_summary = summary_msg.content.strip()
+        get_token_ledger().record(*ledger_scope(state, config), "summarizer",
+                                  **usage_tokens(summary_msg, count_message_tokens(prompt)))
 
-        # Decide which old messages to remove. Keep last 4 messages + remove older ones
-        messages_to_remove = [
-            RemoveMessage(id=msg.id)
-            for msg in state["messages"][:-KEEP_LAST_MESSAGES]
-        ]
+        # Remove the summarized messages; the recent window stays verbatim
+        messages_to_remove = [RemoveMessage(id=msg.id) for msg in messages_to_summarize]
 
         logger.info(f"✅ Conversation summarized. New summary length: {len(new_summary)} chars")
 
@@ -82,34 +129,54 @@ async def summarize_conversation(state: State):
 # ==================================================================================================
 
 
-# ===================================  Dinemate Agent  ==================================================
-@traceable(run_type="chain", name="DineMate_ChatFlow", project_name=LANGSMITH_PROJECT)
-async def chatbot(state: State) -> State:
-    """Process user input and interact with the LLM (Async)."""
-    messages = state["messages"]
-    current_menu = state.get("menu", {})  # Check if menu is already cached
-    
-    system_prompt = textwrap.dedent(FOODBOT_PROMPT)
+# ===================================  Prompt layout  ==================================================
+# Most stable first, so consecutive turns share the longest possible prefix (provider prompt caching)
+SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+SUMMARY_HEADER = "=== Conversation summary so far ==="
 
-    if state.get("summary"):
-        system_prompt += f"\n\n=== Conversation summary so far ===\n{state['summary']}\n"
-    
-    llm = configure_llm(DEFAULT_MODEL_NAME)
-    llm_with_tools = llm.bind_tools(
-        [get_full_menu, get_prices_for_items, save_order, check_order_status,
-        cancel_order, modify_order, get_order_details, introduce_developer]
-    )
-    
-    messages = [SystemMessage(content=system_prompt)] + messages
-    
+@lru_cache(maxsize=16)
+def _menu_digest(items: Tuple[Tuple[str, float], ...]) -> str:
+    menu = dict(items)
+    lines = "\n".join(f"{item} ${price:.2f}" for item, price in items)
+    return f"Cached menu available (version {menu_version(menu)}):\n{lines}"
+
+def menu_digest(menu: Dict[str, float]) -> str:
+    """Compact, deterministic menu encoding (sorted "item $price" lines) that only changes with the menu."""
+    return _menu_digest(tuple(sorted(menu.items())))
+
+def build_chat_prompt(state: State) -> list:
+    """Chatbot prompt in a fixed order: static system prompt, menu digest, summary, messages."""
+    prompt = [SYSTEM_MESSAGE]
     # Pass cached menu to LLM if available, to avoid unnecessary tool calls
-    if current_menu:
-        messages.append({
-            "role": "assistant", 
-            "content": f"Cached menu available: {json.dumps(current_menu, separators=(',', ':'))}"
-            })
-    
-    response = await llm_with_tools.ainvoke(messages)
+    if state.get("menu"):
+        prompt.append(SystemMessage(content=menu_digest(state["menu"])))
+    if state.get("summary"):
+        prompt.append(SystemMessage(content=f"{SUMMARY_HEADER}\n{state['summary']}"))
+    return prompt + list(state["messages"])
+# ==================================================================================================
+
+
+# ===================================  Dinemate Agent  ==================================================
+@traced("chatbot")
+async def chatbot(state: State, config: RunnableConfig = None) -> State:
+    """Process user input and interact with the LLM (Async).
+
+    `config` is forwarded to the model call, so callers can replace its callbacks
+    (e.g. to buffer streamed tokens).
+    """
+    llm_with_tools = compile_agent(DEFAULT_MODEL_NAME)
+
+    messages = build_chat_prompt(state)
+
+    # Trim stale tool outputs / the menu dump if the prompt exceeds PROMPT_TOKEN_BUDGET
+    messages, trimmed = apply_prompt_budget(messages)
+    prompt_tokens = count_message_tokens(messages)
+
+    response = await llm_with_tools.ainvoke(messages, config=config)
+
+    ledger, (thread_id, turn_id) = get_token_ledger(), ledger_scope(state, config)
+    ledger.record(thread_id, turn_id, "chatbot", trimmed=trimmed, **usage_tokens(response, prompt_tokens))
+    ledger.record_tool_outputs(thread_id, turn_id, state["messages"])
     
     logger.info(f"💬 LLM response: {response.content}")
     
@@ -119,7 +186,8 @@ async def chatbot(state: State) -> State:
         logger.info(f"Tool calls: {response.tool_calls}")
         for tool_call in response.tool_calls:
             if tool_call["name"] == "get_full_menu":
-                menu_json = await get_full_menu.ainvoke({})
+                # Memoized for the turn, so the tools node reuses this result instead of refetching
+                menu_json = await memoized_tool_call(get_full_menu, tool_call["args"], (thread_id, turn_id))
                 try:
                     new_menu = json.loads(menu_json)
                     logger.info("Cached new menu in state")
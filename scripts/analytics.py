@@ -0,0 +1,551 @@
+"""
+# DineMate Analytics Aggregations 🧮
+
+This module computes the analytics dashboard aggregates from the orders table.
+
+Two backends produce identical results:
+- `pandas`: reads the filtered orders into a DataFrame and aggregates in-process.
+- `duckdb`: attaches `dinemate.db` read-only in an embedded DuckDB instance and runs
+  the aggregations there, in parallel across cores, without loading rows into pandas.
+
+The backend is selected with `ANALYTICS_BACKEND`; `duckdb` falls back to `pandas`
+when the package is not installed.
+
+## Dependencies
+- `pandas`: For the in-process backend 📊.
+- `duckdb` (optional): For the columnar backend 🦆.
+- `db`: For SQLite access and the OrderFilter spec 🗄️.
+- `logger`: For structured logging 📜.
+"""
+
+import bisect, datetime, json, math
+import pandas as pd
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Optional
+from scripts.config import ANALYTICS_BACKEND, DB_PATH, SPENDING_BIN_WIDTH
+from scripts.db import Database, OrderFilter
+from scripts.logger import get_logger
+
+try:
+    import duckdb
+except ImportError:  # optional dependency
+    duckdb = None
+
+logger = get_logger(__name__)
+
+# =================================== Spending summary  ============================================
+def histogram_frame(bins: Dict[int, int], bin_width: float) -> pd.DataFrame:
+    """Turn {bin_index: count} into (bin_start, bin_end, count) rows with empty bins filled in."""
+    if not bins:
+        return pd.DataFrame(columns=["bin_start", "bin_end", "count"])
+    first, last = min(bins), max(bins)
+    rows = [
+        (index * bin_width, (index + 1) * bin_width, int(bins.get(index, 0)))
+        for index in range(first, last + 1)
+    ]
+    return pd.DataFrame(rows, columns=["bin_start", "bin_end", "count"])
+
+class SpendingSummary:
+    """💰 Server-side summary of order values for the spending charts.
+
+    Keeps a fixed-width histogram plus a sorted copy of every value, so exact
+    quantiles (identical to pandas and DuckDB) can be read without sending the
+    orders to the browser. What reaches the charts is constant-size; the sorted
+    copy itself grows by one float per order. Orders can be added and removed as
+    they change instead of rebuilding the summary.
+    """
+
+    def __init__(self, bin_width: float = SPENDING_BIN_WIDTH):
+        self.bin_width = float(bin_width)
+        self.bins: Counter = Counter()
+        self.total = 0.0
+        self._values: list = []
+
+    @property
+    def count(self) -> int:
+        return len(self._values)
+
+    def add(self, value: float) -> None:
+        """Add one order value to the histogram and quantile summary."""
+        value = float(value)
+        if math.isnan(value):
+            return
+        bisect.insort(self._values, value)
+        self.bins[math.floor(value / self.bin_width)] += 1
+        self.total += value
+
+    def remove(self, value: float) -> None:
+        """Remove one previously added order value (e.g. an order that changed status)."""
+        value = float(value)
+        index = bisect.bisect_left(self._values, value)
+        if index == len(self._values) or self._values[index] != value:
+            return
+        self._values.pop(index)
+        bin_index = math.floor(value / self.bin_width)
+        self.bins[bin_index] -= 1
+        if self.bins[bin_index] <= 0:
+            del self.bins[bin_index]
+        self.total -= value
+
+    def update(self, values: Iterable[float]) -> "SpendingSummary":
+        """Add a batch of order values."""
+        for value in values:
+            self.add(value)
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Exact quantile with linear interpolation (same as pandas' default)."""
+        if not self._values:
+            return float("nan")
+        position = (len(self._values) - 1) * q
+        lower, upper = math.floor(position), math.ceil(position)
+        fraction = position - lower
+        return self._values[lower] + (self._values[upper] - self._values[lower]) * fraction
+
+    def histogram(self) -> pd.DataFrame:
+        """Histogram bins (bin_start, bin_end, count), with empty bins filled in."""
+        return histogram_frame(self.bins, self.bin_width)
+
+    def box_stats(self) -> Dict[str, float]:
+        """Precomputed box plot statistics using Tukey's 1.5 × IQR fences."""
+        if not self._values:
+            return {}
+        q1, median, q3 = self.quantile(0.25), self.quantile(0.5), self.quantile(0.75)
+        iqr = q3 - q1
+        # Fences snap to the most extreme values still inside 1.5 × IQR, as Plotly does
+        low_index = bisect.bisect_left(self._values, q1 - 1.5 * iqr)
+        high_index = bisect.bisect_right(self._values, q3 + 1.5 * iqr) - 1
+        return {
+            "min": self._values[0],
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "max": self._values[-1],
+            "mean": self.total / len(self._values),
+            "lowerfence": self._values[low_index],
+            "upperfence": self._values[high_index],
+        }
+# ==================================================================================================
+
+
+# =================================== Shared helpers  ==============================================
+def _month_dates(df: pd.DataFrame) -> pd.Series:
+    return pd.to_datetime(df[["year", "month"]].assign(day=1))
+
+def _sort_counts(df: pd.DataFrame, value: str, key: str) -> pd.DataFrame:
+    """Sort by value (desc) then key (asc) so ties order the same on every backend."""
+    return df.sort_values(by=[value, key], ascending=[False, True]).reset_index(drop=True)
+
+def _item_revenue(product_counts: pd.DataFrame, menu: Dict[str, float]) -> pd.DataFrame:
+    menu_dict = {name.lower(): float(price) for name, price in (menu or {}).items()}
+    item_revenue = product_counts.rename(columns={"Total Orders": "Quantity"}).copy()
+    item_revenue["Total Revenue"] = [
+        quantity * menu_dict.get(product.lower(), 0)
+        for product, quantity in zip(item_revenue["Product"], item_revenue["Quantity"])
+    ]
+    return _sort_counts(item_revenue, "Total Revenue", "Product")
+
+def _summary(total_revenue: float, total_orders: int, canceled: int) -> Dict[str, float]:
+    return {
+        "total_revenue": float(total_revenue or 0.0),
+        "total_orders": int(total_orders),
+        "avg_order_value": float(total_revenue) / total_orders if total_orders else 0.0,
+        "cancellation_rate": canceled / total_orders if total_orders else 0.0,
+    }
+# ==================================================================================================
+
+
+# =================================== pandas backend  ==============================================
+def aggregate_frame(df: pd.DataFrame, menu: Optional[Dict[str, float]] = None,
+                    bin_width: float = SPENDING_BIN_WIDTH) -> Dict[str, object]:
+    """📊 Compute every dashboard aggregate from a (filtered) orders DataFrame.
+
+    Args:
+        df: Orders with id, items, total_price, status, date, time columns.
+        menu: Item name → price, used for revenue by item.
+        bin_width: Spending histogram bin width.
+
+    Returns:
+        Dict of aggregate DataFrames plus `summary` and `spending` dicts.
+    """
+    df = df.copy()
+    dates = pd.to_datetime(df["date"])
+    df["year"], df["month"] = dates.dt.year, dates.dt.month
+
+    monthly = df.groupby(["year", "month"])["total_price"]
+    monthly_revenue = monthly.sum().reset_index()
+    monthly_revenue["date"] = _month_dates(monthly_revenue)
+    aov = monthly.mean().reset_index().rename(columns={"total_price": "avg_order_value"})
+    aov["date"] = _month_dates(aov)
+
+    yearly_revenue = df.groupby("year")["total_price"].sum().reset_index()
+
+    status_counts = df["status"].value_counts().rename_axis("status").reset_index(name="count")
+    status_counts = _sort_counts(status_counts, "count", "status")
+
+    canceled = df[df["status"] == "Canceled"]
+    cancellation_trends = canceled.groupby(["year", "month"])["id"].count().reset_index(name="count")
+    cancellation_trends["date"] = _month_dates(cancellation_trends)
+
+    items = Counter()
+    for order in df["items"]:
+        try:
+            items.update({k: float(v) for k, v in json.loads(order.replace("'", "\"")).items()})
+        except (json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+            logger.warning({"error": str(e), "order": order})
+    product_counts = _sort_counts(
+        pd.DataFrame(list(items.items()), columns=["Product", "Total Orders"]), "Total Orders", "Product"
+    )
+
+    hours = pd.to_datetime(df["time"], format="%I:%M:%S %p").dt.hour
+    hourly_demand = df.assign(hour=hours).groupby("hour")["id"].count().reset_index()
+    hourly_demand.columns = ["Hour", "Total Orders"]
+
+    spending = SpendingSummary(bin_width).update(df["total_price"])
+    return {
+        "summary": _summary(df["total_price"].sum(), len(df), len(canceled)),
+        "monthly_revenue": monthly_revenue,
+        "yearly_revenue": yearly_revenue,
+        "status_counts": status_counts,
+        "cancellation_trends": cancellation_trends,
+        "product_counts": product_counts,
+        "item_revenue": _item_revenue(product_counts, menu),
+        "hourly_demand": hourly_demand,
+        "aov": aov,
+        "spending": {"histogram": spending.histogram(), "box": spending.box_stats(), "bin_width": spending.bin_width},
+    }
+
+def aggregate_pandas(order_filter: OrderFilter, menu: Optional[Dict[str, float]] = None,
+                     db_path: str = DB_PATH, bin_width: float = SPENDING_BIN_WIDTH) -> Optional[Dict[str, object]]:
+    """Aggregate with pandas after reading the filtered orders from SQLite."""
+    db = Database(db_path)
+    try:
+        df = db.fetch_order_data(order_filter=order_filter)
+    finally:
+        db.close_connection()
+    if df.empty:
+        return None
+    return aggregate_frame(df, menu, bin_width)
+# ==================================================================================================
+
+
+# =================================== DuckDB backend  ==============================================
+_DUCKDB_ITEMS_CLAUSE = "list_has_any(list_transform(json_keys(replace(items, '''', '\"')), k -> lower(k)), {values})"
+
+def _duckdb_where(order_filter: OrderFilter):
+    """Reuse OrderFilter's SQL, swapping SQLite's json_each for DuckDB's JSON functions."""
+    where, params = OrderFilter(
+        statuses=order_filter.statuses, years=order_filter.years,
+        start_date=order_filter.start_date, end_date=order_filter.end_date,
+    ).to_sql()
+    if order_filter.items:
+        values = "[" + ", ".join("?" for _ in order_filter.items) + "]"
+        clause = _DUCKDB_ITEMS_CLAUSE.format(values=values)
+        where = f"{where} AND {clause}" if where else f" WHERE {clause}"
+        params = params + [item.lower() for item in order_filter.items]
+    return where, params
+
+_SNAPSHOT_COLUMNS = """
+    id, items, CAST(total_price AS DOUBLE) AS total_price, status, date, time,
+    CAST(substr(date, 1, 4) AS INTEGER) AS year,
+    CAST(substr(date, 6, 2) AS INTEGER) AS month
+"""
+
+def _attach_statement(db_path) -> str:
+    """`ATTACH` takes no bound parameters, so the path is quoted as an SQL string literal."""
+    path = str(db_path).replace("'", "''")
+    return f"ATTACH '{path}' AS dm (TYPE SQLITE, READ_ONLY)"
+
+def _load_orders_snapshot(con, order_filter: OrderFilter, db_path: str) -> None:
+    """Materialize the filtered orders as DuckDB temp table `o`.
+
+    Prefers attaching the SQLite file through DuckDB's sqlite extension. When the
+    extension can't be loaded (e.g. offline hosts that can't download it), the
+    filtered rows are read with sqlite3 and registered as the snapshot instead.
+    """
+    try:
+        con.execute(_attach_statement(db_path))
+    except duckdb.Error as e:
+        logger.warning({"error": str(e), "message": "DuckDB sqlite extension unavailable, loading snapshot via sqlite3"})
+        db = Database(db_path)
+        try:
+            orders = db.fetch_order_data(order_filter=order_filter)
+        finally:
+            db.close_connection()
+        con.register("orders_snapshot", orders)
+        con.execute(f"CREATE TEMP TABLE o AS SELECT {_SNAPSHOT_COLUMNS} FROM orders_snapshot")
+        con.unregister("orders_snapshot")
+        return
+
+    where, params = _duckdb_where(order_filter)
+    con.execute(f"CREATE TEMP TABLE o AS SELECT {_SNAPSHOT_COLUMNS} FROM dm.orders{where}", params)
+
+def aggregate_duckdb(order_filter: OrderFilter, menu: Optional[Dict[str, float]] = None,
+                     db_path: str = DB_PATH, bin_width: float = SPENDING_BIN_WIDTH) -> Optional[Dict[str, object]]:
+    """🦆 Aggregate inside an embedded DuckDB that attaches the SQLite file read-only.
+
+    The filtered rows are copied once into a DuckDB temp table (a columnar snapshot)
+    and every aggregate runs there using DuckDB's multi-threaded executor.
+    """
+    con = duckdb.connect()
+    try:
+        _load_orders_snapshot(con, order_filter, db_path)
+        total_orders, total_revenue, canceled = con.execute(
+            "SELECT count(*), sum(total_price), count(*) FILTER (WHERE status = 'Canceled') FROM o"
+        ).fetchone()
+        if not total_orders:
+            return None
+
+        monthly = con.execute(
+            "SELECT year, month, sum(total_price) AS total_price, avg(total_price) AS avg_order_value "
+            "FROM o GROUP BY year, month ORDER BY year, month"
+        ).df()
+        monthly_revenue = monthly[["year", "month", "total_price"]].copy()
+        monthly_revenue["date"] = _month_dates(monthly_revenue)
+        aov = monthly[["year", "month", "avg_order_value"]].copy()
+        aov["date"] = _month_dates(aov)
+
+        yearly_revenue = con.execute(
+            "SELECT year, sum(total_price) AS total_price FROM o GROUP BY year ORDER BY year"
+        ).df()
+        status_counts = _sort_counts(
+            con.execute("SELECT status, count(*) AS count FROM o GROUP BY status").df(), "count", "status"
+        )
+        cancellation_trends = con.execute(
+            "SELECT year, month, count(id) AS count FROM o WHERE status = 'Canceled' "
+            "GROUP BY year, month ORDER BY year, month"
+        ).df()
+        cancellation_trends["date"] = _month_dates(cancellation_trends)
+
+        product_counts = _sort_counts(con.execute(
+            """
+            SELECT k AS "Product", sum(CAST(json_extract_string(j, '$."' || k || '"') AS DOUBLE)) AS "Total Orders"
+            FROM (SELECT j, unnest(json_keys(j)) AS k FROM (SELECT replace(items, '''', '"') AS j FROM o))
+            GROUP BY k
+            """
+        ).df(), "Total Orders", "Product")
+
+        hourly_demand = con.execute(
+            "SELECT hour(strptime(time, '%I:%M:%S %p')) AS \"Hour\", count(id) AS \"Total Orders\" "
+            "FROM o GROUP BY 1 ORDER BY 1"
+        ).df()
+
+        bins = dict(con.execute(
+            "SELECT CAST(floor(total_price / ?) AS BIGINT), count(*) FROM o GROUP BY 1", [bin_width]
+        ).fetchall())
+        q1, median, q3, low, high, mean = con.execute(
+            "SELECT quantile_cont(total_price, 0.25), quantile_cont(total_price, 0.5), "
+            "quantile_cont(total_price, 0.75), min(total_price), max(total_price), avg(total_price) FROM o"
+        ).fetchone()
+        iqr = q3 - q1
+        lowerfence, upperfence = con.execute(
+            "SELECT min(total_price) FILTER (WHERE total_price >= ?), max(total_price) FILTER (WHERE total_price <= ?) FROM o",
+            [q1 - 1.5 * iqr, q3 + 1.5 * iqr],
+        ).fetchone()
+        box = {"min": low, "q1": q1, "median": median, "q3": q3, "max": high,
+               "mean": mean, "lowerfence": lowerfence, "upperfence": upperfence}
+
+        return {
+            "summary": _summary(total_revenue, total_orders, canceled),
+            "monthly_revenue": monthly_revenue,
+            "yearly_revenue": yearly_revenue,
+            "status_counts": status_counts,
+            "cancellation_trends": cancellation_trends,
+            "product_counts": product_counts,
+            "item_revenue": _item_revenue(product_counts, menu),
+            "hourly_demand": hourly_demand,
+            "aov": aov,
+            "spending": {"histogram": histogram_frame(bins, bin_width), "box": box, "bin_width": bin_width},
+        }
+    finally:
+        con.close()
+# ==================================================================================================
+
+
+# =================================== Incremental aggregates  =======================================
+def _parse_items(items: str) -> Dict[str, float]:
+    try:
+        return {k: float(v) for k, v in json.loads(items.replace("'", "\"")).items()}
+    except (json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+        logger.warning({"error": str(e), "order": items})
+        return {}
+
+class OrderAggregates:
+    """➕ Running dashboard aggregates that accept single-order additions and removals.
+
+    Produces the same payload as `aggregate_frame` without rescanning every order.
+    Groups are dropped once their count reaches zero, so the output matches a rebuild.
+    """
+
+    def __init__(self, bin_width: float = SPENDING_BIN_WIDTH):
+        self.revenue_by_month: Dict[tuple, float] = defaultdict(float)
+        self.orders_by_month: Counter = Counter()
+        self.canceled_by_month: Counter = Counter()
+        self.revenue_by_year: Dict[int, float] = defaultdict(float)
+        self.orders_by_year: Counter = Counter()
+        self.status_counts: Counter = Counter()
+        self.product_totals: Dict[str, float] = defaultdict(float)
+        self.product_orders: Counter = Counter()
+        self.hourly: Counter = Counter()
+        self.spending = SpendingSummary(bin_width)
+        self.total_revenue = 0.0
+        self.total_orders = 0
+        self.canceled = 0
+
+    def _apply(self, row: Dict, sign: int) -> None:
+        year, month = int(row["date"][:4]), int(row["date"][5:7])
+        hour = datetime.datetime.strptime(row["time"], "%I:%M:%S %p").hour
+        price = float(row["total_price"])
+        canceled = row["status"] == "Canceled"
+
+        self.revenue_by_month[(year, month)] += sign * price
+        self.revenue_by_year[year] += sign * price
+        self.total_revenue += sign * price
+        self.total_orders += sign
+        self.canceled += sign * canceled
+        for counter, key in ((self.orders_by_month, (year, month)), (self.orders_by_year, year),
+                             (self.status_counts, row["status"]), (self.hourly, hour)):
+            counter[key] += sign
+        if canceled:
+            self.canceled_by_month[(year, month)] += sign
+        for product, quantity in _parse_items(row["items"]).items():
+            self.product_totals[product] += sign * quantity
+            self.product_orders[product] += sign
+        if sign > 0:
+            self.spending.add(price)
+        else:
+            self.spending.remove(price)
+
+    def add(self, row: Dict) -> None:
+        self._apply(row, +1)
+
+    def remove(self, row: Dict) -> None:
+        self._apply(row, -1)
+
+    def to_payload(self, menu: Optional[Dict[str, float]] = None) -> Optional[Dict[str, object]]:
+        """Render the aggregates in the `aggregate_frame` payload shape (None if empty)."""
+        if self.total_orders <= 0:
+            return None
+        months = sorted(k for k, n in self.orders_by_month.items() if n > 0)
+        monthly_revenue = pd.DataFrame(
+            [(y, m, self.revenue_by_month[(y, m)]) for y, m in months], columns=["year", "month", "total_price"]
+        )
+        monthly_revenue["date"] = _month_dates(monthly_revenue)
+        aov = pd.DataFrame(
+            [(y, m, self.revenue_by_month[(y, m)] / self.orders_by_month[(y, m)]) for y, m in months],
+            columns=["year", "month", "avg_order_value"],
+        )
+        aov["date"] = _month_dates(aov)
+        yearly_revenue = pd.DataFrame(
+            [(y, self.revenue_by_year[y]) for y in sorted(k for k, n in self.orders_by_year.items() if n > 0)],
+            columns=["year", "total_price"],
+        )
+        status_counts = _sort_counts(pd.DataFrame(
+            [(k, n) for k, n in self.status_counts.items() if n > 0], columns=["status", "count"]
+        ), "count", "status")
+        cancellation_trends = pd.DataFrame(
+            [(y, m, n) for (y, m), n in sorted(self.canceled_by_month.items()) if n > 0], columns=["year", "month", "count"]
+        )
+        cancellation_trends["date"] = _month_dates(cancellation_trends)
+        product_counts = _sort_counts(pd.DataFrame(
+            [(k, self.product_totals[k]) for k, n in self.product_orders.items() if n > 0], columns=["Product", "Total Orders"]
+        ), "Total Orders", "Product")
+        hourly_demand = pd.DataFrame(
+            sorted((h, n) for h, n in self.hourly.items() if n > 0), columns=["Hour", "Total Orders"]
+        )
+        return {
+            "summary": _summary(self.total_revenue, self.total_orders, self.canceled),
+            "monthly_revenue": monthly_revenue,
+            "yearly_revenue": yearly_revenue,
+            "status_counts": status_counts,
+            "cancellation_trends": cancellation_trends,
+            "product_counts": product_counts,
+            "item_revenue": _item_revenue(product_counts, menu),
+            "hourly_demand": hourly_demand,
+            "aov": aov,
+            "spending": {"histogram": self.spending.histogram(), "box": self.spending.box_stats(), "bin_width": self.spending.bin_width},
+        }
+
+class IncrementalOrderFrame:
+    """🔁 Cached, filtered order rows kept current by applying deltas.
+
+    Each refresh reads the (id, status) index, then fetches only rows that were
+    appended since `last_seen_id`, whose status changed, or that are still open
+    (Pending/Preparing orders can have their items modified). Changed rows are
+    removed from and re-added to the running aggregates. Rows are only read up to the
+    newest ID in the index, so an order inserted between the two reads is picked up
+    (with its status) on the next refresh.
+    """
+
+    OPEN_STATUSES = {"Pending", "Preparing"}
+
+    def __init__(self, order_filter: OrderFilter, bin_width: float = SPENDING_BIN_WIDTH):
+        self.order_filter = order_filter
+        self.bin_width = bin_width
+        self.rows: Dict[int, Dict] = {}
+        self.statuses: Dict[int, str] = {}
+        self.last_seen_id: Optional[int] = None
+        self.aggregates = OrderAggregates(bin_width)
+
+    def refresh(self, db: Database) -> int:
+        """Apply the changes since the last refresh; returns the number of rows touched."""
+        status_index = db.fetch_order_status_index()
+        max_id = max(status_index, default=self.last_seen_id or 0)
+        if self.last_seen_id is None:
+            fresh = db.fetch_order_rows(self.order_filter, after_id=0, max_id=max_id)
+            recheck = set()
+        else:
+            changed = {i for i, status in status_index.items() if i <= self.last_seen_id and self.statuses.get(i) != status}
+            still_open = {i for i, row in self.rows.items() if row["status"] in self.OPEN_STATUSES}
+            recheck = changed | still_open | (set(self.rows) - set(status_index))
+            fresh = db.fetch_order_rows(self.order_filter, after_id=self.last_seen_id, ids=recheck & set(status_index),
+                                        max_id=max_id)
+
+        fresh_by_id = {row["id"]: row for row in fresh}
+        touched = 0
+        for order_id in recheck:
+            old = self.rows.get(order_id)
+            if old is not None and fresh_by_id.get(order_id) != old:
+                self.aggregates.remove(self.rows.pop(order_id))
+                touched += 1
+        for order_id, row in fresh_by_id.items():
+            if order_id not in self.rows:
+                self.rows[order_id] = row
+                self.aggregates.add(row)
+                touched += 1
+
+        self.statuses = status_index
+        self.last_seen_id = max_id
+        return touched
+
+    def frame(self) -> pd.DataFrame:
+        """The cached rows as an orders DataFrame (ordered by ID)."""
+        return pd.DataFrame(
+            [self.rows[i] for i in sorted(self.rows)], columns=["id", "items", "total_price", "status", "date", "time"]
+        )
+
+    def payload(self, menu: Optional[Dict[str, float]] = None) -> Optional[Dict[str, object]]:
+        return self.aggregates.to_payload(menu)
+# ==================================================================================================
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Return the usable backend name, falling back to pandas when DuckDB is missing."""
+    backend = (backend or ANALYTICS_BACKEND).lower()
+    if backend == "duckdb" and duckdb is None:
+        logger.warning({"message": "duckdb not installed, using pandas analytics backend"})
+        return "pandas"
+    return backend if backend in ("pandas", "duckdb") else "pandas"
+
+def compute_dashboard_aggregates(order_filter: OrderFilter, menu: Optional[Dict[str, float]] = None,
+                                 backend: Optional[str] = None, db_path: str = DB_PATH) -> Optional[Dict[str, object]]:
+    """🧮 Compute the dashboard aggregates with the configured backend.
+
+    Returns:
+        Aggregates dict, or None when the filter matches no orders.
+    """
+    backend = resolve_backend(backend)
+    logger.info({"backend": backend, "filter": str(order_filter), "message": "Computing dashboard aggregates"})
+    if backend == "duckdb":
+        return aggregate_duckdb(order_filter, menu, db_path)
+    return aggregate_pandas(order_filter, menu, db_path)
@@ -0,0 +1,153 @@
+"""
+# DineMate Analytics Worker 🧵
+
+This module runs dashboard aggregation on a background thread so Streamlit reruns
+never compute analytics themselves.
+
+The worker polls SQLite's `PRAGMA data_version` (which changes whenever another
+connection commits) and recomputes the payload for every filter an admin has
+recently viewed, once per data change. With the pandas backend each filter keeps
+an `IncrementalOrderFrame`, so a refresh only reads appended or changed orders.
+Pages read the latest published payload from an in-process store, so dashboard
+CPU cost does not grow with the number of open admin tabs.
+
+## Dependencies
+- `threading`: For the worker thread and the shared store 🧵.
+- `sqlite3`: For cheap change detection 🗄️.
+- `analytics`: For the aggregation backends 🧮.
+- `db`: For filter options and indexes 🗄️.
+- `logger`: For logging 📜.
+"""
+
+import sqlite3, threading, time
+from typing import Dict, List, Optional, Tuple
+from scripts.analytics import IncrementalOrderFrame, compute_dashboard_aggregates, resolve_backend
+from scripts.config import DB_PATH, ANALYTICS_POLL_SECONDS, ANALYTICS_FILTER_IDLE_SECONDS
+from scripts.db import Database, OrderFilter
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+class AnalyticsWorker:
+    """🧵 Background thread that publishes dashboard payloads per filter and data version."""
+
+    def __init__(self, db_path: str = DB_PATH, poll_seconds: float = ANALYTICS_POLL_SECONDS,
+                 idle_seconds: float = ANALYTICS_FILTER_IDLE_SECONDS):
+        self.db_path = db_path
+        self.poll_seconds = poll_seconds
+        self.idle_seconds = idle_seconds
+        self._published = threading.Condition()
+        self._wake = threading.Event()
+        self._entries: Dict[OrderFilter, Dict[str, object]] = {}
+        self._frames: Dict[OrderFilter, IncrementalOrderFrame] = {}
+        self._requested: Dict[OrderFilter, float] = {}
+        self._options: Tuple[List[str], List[int]] = ([], [])
+        self._version: Optional[int] = None
+        self._thread = threading.Thread(target=self._run, name="analytics-worker", daemon=True)
+        self.stats = {"computations": 0, "reads": 0, "last_compute_seconds": 0.0}
+
+    def start(self) -> "AnalyticsWorker":
+        if not self._thread.is_alive():
+            self._thread.start()
+            logger.info("🧵 Analytics worker started")
+        return self
+
+    def get(self, order_filter: OrderFilter, timeout: float = 0.0) -> Optional[Dict[str, object]]:
+        """Return the latest entry for `order_filter` ({payload, version, computed_at}).
+
+        The filter is registered for background refresh. If nothing has been computed
+        for it yet, waits up to `timeout` seconds and returns None if still not ready.
+        An entry's `payload` is None when the filter matches no orders.
+        """
+        deadline = time.monotonic() + timeout
+        with self._published:
+            self._requested[order_filter] = time.monotonic()
+            self.stats["reads"] += 1
+            entry = self._entries.get(order_filter)
+            if entry is None:
+                self._wake.set()
+                while entry is None and (remaining := deadline - time.monotonic()) > 0:
+                    self._published.wait(remaining)
+                    entry = self._entries.get(order_filter)
+            return entry
+
+    def filter_options(self, timeout: float = 0.0) -> Tuple[List[str], List[int]]:
+        """Statuses and years available in the orders table, as of the last data change.
+
+        Waits up to `timeout` seconds for the first refresh when the worker just started.
+        """
+        with self._published:
+            self._published.wait_for(lambda: self._version is not None, timeout)
+            return self._options
+
+    def _data_version(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _run(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        db = Database(self.db_path)
+        db.ensure_order_indexes()
+        db.close_connection()
+        while True:
+            try:
+                self._refresh(self._data_version(conn))
+            except Exception as e:
+                logger.error({"error": str(e), "message": "❌ Analytics worker refresh failed"})
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def _refresh(self, version: int) -> None:
+        changed = version != self._version
+        now = time.monotonic()
+        with self._published:
+            for order_filter, last_read in list(self._requested.items()):
+                if now - last_read > self.idle_seconds:
+                    # Nobody is looking at this filter any more; stop refreshing it
+                    del self._requested[order_filter]
+                    self._entries.pop(order_filter, None)
+                    self._frames.pop(order_filter, None)
+            pending = [f for f in self._requested if changed or f not in self._entries]
+        if not changed and not pending:
+            return
+
+        incremental = resolve_backend() == "pandas"
+        db = Database(self.db_path)
+        try:
+            menu = db.load_menu()
+            options = (db.fetch_order_statuses(), db.fetch_order_years()) if changed else None
+            for order_filter in pending:
+                start = time.perf_counter()
+                if incremental:
+                    frame = self._frames.get(order_filter)
+                    if frame is None:
+                        frame = self._frames[order_filter] = IncrementalOrderFrame(order_filter)
+                    frame.refresh(db)
+                    payload = frame.payload(menu)
+                else:
+                    payload = compute_dashboard_aggregates(order_filter, menu, db_path=self.db_path)
+                elapsed = time.perf_counter() - start
+                with self._published:
+                    self._entries[order_filter] = {"payload": payload, "version": version, "computed_at": time.time()}
+                    self.stats["computations"] += 1
+                    self.stats["last_compute_seconds"] = elapsed
+                    self._published.notify_all()
+                logger.info({"filter": str(order_filter), "seconds": round(elapsed, 3), "message": "Dashboard payload published"})
+        finally:
+            db.close_connection()
+
+        with self._published:
+            if options is not None:
+                self._options = options
+            self._version = version
+            self._published.notify_all()
+
+_worker: Optional[AnalyticsWorker] = None
+_worker_lock = threading.Lock()
+
+def get_analytics_worker() -> AnalyticsWorker:
+    """Return the process-wide analytics worker, starting it on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = AnalyticsWorker().start()
+        return _worker
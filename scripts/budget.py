@@ -0,0 +1,161 @@
+"""
+# DineMate Prompt Budget 💰
+
+This module accounts for the tokens every graph node spends and keeps the chatbot
+prompt within `PROMPT_TOKEN_BUDGET`.
+
+Accounting: `TokenLedger` records prompt, completion and tool-output tokens per node,
+per turn (the latest user message) and per conversation thread. Provider usage is used
+when the response carries it, local counts otherwise.
+
+Budget policy: before the chatbot call, the lowest-value parts of the prompt are
+reduced until it fits: tool outputs from earlier turns, `get_full_menu` first (the menu
+is in the prompt's menu digest), replaced by a short placeholder so each tool call keeps
+its result. The system prompt, menu digest, summary and the current turn are never
+trimmed.
+
+## Dependencies
+- `collections`: For per-turn ordering 📚.
+- `langgraph.config`: For the thread id of the running graph 🧵.
+- `cache`: For bounding the number of tracked threads ⏳.
+- `tokens`: For local token counts 🔢.
+- `logger`: For logging 📜.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from langchain_core.messages import ToolMessage
+from langgraph.config import get_config
+from scripts.cache import TTLCache
+from scripts.config import PROMPT_TOKEN_BUDGET
+from scripts.tokens import count_message_tokens, message_tokens
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+TOKEN_KINDS = ("prompt", "cached", "completion", "tool_output", "trimmed")
+
+# ===== Ledger ====
+def ledger_scope(state: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Tuple[str, Optional[str]]:
+    """(thread id, turn id) of a node call; the turn is identified by the latest user message."""
+    if not (config or {}).get("configurable"):
+        try:
+            config = get_config()
+        except RuntimeError:  # called outside a graph run
+            config = {}
+    thread_id = str((config.get("configurable") or {}).get("thread_id", "default"))
+    turn_id = next((getattr(m, "id", None) for m in reversed(state.get("messages", []))
+                    if getattr(m, "type", None) == "human"), None)
+    return thread_id, turn_id
+
+class TokenLedger:
+    """💰 Prompt / completion / tool-output tokens per node, turn and thread."""
+
+    def __init__(self, max_threads: int = 1024, max_turns: int = 50):
+        self.max_turns = max_turns
+        self._threads = TTLCache(max_threads)  # thread id -> OrderedDict[turn id -> {node: Counter}]
+        self._tool_ids = TTLCache(max_threads * max_turns)  # (thread, turn) -> recorded tool message ids
+        self._lock = threading.Lock()
+
+    def record(self, thread_id: str, turn_id: Optional[str], node: str, **tokens: int) -> None:
+        """Add token counts (`prompt=`, `cached=`, `completion=`, `tool_output=`, `trimmed=`) for a node call."""
+        with self._lock:
+            turns = self._threads.get(thread_id)
+            if turns is None:
+                turns = OrderedDict()
+                self._threads.set(thread_id, turns)
+            nodes = turns.setdefault(turn_id, {})
+            turns.move_to_end(turn_id)
+            while len(turns) > self.max_turns:
+                turns.popitem(last=False)
+            counts = nodes.setdefault(node, Counter())
+            counts["calls"] += 1
+            counts.update({kind: int(value) for kind, value in tokens.items() if value})
+
+    def record_tool_outputs(self, thread_id: str, turn_id: Optional[str], messages: Iterable[Any]) -> None:
+        """Record tool results of a turn under the `tools` node, each message once."""
+        with self._lock:
+            seen = self._tool_ids.get((thread_id, turn_id))
+            if seen is None:
+                seen = set()
+                self._tool_ids.set((thread_id, turn_id), seen)
+            new = [m for m in messages if getattr(m, "type", None) == "tool" and m.id not in seen]
+            seen.update(m.id for m in new)
+        if new:
+            self.record(thread_id, turn_id, "tools", tool_output=count_message_tokens(new))
+
+    def turn(self, thread_id: str, turn_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Per-node counts of one turn (the latest recorded one by default)."""
+        with self._lock:
+            turns = self._threads.get(thread_id) or OrderedDict()
+            if turn_id is None and turns:
+                turn_id = next(reversed(turns))
+            return {node: dict(c) for node, c in turns.get(turn_id, {}).items()}
+
+    def thread(self, thread_id: str) -> Dict[str, Dict[str, int]]:
+        """Per-node totals of a thread over its recorded turns."""
+        with self._lock:
+            return self._sum((self._threads.get(thread_id) or {}).values())
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        """Per-node totals over every tracked thread."""
+        with self._lock:
+            return self._sum(nodes for _, turns in self._threads.items() for nodes in turns.values())
+
+    @staticmethod
+    def _sum(turns: Iterable[Dict[str, Counter]]) -> Dict[str, Dict[str, int]]:
+        totals: Dict[str, Counter] = {}
+        for nodes in turns:
+            for node, counts in nodes.items():
+                totals.setdefault(node, Counter()).update(counts)
+        return {node: dict(c) for node, c in totals.items()}
+
+_ledger: Optional[TokenLedger] = None
+_ledger_lock = threading.Lock()
+
+def get_token_ledger() -> TokenLedger:
+    """Return the process-wide token ledger."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = TokenLedger()
+        return _ledger
+
+def usage_tokens(response: Any, prompt_estimate: int) -> Dict[str, int]:
+    """Prompt/completion tokens of a model response: provider usage if reported, else local counts.
+
+    `cached` is the part of the prompt the provider served from its prompt cache.
+    """
+    usage = getattr(response, "usage_metadata", None) or {}
+    return {"prompt": usage.get("input_tokens") or prompt_estimate,
+            "cached": (usage.get("input_token_details") or {}).get("cache_read") or 0,
+            "completion": usage.get("output_tokens") or message_tokens(response)}
+
+# ===== Budget policy ====
+def apply_prompt_budget(messages: List[Any], budget: int = PROMPT_TOKEN_BUDGET) -> Tuple[List[Any], int]:
+    """Return (messages, tokens_trimmed) with low-value parts reduced until the prompt fits `budget`.
+
+    `budget <= 0` disables trimming. The input list is not modified.
+    """
+    total = count_message_tokens(messages)
+    if budget <= 0 or total <= budget:
+        return messages, 0
+    messages, trimmed = list(messages), 0
+    current_turn = max((i for i, m in enumerate(messages) if getattr(m, "type", None) == "human"), default=len(messages))
+
+    stale = [i for i in range(current_turn) if isinstance(messages[i], ToolMessage)]
+    stale.sort(key=lambda i: (messages[i].name != "get_full_menu", i))  # menu dumps first, then oldest
+    for i in stale:
+        if total - trimmed <= budget:
+            break
+        old = messages[i]
+        stub = ToolMessage(content=f"[{old.name or 'tool'} output omitted]", tool_call_id=old.tool_call_id,
+                           name=old.name, id=old.id)
+        trimmed += message_tokens(old) - message_tokens(stub)
+        messages[i] = stub
+
+    if total - trimmed > budget:
+        logger.warning({"prompt_tokens": total - trimmed, "budget": budget,
+                        "message": "⚠️ Prompt still over budget after trimming"})
+    return messages, trimmed
@@ -0,0 +1,76 @@
+"""
+# DineMate Cache ⏳
+
+This module provides a small thread-safe LRU cache with per-entry expiry, shared by
+the caching layers in front of LLM and tool calls.
+
+## Dependencies
+- `collections`: For LRU ordering 📚.
+- `threading`: For thread safety 🔒.
+"""
+
+import threading, time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+_MISSING = object()
+
+class TTLCache:
+    """⏳ Bounded LRU mapping whose entries expire `ttl_seconds` after they were written."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def _expired(self, written_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - written_at > self.ttl_seconds
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the live value for `key` (marking it recently used), or `default`."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING and self._expired(item[0], self._clock()):
+                del self._data[key]
+                item = _MISSING
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+            return default if item is _MISSING else item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Snapshot of live (key, value) pairs, least recently used first."""
+        now = self._clock()
+        with self._lock:
+            return iter([(k, v) for k, (t, v) in self._data.items() if not self._expired(t, now)])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
@@ -0,0 +1,460 @@
+"""
+# DineMate Checkpointer 💾
+
+This module persists LangGraph checkpoints in a local SQLite database instead of
+process memory, so conversations survive restarts and the process does not grow with
+every thread it has ever served.
+
+- Checkpoints and pending writes live in `CHECKPOINT_DB_PATH` (WAL mode, one shared
+  connection guarded by a lock).
+- A background thread compacts the store every `CHECKPOINT_COMPACTION_SECONDS`:
+  threads idle for longer than `CHECKPOINT_TTL_SECONDS` are evicted, each thread keeps
+  only its newest `CHECKPOINT_MAX_PER_THREAD` checkpoints, and freed pages are returned
+  to the file system.
+- `stats()` reports row counts, database / WAL size and write volume.
+
+Checkpoints are delta-encoded: LangGraph saves one per graph step, and most steps
+change a scalar or append a message or two. A checkpoint row stores only the channels
+whose version changed, with list channels (`messages`) stored as "drop the first n,
+append these" against the parent checkpoint. Every `CHECKPOINT_SNAPSHOT_EVERY` steps
+(and whenever the parent is unknown) the full state is written instead. Reading walks
+back to the nearest snapshot and replays the deltas; the latest state of recently
+active threads is kept in memory, so a turn never replays its own thread.
+
+## Dependencies
+- `sqlite3`: For the checkpoint store 🗄️.
+- `threading`: For the connection lock and the compaction thread 🔒.
+- `langgraph.checkpoint.base`: For the checkpoint saver interface 📦.
+- `cache`: For the latest state of recently active threads ⏳.
+- `logger`: For logging 📜.
+"""
+
+import asyncio, os, random, sqlite3, threading, time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (WRITES_IDX_MAP, BaseCheckpointSaver, ChannelVersions, Checkpoint,
+                                       CheckpointMetadata, CheckpointTuple, get_checkpoint_id,
+                                       get_checkpoint_metadata, writes_sort_key)
+from scripts.cache import TTLCache
+from scripts.config import (CHECKPOINT_COMPACTION_SECONDS, CHECKPOINT_DB_PATH, CHECKPOINT_MAX_PER_THREAD,
+                            CHECKPOINT_SNAPSHOT_EVERY, CHECKPOINT_TTL_SECONDS)
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    delta_type TEXT,
+    delta BLOB,
+    depth INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_threads_updated_at ON threads(updated_at);
+"""
+# Added with delta encoding; rows without a delta hold the full state inline
+_DELTA_COLUMNS = {"delta_type": "TEXT", "delta": "BLOB", "depth": "INTEGER NOT NULL DEFAULT 0"}
+
+# Walks from a checkpoint to its nearest full snapshot (the row without a delta)
+_CHAIN_SQL = """
+WITH RECURSIVE chain(checkpoint_id, parent_checkpoint_id, type, checkpoint, delta_type, delta, depth) AS (
+    SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, delta_type, delta, depth FROM checkpoints
+    WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+    UNION ALL
+    SELECT c.checkpoint_id, c.parent_checkpoint_id, c.type, c.checkpoint, c.delta_type, c.delta, c.depth
+    FROM checkpoints c JOIN chain ON c.checkpoint_id = chain.parent_checkpoint_id
+    WHERE chain.delta IS NOT NULL AND c.thread_id = ? AND c.checkpoint_ns = ?
+)
+SELECT type, checkpoint, delta_type, delta FROM chain ORDER BY depth
+"""
+
+# ===== Delta encoding ====
+def _list_delta(old: list, new: list) -> Optional[Tuple[int, list]]:
+    """(drop, appended) with `new == old[drop:] + appended`, or None when `new` is not of that shape.
+
+    The overlap starts at the first element of `old` matching `new[0]` (message ids are
+    unique, so there is one candidate); only that one slice is compared. None makes the
+    caller store the full value.
+    """
+    drop = len(old)
+    if new:
+        first, start = new[0], max(0, len(old) - len(new))
+        drop = next((i for i in range(start, len(old)) if old[i] is first or old[i] == first), drop)
+    kept = len(old) - drop
+    if all(a is b or a == b for a, b in zip(old[drop:], new[:kept])):
+        return drop, new[kept:]
+    return None
+
+def diff_channels(base: Dict[str, Any], values: Dict[str, Any], changed: Sequence[str]) -> Dict[str, Any]:
+    """Delta turning channel values `base` into `values`, given the channels whose version changed."""
+    delta: Dict[str, Any] = {"set": {}, "extend": {}, "unset": [ch for ch in base if ch not in values]}
+    for ch, value in values.items():
+        if ch in base and ch not in changed:
+            continue
+        old = base.get(ch)
+        extension = _list_delta(old, value) if isinstance(old, list) and isinstance(value, list) else None
+        if extension is not None:
+            delta["extend"][ch] = list(extension)
+        else:
+            delta["set"][ch] = value
+    return delta
+
+def apply_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Channel values after `delta`; `base` is not modified."""
+    values = {ch: value for ch, value in base.items() if ch not in delta["unset"]}
+    values.update(delta["set"])
+    for ch, (drop, appended) in delta["extend"].items():
+        values[ch] = list(values.get(ch, []))[drop:] + list(appended)
+    return values
+
+def _own_lists(values: Dict[str, Any]) -> Dict[str, Any]:
+    # Shallow-copy lists so later in-place changes by the caller cannot alter a diff base
+    return {ch: list(v) if isinstance(v, list) else v for ch, v in values.items()}
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """💾 LangGraph checkpoint saver on local SQLite, with TTL eviction and a per-thread cap."""
+
+    def __init__(self, db_path: str = CHECKPOINT_DB_PATH, ttl_seconds: float = CHECKPOINT_TTL_SECONDS,
+                 max_per_thread: int = CHECKPOINT_MAX_PER_THREAD,
+                 compaction_seconds: float = CHECKPOINT_COMPACTION_SECONDS,
+                 snapshot_every: int = CHECKPOINT_SNAPSHOT_EVERY, recent_threads: int = 256, *, serde: Any = None):
+        super().__init__(serde=serde)
+        self.db_path = str(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_per_thread = max(1, max_per_thread)
+        self.compaction_seconds = compaction_seconds
+        self.snapshot_every = max(1, snapshot_every)
+        self._recent = TTLCache(recent_threads)  # (thread id, ns) -> (checkpoint id, channel values, depth)
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {"checkpoints_put": 0, "snapshots": 0, "writes_put": 0, "bytes_written": 0,
+                         "compactions": 0, "evicted_threads": 0, "pruned_checkpoints": 0, "replayed_deltas": 0}
+        try:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # Must precede table creation to take effect; lets compaction hand pages back
+            self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.conn.executescript(_SCHEMA)
+            present = {row[1] for row in self.conn.execute("PRAGMA table_info(checkpoints)")}
+            for column, definition in _DELTA_COLUMNS.items():
+                if column not in present:
+                    self.conn.execute(f"ALTER TABLE checkpoints ADD COLUMN {column} {definition}")
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error({"error": str(e), "message": "❌ Checkpoint store connection failed"})
+            raise
+
+    # ===== Background compaction ====
+    def start(self) -> "SQLiteCheckpointer":
+        """Start the background compaction thread (no-op when the interval is 0)."""
+        if self.compaction_seconds > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._run, name="checkpoint-compactor", daemon=True)
+            self._thread.start()
+            logger.info("🧵 Checkpoint compactor started")
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.compaction_seconds):
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error({"error": str(e), "message": "❌ Checkpoint compaction failed"})
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            self.conn.close()
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Evict expired threads and cap each thread's checkpoint history.
+
+        Returns the number of evicted threads and pruned checkpoints.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            evicted = 0
+            if self.ttl_seconds > 0:
+                expired = [row[0] for row in self.conn.execute(
+                    "SELECT thread_id FROM threads WHERE updated_at < ?", (now - self.ttl_seconds,))]
+                for thread_id in expired:
+                    self._delete_thread(thread_id)
+                evicted = len(expired)
+            # The oldest checkpoint kept must not depend on the ones about to be pruned
+            for thread_id, checkpoint_ns, checkpoint_id in self.conn.execute(
+                    "SELECT thread_id, checkpoint_ns, checkpoint_id FROM (SELECT thread_id, checkpoint_ns,"
+                    " checkpoint_id, delta, ROW_NUMBER() OVER (PARTITION BY thread_id, checkpoint_ns"
+                    " ORDER BY checkpoint_id DESC) AS newest FROM checkpoints)"
+                    " WHERE newest = ? AND delta IS NOT NULL", (self.max_per_thread,)).fetchall():
+                self._rebase(thread_id, checkpoint_ns, checkpoint_id)
+            pruned = self.conn.execute(
+                "DELETE FROM checkpoints WHERE rowid IN ("
+                " SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER ("
+                "  PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS newest"
+                "  FROM checkpoints) WHERE newest > ?)", (self.max_per_thread,)).rowcount
+            if pruned:
+                self.conn.execute(
+                    "DELETE FROM writes WHERE NOT EXISTS (SELECT 1 FROM checkpoints c"
+                    " WHERE c.thread_id = writes.thread_id AND c.checkpoint_ns = writes.checkpoint_ns"
+                    " AND c.checkpoint_id = writes.checkpoint_id)")
+            self.conn.commit()
+            if evicted or pruned:
+                self.conn.execute("PRAGMA incremental_vacuum").fetchall()  # runs one page per step
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.counters["compactions"] += 1
+            self.counters["evicted_threads"] += evicted
+            self.counters["pruned_checkpoints"] += pruned
+        if evicted or pruned:
+            logger.info({"evicted_threads": evicted, "pruned_checkpoints": pruned, "message": "💾 Checkpoints compacted"})
+        return {"evicted_threads": evicted, "pruned_checkpoints": pruned}
+
+    def stats(self) -> Dict[str, Any]:
+        """Row counts, on-disk size and write counters of the checkpoint store."""
+        with self._lock:
+            counts = {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ("threads", "checkpoints", "writes")}
+            page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+            free_pages = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+            counters = dict(self.counters)
+        wal_path = self.db_path + "-wal"
+        return {**counts, "db_bytes": page_count * page_size, "free_bytes": free_pages * page_size,
+                "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0, **counters}
+
+    # ===== Delta chain ====
+    def _channel_values(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """(channel values, steps since the last snapshot) of a stored checkpoint; values are None if it is unknown."""
+        recent = self._recent.get((thread_id, checkpoint_ns))
+        if recent is not None and recent[0] == checkpoint_id:
+            return recent[1], recent[2]
+        rows = self.conn.execute(_CHAIN_SQL, (thread_id, checkpoint_ns, checkpoint_id, thread_id, checkpoint_ns)).fetchall()
+        if not rows:
+            return None, 0
+        type_, checkpoint, delta_type, delta = rows[0]
+        if delta is not None:
+            logger.error({"thread_id": thread_id, "checkpoint_id": checkpoint_id,
+                          "message": "❌ Checkpoint delta chain has no snapshot"})
+            values = {}
+        else:
+            values = self.serde.loads_typed((type_, checkpoint)).get("channel_values", {})
+        for _, _, delta_type, delta in rows[1:]:
+            values = apply_delta(values, self.serde.loads_typed((delta_type, delta)))
+        self.counters["replayed_deltas"] += len(rows) - 1
+        return values, len(rows) - 1
+
+    def _rebase(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> None:
+        """Rewrite a delta checkpoint as a full snapshot."""
+        values, _ = self._channel_values(thread_id, checkpoint_ns, checkpoint_id)
+        type_, checkpoint = self.conn.execute(
+            "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+        type_, blob = self.serde.dumps_typed({**self.serde.loads_typed((type_, checkpoint)), "channel_values": values})
+        self.conn.execute(
+            "UPDATE checkpoints SET type = ?, checkpoint = ?, delta_type = NULL, delta = NULL, depth = 0"
+            " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (type_, blob, thread_id, checkpoint_ns, checkpoint_id))
+
+    # ===== Checkpoint saver interface ====
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        rows = self.conn.execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes"
+            " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id)).fetchall()
+        rows.sort(key=lambda r: writes_sort_key(r[5], r[0], r[1]))
+        return [(task_id, channel, self.serde.loads_typed((type_, value)))
+                for task_id, _, channel, type_, value, _ in rows]
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row: Tuple) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata, is_delta = row
+        checkpoint = self.serde.loads_typed((type_, checkpoint))
+        if is_delta:
+            checkpoint["channel_values"] = _own_lists(self._channel_values(thread_id, checkpoint_ns, checkpoint_id)[0] or {})
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                     "checkpoint_id": checkpoint_id}},
+            checkpoint=checkpoint,
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=({"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                             "checkpoint_id": parent_id}} if parent_id else None),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata, delta IS NOT NULL"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+            else:
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+                    " ORDER BY checkpoint_id DESC LIMIT 1", (thread_id, checkpoint_ns)).fetchone()
+            return self._tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(str(config["configurable"]["thread_id"]))
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint,"
+                f" metadata_type, metadata, delta IS NOT NULL FROM checkpoints{where} ORDER BY thread_id, checkpoint_id DESC",
+                params).fetchall()
+            tuples = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(tuples) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row[4], row[5]))
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                tuples.append(self._tuple(thread_id, checkpoint_ns, tuple(row)))
+        yield from tuples
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        values = checkpoint["channel_values"]
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            base, depth = self._channel_values(thread_id, checkpoint_ns, parent_id) if parent_id else (None, 0)
+            if base is None or depth + 1 >= self.snapshot_every:
+                type_, blob = self.serde.dumps_typed(checkpoint)
+                delta_type, delta, depth = None, None, 0
+                self.counters["snapshots"] += 1
+            else:
+                type_, blob = self.serde.dumps_typed({**checkpoint, "channel_values": {}})
+                delta_type, delta = self.serde.dumps_typed(diff_channels(base, values, list(new_versions)))
+                depth += 1
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,"
+                " type, checkpoint, metadata_type, metadata, delta_type, delta, depth)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], parent_id, type_, blob, metadata_type, metadata_blob,
+                 delta_type, delta, depth))
+            self.conn.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time()))
+            self.conn.commit()
+            self._recent.set((thread_id, checkpoint_ns), (checkpoint["id"], _own_lists(values), depth))
+            self.counters["checkpoints_put"] += 1
+            self.counters["bytes_written"] += len(blob) + len(metadata_blob) + len(delta or b"")
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                                 "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows, written = [], 0
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((WRITES_IDX_MAP.get(channel, idx), channel, type_, blob))
+            written += len(blob)
+        with self._lock:
+            for idx, channel, type_, blob in rows:
+                # Special channels (errors, interrupts) are overwritten, regular writes are kept once
+                verb = "INSERT OR REPLACE" if idx < 0 else "INSERT OR IGNORE"
+                self.conn.execute(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type_, blob, task_path))
+            self.conn.commit()
+            self.counters["writes_put"] += len(rows)
+            self.counters["bytes_written"] += written
+
+    def release(self, thread_id: str) -> None:
+        """Drop the cached latest state of a thread; its checkpoints stay stored."""
+        for (recent_thread, checkpoint_ns), _ in list(self._recent.items()):
+            if recent_thread == thread_id:
+                self._recent.pop((recent_thread, checkpoint_ns))
+
+    def _delete_thread(self, thread_id: str) -> None:
+        self.release(thread_id)
+        for table in ("checkpoints", "writes", "threads"):
+            self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._delete_thread(str(thread_id))
+            self.conn.commit()
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        tuples = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in tuples:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+_checkpointer: Optional[SQLiteCheckpointer] = None
+_checkpointer_lock = threading.Lock()
+
+def get_checkpointer() -> SQLiteCheckpointer:
+    """Return the process-wide checkpoint store, starting its compactor on first use."""
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = SQLiteCheckpointer().start()
+        return _checkpointer
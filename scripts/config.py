@@ -33,25 +33,86 @@ TEMPERATURE = os.getenv("TEMPERATURE", 0.5)
 DB_PATH = Path(__file__).parent.parent / "database" / "dinemate.db"
 STATIC_CSS_PATH =  Path(__file__).parent.parent / "static" / "styles.css"
 
-# langsmith configuration
+# Analytics configuration
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "pandas")          # "pandas" or "duckdb"
+SPENDING_BIN_WIDTH = float(os.getenv("SPENDING_BIN_WIDTH", "5.0"))   # $ per spending histogram bin
+ANALYTICS_POLL_SECONDS = float(os.getenv("ANALYTICS_POLL_SECONDS", "5"))               # worker change-detection interval
+ANALYTICS_FILTER_IDLE_SECONDS = float(os.getenv("ANALYTICS_FILTER_IDLE_SECONDS", "300"))  # stop refreshing unread filters
+ANALYTICS_WAIT_SECONDS = float(os.getenv("ANALYTICS_WAIT_SECONDS", "10"))              # max page wait for a first payload
+
+# langsmith configuration (LANGSMITH_TRACING traces every LangChain run inline; sampled tracing is below)
+# LangChain reads LANGSMITH_TRACING from the environment itself, so the default is applied there
+os.environ.setdefault("LANGSMITH_TRACING", "false")
 LANGSMITH_PROJECT = os.getenv("LANGSMITH_PROJECT", "DineMate")
-LANGSMITH_TRACING = os.getenv("LANGSMITH_TRACING", "true")
+LANGSMITH_TRACING = os.environ["LANGSMITH_TRACING"]
 LANGSMITH_ENDPOINT = os.getenv("LANGSMITH_ENDPOINT", "https://api.smith.langchain.com")
 LANGSMITH_API_KEY = SecretStr(os.getenv("LANGSMITH_API_KEY") or "")
 
-# Short term memory handling
-SUMMARY_MESSAGE_THRESHOLD = 15          # trigger summary after this many messages
-KEEP_LAST_MESSAGES = 4                  # always keep last N messages verbatim
+# Sampled tracing (tracing.py): head-sampled spans exported off the request path
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"      # kill switch: false makes every span a no-op
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))              # share of traces recorded
+TRACE_SAMPLE_RATES = os.getenv("TRACE_SAMPLE_RATES", "")                      # per-root overrides, e.g. "turn=0.2,summarize_conversation=0.01"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "file")                          # "file", "langsmith" or "none"
+TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH", str(Path(__file__).parent.parent / "logs" / "traces.jsonl"))
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "1000"))                 # finished spans waiting for export; dropped beyond
+TRACE_FLUSH_SECONDS = float(os.getenv("TRACE_FLUSH_SECONDS", "2"))            # max time a span waits to be batched
+
+# Short term memory handling (token counts use tiktoken; an estimate only if its encoding file can't be loaded)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))   # compact once the message history exceeds this
+KEEP_RECENT_TOKENS = int(os.getenv("KEEP_RECENT_TOKENS", "600"))        # newest messages kept verbatim after compaction
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "400"))        # ask for a condensed summary beyond this
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "o200k_base")      # tiktoken encoding for local counts
+TIKTOKEN_CACHE_DIR = os.getenv("TIKTOKEN_CACHE_DIR", str(Path(__file__).parent.parent / "database" / "tiktoken"))  # encoding files
+MAX_STATE_MESSAGES = int(os.getenv("MAX_STATE_MESSAGES", "80"))         # hard cap on messages kept in a thread's state
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "4000"))     # trim stale tool outputs / menu dump beyond this (0 = off)
+
+# Conversation checkpoints (LangGraph state), persisted in local SQLite
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", str(Path(__file__).parent.parent / "database" / "checkpoints.db"))
+CHECKPOINT_TTL_SECONDS = float(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600)))  # evict threads idle this long (0 = never)
+CHECKPOINT_MAX_PER_THREAD = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "10"))            # newest checkpoints kept per thread
+CHECKPOINT_SNAPSHOT_EVERY = int(os.getenv("CHECKPOINT_SNAPSHOT_EVERY", "20"))            # full state every N steps, deltas between
+CHECKPOINT_COMPACTION_SECONDS = float(os.getenv("CHECKPOINT_COMPACTION_SECONDS", "300"))  # background compaction interval (0 = off)
+
+# Chat sessions: one conversation thread per logged-in browser session
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "1800"))   # release a thread's in-process state after this idle time
+MAX_LIVE_THREADS = int(os.getenv("MAX_LIVE_THREADS", "1000"))             # cap on threads with in-process state (LRU beyond)
+
+# Chat UI: streamed replies are re-rendered in batches, not once per token
+STREAM_RENDER_INTERVAL_MS = float(os.getenv("STREAM_RENDER_INTERVAL_MS", "50"))   # min time between re-renders of a reply
+STREAM_RENDER_MAX_CHARS = int(os.getenv("STREAM_RENDER_MAX_CHARS", "1024"))       # re-render early once this much text is pending
+
+# Latency metrics: Prometheus text endpoint served by the app process
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")     # bind address of the /metrics endpoint
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))     # port of the /metrics endpoint (0 = off)
 
 # Model configuration
 DEFAULT_MODEL_NAME = os.getenv("DEFAULT_MODEL_NAME", 'openai/gpt-oss-120b')
 MODEL_NAME = os.getenv("MODEL_NAME", "qwen/qwen3-32b")
 
+# LLM client pooling
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))          # pooled HTTP connections per pool
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "120"))   # idle time before a pooled connection closes
+
+# Speculative mode: overlap the remote guardrail call with the first chatbot call
+SPECULATIVE_MODE = os.getenv("SPECULATIVE_MODE", "false").lower() == "true"
+
+# Fast-path router for simple status / cancel / order turns
+FAST_PATH_ROUTER_ENABLED = os.getenv("FAST_PATH_ROUTER_ENABLED", "true").lower() == "true"
+
+# Semantic response cache (opt-in)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.85"))          # min cosine similarity for a hit
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))         # LRU bound
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))      # max age of a cached answer
+
 # Prompt guard configuration
 GUARDRAIL_MODEL_NAME = os.getenv("GUARDRAIL_MODEL_NAME", "meta-llama/llama-prompt-guard-2-86m")
 GUARDRAIL_BLOCK_THRESHOLD = float(os.getenv("GUARDRAIL_BLOCK_THRESHOLD", "0.55"))
 GUARDRAIL_BORDERLINE_THRESHOLD = float(os.getenv("GUARDRAIL_BORDERLINE_THRESHOLD", "0.35"))
 GUARDRAIL_TIMEOUT_SECONDS = float(os.getenv("GUARDRAIL_TIMEOUT_SECONDS", "2.5"))
+GUARDRAIL_PREFILTER_ENABLED = os.getenv("GUARDRAIL_PREFILTER_ENABLED", "true").lower() == "true"  # local PASS for trivial messages
+GUARDRAIL_CACHE_MAX_ENTRIES = int(os.getenv("GUARDRAIL_CACHE_MAX_ENTRIES", "2048"))      # verdict cache size
+GUARDRAIL_CACHE_TTL_SECONDS = float(os.getenv("GUARDRAIL_CACHE_TTL_SECONDS", "3600"))    # verdict cache lifetime
 
 def get_db_connection():
     """
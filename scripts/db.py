@@ -11,15 +11,58 @@ Dependencies:
 - pandas
 - logger (custom)
 - config (DB_PATH)
+- metrics (async query latency)
 """
 
 import sqlite3, datetime, json, bcrypt, pandas as pd, aiosqlite
-from typing import Dict, Optional
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
 from scripts.logger import get_logger
 from scripts.config import DB_PATH
+from scripts.metrics import timed
 
 logger = get_logger(__name__)
 
+@dataclass(frozen=True)
+class OrderFilter:
+    """🔎 Analytics filter spec compiled into a parameterized SQL WHERE clause.
+
+    Empty fields mean "no restriction". Dates are inclusive `YYYY-MM-DD` strings,
+    matching the TEXT `date` column so range predicates can use `idx_orders_date`.
+    """
+    statuses: Tuple[str, ...] = ()
+    years: Tuple[int, ...] = ()
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    items: Tuple[str, ...] = ()
+
+    def to_sql(self) -> Tuple[str, List]:
+        """Return (where_clause, params); the clause is empty when nothing is filtered."""
+        clauses, params = [], []
+        if self.statuses:
+            clauses.append(f"status IN ({', '.join('?' for _ in self.statuses)})")
+            params.extend(self.statuses)
+        if self.years:
+            # Years become date ranges rather than strftime() so the date index stays usable
+            ranges = []
+            for year in sorted(set(self.years)):
+                ranges.append("(date >= ? AND date < ?)")
+                params.extend([f"{int(year):04d}-01-01", f"{int(year) + 1:04d}-01-01"])
+            clauses.append(f"({' OR '.join(ranges)})")
+        if self.start_date:
+            clauses.append("date >= ?")
+            params.append(self.start_date)
+        if self.end_date:
+            clauses.append("date <= ?")
+            params.append(self.end_date)
+        if self.items:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM json_each(orders.items) "
+                f"WHERE lower(json_each.key) IN ({', '.join('?' for _ in self.items)}))"
+            )
+            params.extend(item.lower() for item in self.items)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
 class Database:
     def __init__(self, db_path: str=DB_PATH):
         """🗄️ Initialize and connect to SQLite database."""
@@ -32,26 +75,126 @@ class Database:
             logger.error({"error": str(e), "message": "❌ Database connection failed"})
             raise
 
-    def fetch_order_data(self, status: Optional[str] = "Delivered") -> pd.DataFrame:
-        """📦 Fetch orders as DataFrame filtered by status.
+    def ensure_order_indexes(self) -> None:
+        """🗂️ Create the orders indexes analytics filters rely on, if missing."""
+        try:
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_date ON orders(date)")
+            self.connection.commit()
+        except sqlite3.Error as e:
+            logger.error({"error": str(e), "message": "❌ Error creating order indexes"})
+
+    def fetch_order_data(self, status: Optional[str] = "Delivered", order_filter: Optional[OrderFilter] = None) -> pd.DataFrame:
+        """📦 Fetch orders as DataFrame filtered by status or a full filter spec.
 
         Args:
-            status (Optional[str]): Order status or 'All'.
+            status (Optional[str]): Order status or 'All'; ignored when `order_filter` is given.
+            order_filter (Optional[OrderFilter]): Filter compiled into the SQL WHERE clause.
 
         Returns:
             pd.DataFrame: Resulting DataFrame or empty if error.
         """
         logger.info("📊 Fetching order data for analytics")
-        query = "SELECT id, items, total_price, status, date, time FROM orders"
+        if order_filter is None:
+            order_filter = OrderFilter(statuses=(status,) if status and status != "All" else ())
+        where, params = order_filter.to_sql()
+        query = f"SELECT id, items, total_price, status, date, time FROM orders{where}"
         try:
-            if status and status != "All":
-                query += " WHERE status = ?"
-                return pd.read_sql_query(query, self.connection, params=(status,))
-            return pd.read_sql_query(query, self.connection)
+            return pd.read_sql_query(query, self.connection, params=params)
         except Exception as e:
             logger.error({"error": str(e), "message": "❌ Error fetching order data"})
             return pd.DataFrame()
 
+    def fetch_order_status_index(self) -> Dict[int, str]:
+        """🏷️ Map every order ID to its status.
+
+        With `idx_orders_status` in place (`ensure_order_indexes`), SQLite reads this from
+        the covering index instead of the order rows.
+
+        Returns:
+            Dict[int, str]: Order ID → status, or empty if error.
+        """
+        try:
+            self.cursor.execute("SELECT id, status FROM orders")
+            return {row["id"]: row["status"] for row in self.cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error({"error": str(e), "message": "❌ Error fetching order status index"})
+            return {}
+
+    def fetch_order_rows(self, order_filter: Optional[OrderFilter] = None, after_id: Optional[int] = None,
+                         ids: Iterable[int] = (), max_id: Optional[int] = None) -> List[Dict]:
+        """📦 Fetch orders matching a filter that are newer than `after_id` or listed in `ids`.
+
+        Used by incremental analytics to read only appended or changed rows.
+
+        Args:
+            order_filter (Optional[OrderFilter]): Filter compiled into the WHERE clause.
+            after_id (Optional[int]): Include rows with a larger ID (primary-key range scan).
+            ids (Iterable[int]): Include these specific rows.
+            max_id (Optional[int]): Exclude rows with a larger ID.
+
+        Returns:
+            List[Dict]: Matching rows, or empty if error.
+        """
+        where, params = (order_filter or OrderFilter()).to_sql()
+        ids = list(ids)
+        selectors = []
+        if after_id is not None:
+            selectors.append("id > ?")
+            params.append(after_id)
+        if ids:
+            selectors.append(f"id IN ({', '.join('?' for _ in ids)})")
+            params.extend(ids)
+        if not selectors:
+            return []
+        where = f"{where} AND ({' OR '.join(selectors)})" if where else f" WHERE ({' OR '.join(selectors)})"
+        if max_id is not None:
+            where += " AND id <= ?"
+            params.append(max_id)
+        try:
+            self.cursor.execute(f"SELECT id, items, total_price, status, date, time FROM orders{where}", params)
+            return [dict(row) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error({"error": str(e), "message": "❌ Error fetching order rows"})
+            return []
+
+    def fetch_order_years(self) -> List[int]:
+        """📅 List the years that have orders using index probes on `date`.
+
+        Returns:
+            List[int]: Years in ascending order, or empty if error.
+        """
+        try:
+            self.cursor.execute("SELECT MIN(date), MAX(date) FROM orders")
+            first, last = self.cursor.fetchone()
+            if not first:
+                return []
+            years = []
+            for year in range(int(first[:4]), int(last[:4]) + 1):
+                self.cursor.execute(
+                    "SELECT 1 FROM orders WHERE date >= ? AND date < ? LIMIT 1",
+                    (f"{year:04d}-01-01", f"{year + 1:04d}-01-01")
+                )
+                if self.cursor.fetchone():
+                    years.append(year)
+            return years
+        except (sqlite3.Error, ValueError) as e:
+            logger.error({"error": str(e), "message": "❌ Error fetching order years"})
+            return []
+
+    def fetch_order_statuses(self) -> List[str]:
+        """🏷️ List the distinct order statuses (served from `idx_orders_status`).
+
+        Returns:
+            List[str]: Statuses present in the orders table, or empty if error.
+        """
+        try:
+            self.cursor.execute("SELECT DISTINCT status FROM orders ORDER BY status")
+            return [row["status"] for row in self.cursor.fetchall() if row["status"]]
+        except sqlite3.Error as e:
+            logger.error({"error": str(e), "message": "❌ Error fetching order statuses"})
+            return []
+
     def load_menu(self) -> Optional[Dict[str, float]]:
         """🍽️ Load menu items as a compact dictionary.
 
@@ -323,6 +466,10 @@ class Database:
         except sqlite3.Error as e:
             logger.error({"error": str(e), "message": "❌ Error closing connection"})
 
+def _query_metrics(query: str):
+    """⏱️ Time an async query in the `dinemate_db_query_seconds` histogram."""
+    return timed("dinemate_db_query_seconds", "dinemate_db_query_errors_total", query=query)
+
 class AsyncDatabase:
     def __init__(self, db_path: str = DB_PATH):
         """🗄️ Initialize AsyncDatabase."""
@@ -342,6 +489,7 @@ class AsyncDatabase:
             await self.connection.close()
         logger.info("🔐 Database connection closed (Async)")
 
+    @_query_metrics("load_menu")
     async def load_menu(self) -> Optional[Dict[str, float]]:
         """🍽️ Load menu items as a compact dictionary (Async)."""
         try:
@@ -354,6 +502,7 @@ class AsyncDatabase:
             logger.error({"error": str(e), "message": "❌ Error fetching menu (Async)"})
             return None
 
+    @_query_metrics("get_max_id")
     async def get_max_id(self) -> int:
         """🔢 Get next available order ID (Async)."""
         try:
@@ -364,6 +513,7 @@ class AsyncDatabase:
             logger.error({"error": str(e), "message": "❌ Error fetching max ID (Async)"})
             return 1
 
+    @_query_metrics("store_order_db")
     async def store_order_db(self, order_dict: Dict[str, int], price: float, status: str = "Pending") -> Optional[int]:
         """📝 Store a new order (Async)."""
         try:
@@ -383,6 +533,7 @@ class AsyncDatabase:
             logger.error({"error": str(e), "message": "❌ Error storing order (Async)"})
             return None
 
+    @_query_metrics("check_order_status_db")
     async def check_order_status_db(self, order_id: int) -> str:
         """🔍 Check order status (Async)."""
         logger.info("📦 Checking order status (Async)")
@@ -408,6 +559,7 @@ class AsyncDatabase:
             logger.error({"error": str(e), "message": "❌ Error fetching status (Async)"})
             return f"Error: {e}"
 
+    @_query_metrics("cancel_order_after_confirmation")
     async def cancel_order_after_confirmation(self, order_id: int) -> str:
         """❌ Cancel an order if within 10 minutes (Async)."""
         logger.info("🚫 Checking cancellation (Async)")
@@ -431,6 +583,7 @@ class AsyncDatabase:
             logger.error({"error": str(e), "message": "❌ Error canceling (Async)"})
             return f"Error: {e}"
 
+    @_query_metrics("modify_order_after_confirmation")
     async def modify_order_after_confirmation(self, order_id: int, updated_items: str, new_total_price: float) -> str:
         """✏️ Modify order if within 10 minutes (Async)."""
         logger.info("✍️ Checking modification (Async)")
@@ -469,6 +622,7 @@ class AsyncDatabase:
             logger.error({"error": str(e), "message": "❌ Failed to update (Async)"})
             return f"⚠️ Error: {str(e)}"
 
+    @_query_metrics("get_order_by_id")
     async def get_order_by_id(self, order_id: int) -> Dict[str, any]:
         """🔍 Get full order details (Async)."""
         logger.info("🔎 Fetching order details (Async)")
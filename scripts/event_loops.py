@@ -0,0 +1,41 @@
+"""
+# DineMate Background Event Loops 🔁
+
+This module runs long-lived asyncio event loops on daemon threads, so async work started
+from Streamlit's script threads does not need a fresh loop (and fresh pooled LLM
+connections, which are kept per loop) every time.
+
+- `get_reply_loop()`: the loop streamed chatbot replies run on.
+- `BackgroundLoop`: one loop and its thread, e.g. the background summarizer's own.
+
+## Dependencies
+- `asyncio`: For the event loops ⚙️.
+- `threading`: For the loop threads 🧵.
+"""
+
+import asyncio, threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+class BackgroundLoop:
+    """🔁 An event loop running forever on its own daemon thread."""
+
+    def __init__(self, name: str):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """Schedule `coro` on the loop from any thread; returns its concurrent future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+_reply_loop: Optional[BackgroundLoop] = None
+_reply_loop_lock = threading.Lock()
+
+def get_reply_loop() -> BackgroundLoop:
+    """Return the process-wide loop streamed replies run on."""
+    global _reply_loop
+    with _reply_loop_lock:
+        if _reply_loop is None:
+            _reply_loop = BackgroundLoop("dinemate-replies")
+        return _reply_loop
@@ -6,37 +6,44 @@ This module constructs the LangGraph workflow for the DineMate foodbot.
 ## Dependencies
 - `os`: For file path handling.
 - `langgraph.graph`: For StateGraph and START.
-- `langgraph.prebuilt`: For ToolNode and tools_condition.
-- `langgraph.checkpoint.memory`: For MemorySaver.
+- `langgraph.prebuilt`: For tools_condition.
+- `langgraph.checkpoint.base`: For the checkpointer type.
 - `state`: For state definition.
 - `agent`: For chatbot node.
-- `tools`: For get_menu and save_order tools.
+- `checkpointer`: For the persistent SQLite checkpoint store.
+- `memory`: For the background summarizer's node name.
+- `metrics`: For per-node latency and error metrics.
+- `response_cache`: For the optional semantic response cache nodes.
+- `router`: For the fast-path router node.
+- `speculative`: For the speculative guardrail + chatbot node.
+- `tools`: For the chatbot tool set.
+- `tool_memo`: For the memoizing tools node.
 - `logger`: For logging.
 """
 
-import os
+import os, threading
+from typing import Optional
 from langchain_core.messages import AIMessage
 from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import ToolNode, tools_condition
-from langgraph.checkpoint.memory import MemorySaver
-from scripts.agent import chatbot, summarize_conversation
+from langgraph.prebuilt import tools_condition
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from scripts.agent import chatbot, compile_agent, summarize_conversation
+from scripts.checkpointer import get_checkpointer
+from scripts.memory import SUMMARIZER_NODE
+from scripts.metrics import instrument_node
 from scripts.guardrails import guardrail_node, should_continue_after_guardrails, BLOCKED_RESPONSE
+from scripts.config import DEFAULT_MODEL_NAME, FAST_PATH_ROUTER_ENABLED, RESPONSE_CACHE_ENABLED, SPECULATIVE_MODE
+from scripts.speculative import route_after_speculative, speculative_guardrail_node
+from scripts.router import route_after_router, router_node
+from scripts.response_cache import response_cache_lookup_node, response_cache_store_node, route_after_cache_lookup
 from scripts.logger import get_logger
 from scripts.state import State
-from scripts.tools import (
-    get_full_menu, get_prices_for_items, save_order, 
-    check_order_status, cancel_order, modify_order, 
-    get_order_details, introduce_developer
-    )
+from scripts.tools import ALL_TOOLS
+from scripts.tool_memo import MemoizedToolNode
 
 logger = get_logger(__name__)
-memory = MemorySaver()
 
-tools = [
-    get_full_menu, get_prices_for_items, save_order, 
-    check_order_status, cancel_order, modify_order, 
-    get_order_details, introduce_developer
-]
+tools = ALL_TOOLS
 
 def blocked_response_node(state: State) -> dict:
     """Terminal node reached when the guardrail blocks a message.
@@ -45,49 +52,106 @@ def blocked_response_node(state: State) -> dict:
     return {"messages": [AIMessage(content=BLOCKED_RESPONSE)]}
 
 
-def build_graph():
-    """Construct the LangGraph workflow for the chatbot."""
+def build_graph(response_cache: bool = RESPONSE_CACHE_ENABLED, router: bool = FAST_PATH_ROUTER_ENABLED,
+                speculative: bool = SPECULATIVE_MODE, checkpointer: Optional[BaseCheckpointSaver] = None):
+    """Construct the LangGraph workflow for the chatbot.
+
+    Args:
+        response_cache (bool): Add the semantic response cache nodes (defaults to RESPONSE_CACHE_ENABLED).
+        router (bool): Add the fast-path router node (defaults to FAST_PATH_ROUTER_ENABLED).
+        speculative (bool): Overlap remote guardrail calls with the first chatbot call (defaults to SPECULATIVE_MODE).
+        checkpointer (BaseCheckpointSaver): Where conversation state is saved (defaults to the SQLite store).
+    """
     logger.info("📈 Building workflow")
 
+    # Bind the chat model to its tools once, so chatbot turns reuse the compiled runnable
+    compile_agent(DEFAULT_MODEL_NAME, tools)
+
     # graph
     builder = StateGraph(State)
     
-    # add nodes
-    builder.add_node("guardrails", guardrail_node)
-    builder.add_node("blocked", blocked_response_node)
-    builder.add_node("chatbot", chatbot)
-    builder.add_node("tools", ToolNode(tools))
-    builder.add_node("summarizer", summarize_conversation)
+    # add nodes (each timed in the node latency histogram, see metrics.py)
+    builder.add_node("guardrails", instrument_node("guardrails", speculative_guardrail_node if speculative else guardrail_node))
+    builder.add_node("blocked", instrument_node("blocked", blocked_response_node))
+    builder.add_node("chatbot", instrument_node("chatbot", chatbot))
+    # ToolNode behind a per-turn memo: repeated read-only calls are not executed twice
+    builder.add_node("tools", instrument_node("tools", MemoizedToolNode(tools)))
+    # Intentionally unreachable from START: a write-attribution target, not a step of the turn.
+    # The background summarizer (memory.py) runs summarize_conversation itself after a turn and
+    # writes the result with `aupdate_state(..., as_node=SUMMARIZER_NODE)`, which LangGraph only
+    # accepts for a registered node. Removing the node (or its edge to END) breaks compaction.
+    builder.add_node(SUMMARIZER_NODE, instrument_node(SUMMARIZER_NODE, summarize_conversation))
+    if response_cache:
+        builder.add_node("cache_lookup", instrument_node("cache_lookup", response_cache_lookup_node))
+        builder.add_node("cache_store", instrument_node("cache_store", response_cache_store_node))
+    agent_entry = "cache_lookup" if response_cache else "chatbot"
+    if router:
+        builder.add_node("router", instrument_node("router", router_node))
+    after_guardrails = "router" if router else agent_entry
 
     # add edges
-    # Guardrail runs first, before the costlier summarizer/chatbot calls,
+    # Guardrail runs first, before the costlier chatbot call,
     # so a blocked message never reaches the LLM agent or its tools.
     builder.add_edge(START, "guardrails")
-    builder.add_conditional_edges(
-        "guardrails",
-        should_continue_after_guardrails,
-        {
-            "PASS": "summarizer",
-            "BLOCK": "blocked",
-            # Fail-open on classifier error: this is a defense-in-depth layer,
-            # not the only control (see tools.py/db.py fixes), so an
-            # unavailable guardrail shouldn't take down ordering entirely.
-            "ERROR": "summarizer",
-        },
-    )
+    if speculative:
+        # Local verdicts continue down the serial path; remote verdicts come back with the
+        # (gated) first chatbot answer, which then continues to tools or ends the turn.
+        builder.add_conditional_edges(
+            "guardrails",
+            route_after_speculative,
+            {"BLOCK": "blocked", "LOCAL": after_guardrails, "tools": "tools", END: END},
+        )
+    else:
+        builder.add_conditional_edges(
+            "guardrails",
+            should_continue_after_guardrails,
+            {
+                "PASS": after_guardrails,
+                "BLOCK": "blocked",
+                # Fail-open on classifier error: this is a defense-in-depth layer,
+                # not the only control (see tools.py/db.py fixes), so an
+                # unavailable guardrail shouldn't take down ordering entirely.
+                "ERROR": after_guardrails,
+            },
+        )
     builder.add_edge("blocked", END)
-    builder.add_edge("summarizer", "chatbot")
-    builder.add_conditional_edges("chatbot", tools_condition)
+    builder.add_edge(SUMMARIZER_NODE, END)  # summary writes end there; see the node's comment above
+    if router:
+        # Simple status / cancel / exact-menu orders are answered without the LLM
+        builder.add_conditional_edges("router", route_after_router, {"HANDLED": END, "FALLTHROUGH": agent_entry})
+    if response_cache:
+        # Near-duplicate FAQ questions are answered from the cache without the agent;
+        # final answers of cacheable turns are stored on the way out.
+        builder.add_conditional_edges("cache_lookup", route_after_cache_lookup, {"HIT": END, "MISS": "chatbot"})
+        builder.add_conditional_edges("chatbot", tools_condition, {"tools": "tools", END: "cache_store"})
+        builder.add_edge("cache_store", END)
+    else:
+        builder.add_conditional_edges("chatbot", tools_condition)
     builder.add_edge("tools", "chatbot")
 
     try:
-        graph = builder.compile(checkpointer=memory)
+        graph = builder.compile(checkpointer=checkpointer or get_checkpointer())
         logger.info("✅ Graph built successfully")
         return graph
     except Exception as e:
         logger.error(f"❌ Failed to build graph: {str(e)}")
         raise
 
+_graph = None
+_graph_lock = threading.Lock()
+
+def get_graph():
+    """Return the process-wide compiled graph, building it on first use.
+
+    The compiled graph holds no conversation state (that lives in the checkpointer, keyed
+    by thread id), so one instance serves every session.
+    """
+    global _graph
+    with _graph_lock:
+        if _graph is None:
+            _graph = build_graph()
+        return _graph
+
 def save_graph_diagram(graph, output_path: str) -> None:
     """Save the LangGraph workflow diagram as a PNG file."""
     try:
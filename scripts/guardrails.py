@@ -1,28 +1,97 @@
 import asyncio
+import hashlib
 import json
+import re
+import threading
+import time
 from typing import Any, Literal
 
 from langchain_core.messages import HumanMessage
 
+from scripts.budget import get_token_ledger, ledger_scope, usage_tokens
+from scripts.cache import TTLCache
 from scripts.config import (
     GUARDRAIL_BLOCK_THRESHOLD,
     GUARDRAIL_BORDERLINE_THRESHOLD,
+    GUARDRAIL_CACHE_MAX_ENTRIES,
+    GUARDRAIL_CACHE_TTL_SECONDS,
     GUARDRAIL_MODEL_NAME,
+    GUARDRAIL_PREFILTER_ENABLED,
     GUARDRAIL_TIMEOUT_SECONDS,
 )
 from scripts.logger import get_logger
+from scripts.router import CONFIRM_REPLIES, DECLINE_REPLIES, classify_message, normalize_message
+from scripts.tokens import message_tokens
 from scripts.utils import configure_llm
 
 logger = get_logger(__name__)
 
 BLOCKED_RESPONSE = "I can't process that request. How can I help with your order?"
 
-async def guardrail_node(state: dict[str, Any]) -> dict[str, Any]:
-    """Classify incoming user messages for prompt-injection risk before the chatbot runs."""
-    messages = state.get("messages", []) or []
-    if not messages:
-        return {"guardrail_status": "PASS", "guardrail_score": 0.0}
+# Short replies that carry no instructions and never need the remote classifier.
+# Includes every reply the fast-path router acts on, so router turns never wait on the remote model.
+SAFE_REPLIES = CONFIRM_REPLIES | DECLINE_REPLIES | {
+    "thanks", "thank you", "thx", "cancel", "done", "hi", "hello", "hey", "bye", "goodbye",
+    "menu", "show menu", "show me the menu",
+}
+PREFILTER_MAX_CHARS = 60
+_PREFILTER_CHARSET = re.compile(r"^[A-Za-z0-9 ,.!?'#&+\-]+$")
+
+_verdict_cache = TTLCache(GUARDRAIL_CACHE_MAX_ENTRIES, GUARDRAIL_CACHE_TTL_SECONDS)
+# Updated from every session's event loop; only touch it through _count() / _record_remote_seconds()
+_stats_lock = threading.Lock()
+guardrail_stats = {
+    "messages": 0,
+    "prefilter_passes": 0,
+    "cache_hits": 0,
+    "remote_calls": 0,
+    "remote_errors": 0,
+    "remote_seconds_avg": 0.0,
+    "latency_saved_seconds": 0.0,
+}
+
+
+def _verdict_key(message_content: str) -> str:
+    """Hash of the whitespace/case-normalized message, used as the verdict cache key."""
+    normalized = " ".join(message_content.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def is_trivially_safe(message_content: str, menu: dict[str, float] | None = None) -> bool:
+    """Cheap local prefilter: short, plain-charset messages that are a bare reply, a number,
+    or a status/cancel/cart message the fast-path router parses strictly against `menu`.
 
+    No I/O: carts are only recognized when the caller already holds the menu.
+    """
+    if len(message_content) > PREFILTER_MAX_CHARS or not _PREFILTER_CHARSET.match(message_content):
+        return False
+    normalized = normalize_message(message_content)
+    if normalized in SAFE_REPLIES or normalized.lstrip("#").isdigit():
+        return True
+    if not any(ch.isdigit() for ch in normalized) and not re.search(r"\b(?:a|an|one|two|three)\b", normalized):
+        return False
+    intent = classify_message(message_content, menu or {})
+    return intent is not None and intent["intent"] in ("status", "cancel", "order")
+
+
+def _count(key: str, amount: float = 1) -> None:
+    with _stats_lock:
+        guardrail_stats[key] += amount
+
+def _record_remote_seconds(elapsed: float) -> None:
+    """Fold one remote call's latency into the running average."""
+    with _stats_lock:
+        previous = guardrail_stats["remote_seconds_avg"]
+        guardrail_stats["remote_seconds_avg"] = elapsed if not previous else 0.8 * previous + 0.2 * elapsed
+
+def _record_saved() -> None:
+    """Credit one avoided remote call, valued at the running average remote latency."""
+    with _stats_lock:
+        guardrail_stats["latency_saved_seconds"] += guardrail_stats["remote_seconds_avg"] or GUARDRAIL_TIMEOUT_SECONDS / 2
+
+def latest_user_text(state: dict[str, Any]) -> str | None:
+    """Return the content of the latest user message in the state, or None if there is none."""
+    messages = state.get("messages", []) or []
     latest_user_message = None
     for message in reversed(messages):
         if isinstance(message, dict):
@@ -34,21 +103,59 @@ async def guardrail_node(state: dict[str, Any]) -> dict[str, Any]:
             break
 
     if latest_user_message is None:
-        return {"guardrail_status": "PASS", "guardrail_score": 0.0}
+        return None
 
     message_content = latest_user_message.get("content", "") if isinstance(latest_user_message, dict) else getattr(latest_user_message, "content", "") or ""
     if not isinstance(message_content, str):
         message_content = json.dumps(message_content)
+    return message_content
+
 
+def local_verdict(message_content: str, menu: dict[str, float] | None = None) -> dict[str, Any] | None:
+    """Verdict available without the remote classifier (prefilter or verdict cache), else None.
+
+    `menu` is the menu the caller already holds (the thread state's), used to recognize carts.
+    """
     if not message_content.strip():
         return {"guardrail_status": "PASS", "guardrail_score": 0.0}
 
+    _count("messages")
+    try:
+        if GUARDRAIL_PREFILTER_ENABLED and is_trivially_safe(message_content, menu):
+            _count("prefilter_passes")
+            _record_saved()
+            logger.info("Guardrail PASS (local prefilter)")
+            return {"guardrail_status": "PASS", "guardrail_score": 0.0}
+    except Exception as e:
+        logger.error(f"Guardrail prefilter failed, using remote classifier: {e}")
+
+    cached = _verdict_cache.get(_verdict_key(message_content))
+    if cached is not None:
+        _count("cache_hits")
+        _record_saved()
+        logger.info("Guardrail %s (cached): score=%.4f", cached["guardrail_status"], cached["guardrail_score"])
+        return dict(cached)
+    return None
+
+
+async def remote_verdict(message_content: str, state: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Classify a message with the remote guardrail model and cache the verdict.
+
+    With `state`, the call's tokens are recorded in the token ledger for the current turn.
+    """
     try:
         llm = configure_llm(GUARDRAIL_MODEL_NAME, streaming=False)
+        _count("remote_calls")
+        started = time.perf_counter()
         response = await asyncio.wait_for(
             llm.ainvoke([HumanMessage(content=message_content)], config={"callbacks": []}),
             timeout=GUARDRAIL_TIMEOUT_SECONDS,
         )
+        _record_remote_seconds(time.perf_counter() - started)
+
+        if state is not None:
+            prompt_tokens = message_tokens(HumanMessage(content=message_content))
+            get_token_ledger().record(*ledger_scope(state), "guardrails", **usage_tokens(response, prompt_tokens))
 
         guardrail_score = float(response.content)
 
@@ -62,20 +169,51 @@ async def guardrail_node(state: dict[str, Any]) -> dict[str, Any]:
             status = "PASS"
             logger.info("Guardrail PASS: score=%.4f", guardrail_score)
 
-        return {
+        verdict = {
             "guardrail_status": status,
             "guardrail_score": guardrail_score,
         }
+        # Only real verdicts are cached; timeouts and errors are retried next time
+        _verdict_cache.set(_verdict_key(message_content), verdict)
+        return dict(verdict)
     except asyncio.TimeoutError:
+        _count("remote_errors")
         logger.error("Guardrail evaluation timed out after %.1fs", GUARDRAIL_TIMEOUT_SECONDS)
         return {"guardrail_status": "ERROR", "guardrail_score": None}
     except (ValueError, TypeError) as e:
+        _count("remote_errors")
         logger.error(f"Guardrail returned non-numeric score: {e}")
         return {"guardrail_status": "ERROR", "guardrail_score": None}
     except Exception as e:
+        _count("remote_errors")
         logger.error(f"Guardrail evaluation failed: {e}")
         return {"guardrail_status": "ERROR", "guardrail_score": None}
 
+
+async def guardrail_node(state: dict[str, Any]) -> dict[str, Any]:
+    """Classify incoming user messages for prompt-injection risk before the chatbot runs."""
+    message_content = latest_user_text(state)
+    if message_content is None:
+        return {"guardrail_status": "PASS", "guardrail_score": 0.0}
+
+    verdict = local_verdict(message_content, state.get("menu"))
+    if verdict is not None:
+        return verdict
+    return await remote_verdict(message_content, state)
+
+
+def get_guardrail_stats() -> dict[str, Any]:
+    """Counters of prefilter passes, verdict cache hits, remote classifications and latency saved."""
+    with _stats_lock:
+        stats = dict(guardrail_stats)
+    handled_locally = stats["prefilter_passes"] + stats["cache_hits"]
+    messages = stats["messages"]
+    return {
+        **stats,
+        "skipped_fraction": round(handled_locally / messages, 3) if messages else 0.0,
+        "verdict_cache": _verdict_cache.stats(),
+    }
+
 async def should_continue_after_guardrails(state: dict[str, Any]) -> Literal["PASS", "BLOCK", "ERROR"]:
     """Routing function for the LangGraph conditional edge.
     Returns only the status key; the graph's BLOCK node should return
@@ -0,0 +1,168 @@
+"""
+# DineMate LLM Registry 🔌
+
+This module keeps one long-lived chat client per (model, streaming, temperature) and
+routes all of them through shared HTTP connection pools, so the chat, summarizer and
+guardrail models stop evicting each other and re-opening TLS connections to Groq.
+
+Sync requests share one `httpx` pool. Async requests share one pool per event loop,
+since pooled connections cannot move between loops: streamed replies all run on one
+long-lived loop (`event_loops.get_reply_loop()`) and reuse its pool, the background
+summarizer has its own, and a loop of a one-off `asyncio.run()` (scripts, benchmarks)
+gets a pool that is dropped once the loop closes.
+Every key counts its requests and newly opened TCP connections, which gives the
+connection-reuse ratio. The module has no Streamlit dependency.
+
+## Dependencies
+- `httpx`: For pooled HTTP clients and transports 🌐.
+- `langchain_groq`: For the ChatGroq client 🤖.
+- `threading`: For guarding the registry 🔒.
+- `logger`: For logging 📜.
+"""
+
+import asyncio, threading, weakref
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from langchain_groq import ChatGroq
+from scripts.config import GROQ_API_KEY, TEMPERATURE, LLM_MAX_CONNECTIONS, LLM_KEEPALIVE_SECONDS
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+LLMKey = Tuple[str, bool, float]
+
+@dataclass
+class ConnectionStats:
+    """📊 Request and connection counters for one registry key."""
+    requests: int = 0
+    connections_opened: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        return max(self.requests - self.connections_opened, 0)
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.connections_reused / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "connections_reused": self.connections_reused, "reuse_ratio": round(self.reuse_ratio, 3)}
+
+class _LoopLocalTransport(httpx.AsyncBaseTransport):
+    """🔁 Async transport that keeps a separate connection pool for each running event loop."""
+
+    def __init__(self, limits: httpx.Limits):
+        self._limits = limits
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for stale in [l for l in self._pools if l.is_closed()]:
+                # Connections of a closed loop are unusable; drop them so they get collected
+                del self._pools[stale]
+            pool = self._pools.get(loop)
+            if pool is None:
+                pool = self._pools[loop] = httpx.AsyncHTTPTransport(limits=self._limits)
+            return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+class LLMRegistry:
+    """🔌 Long-lived chat clients keyed by (model, streaming, temperature) over shared connection pools."""
+
+    def __init__(self, base_url: Optional[str] = None, max_connections: int = LLM_MAX_CONNECTIONS,
+                 keepalive_seconds: float = LLM_KEEPALIVE_SECONDS):
+        self.base_url = base_url
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                              keepalive_expiry=keepalive_seconds)
+        self._sync_transport = httpx.HTTPTransport(limits=limits)
+        self._async_transport = _LoopLocalTransport(limits)
+        self._clients: Dict[LLMKey, Any] = {}
+        self._stats: Dict[LLMKey, ConnectionStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name: str, streaming: bool = True, temperature: Optional[float] = None) -> LLMKey:
+        return (model_name, bool(streaming), float(TEMPERATURE if temperature is None else temperature))
+
+    def get(self, model_name: str, streaming: bool = True, temperature: Optional[float] = None,
+            force_reload: bool = False):
+        """Return the client for this key, creating it on first use.
+
+        `force_reload` rebuilds the client object but keeps the pooled connections.
+        """
+        key = self.key(model_name, streaming, temperature)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or force_reload:
+                logger.info(f"🔄 Configuring LLM → {key}")
+                client = self._clients[key] = self._build(key)
+            return client
+
+    def register(self, model_name: str, client: Any, streaming: bool = True, temperature: Optional[float] = None) -> None:
+        """Install a prebuilt client (e.g. a fake model for benchmarks) under a key."""
+        with self._lock:
+            self._clients[self.key(model_name, streaming, temperature)] = client
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-key request/connection counters, keyed by "model|streaming|temperature"."""
+        with self._lock:
+            return {"|".join(map(str, key)): stats.as_dict() for key, stats in self._stats.items()}
+
+    def close(self) -> None:
+        """Close the shared sync pool and forget every client."""
+        with self._lock:
+            self._sync_transport.close()
+            self._clients.clear()
+
+    def _build(self, key: LLMKey) -> ChatGroq:
+        model_name, streaming, temperature = key
+        stats = self._stats.setdefault(key, ConnectionStats())
+
+        def on_trace(event: str, info: dict) -> None:
+            if event == "connection.connect_tcp.complete":
+                stats.connections_opened += 1
+
+        async def on_trace_async(event: str, info: dict) -> None:
+            on_trace(event, info)
+
+        def on_request(request: httpx.Request) -> None:
+            stats.requests += 1
+            request.extensions["trace"] = on_trace
+
+        async def on_request_async(request: httpx.Request) -> None:
+            stats.requests += 1
+            request.extensions["trace"] = on_trace_async
+
+        # Thin per-key clients over the shared transports: one pool, per-key counters
+        http_client = httpx.Client(transport=self._sync_transport, event_hooks={"request": [on_request]})
+        http_async_client = httpx.AsyncClient(transport=self._async_transport, event_hooks={"request": [on_request_async]})
+        return ChatGroq(
+            model_name=model_name,
+            temperature=temperature,
+            groq_api_key=GROQ_API_KEY.get_secret_value(),
+            streaming=streaming,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            **({"base_url": self.base_url} if self.base_url else {}),
+        )
+
+_registry: Optional[LLMRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_llm_registry() -> LLMRegistry:
+    """Return the process-wide LLM registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMRegistry()
+        return _registry
@@ -0,0 +1,194 @@
+"""
+# DineMate Conversation Memory 🧠
+
+This module compacts long conversations in the background, after the reply has been
+streamed, instead of making the user wait for a summarizer LLM call before every
+long turn.
+
+After each turn `BackgroundSummarizer.schedule()` queues a compaction of the thread on
+a dedicated event loop. Once the history exceeds its token budget, the compaction reads
+the checkpoint, summarizes the messages older than the recent window, and writes the
+new summary plus `RemoveMessage` pruning back into the checkpoint (as the `summarizer`
+node), so the next turn starts from the compact state.
+
+Concurrency:
+- At most one compaction runs per thread; scheduling while one is in flight is a no-op.
+- Turns and checkpoint writes for a thread are serialized by `thread_guard()`: the
+  summary is computed without holding it, but written only between turns, after
+  re-reading the checkpoint, and only for messages that still exist.
+
+## Dependencies
+- `asyncio`: For waiting on per-thread guards ⚙️.
+- `threading`: For per-thread guards 🔒.
+- `event_loops`: For the summarizer's own background event loop 🔁.
+- `agent`: For the summarizer 🤖.
+- `tokens`: For the compaction budget and per-thread token counts 🔢.
+- `metrics`: For summarizer latency 📈.
+- `logger`: For logging 📜.
+"""
+
+import asyncio, threading, time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+from langchain_core.messages import RemoveMessage
+from scripts.agent import summarize_conversation
+from scripts.event_loops import BackgroundLoop
+from scripts.metrics import get_metrics
+from scripts.tokens import compaction_cut, count_message_tokens, count_tokens
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+SUMMARIZER_NODE = "summarizer"
+
+# ===== Per-thread guard ====
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_lock = threading.Lock()
+
+def _thread_lock(thread_id: str) -> threading.Lock:
+    with _thread_locks_lock:
+        return _thread_locks.setdefault(thread_id, threading.Lock())
+
+@asynccontextmanager
+async def thread_guard(thread_id: str, poll_seconds: float = 0.01):
+    """🔒 Serialize turns and background checkpoint writes of one conversation thread.
+
+    Works across event loops and OS threads (turns run on the reply loop, compaction on its own),
+    and waits without blocking the running loop.
+    """
+    while True:
+        lock = _thread_lock(thread_id)
+        while not lock.acquire(blocking=False):
+            await asyncio.sleep(poll_seconds)
+        if _thread_locks.get(thread_id) is lock:
+            break
+        lock.release()  # released by `release_thread()` while we waited: take the current lock
+    try:
+        yield
+    finally:
+        lock.release()
+
+def release_thread(thread_id: str) -> None:
+    """Drop the in-process state of an inactive thread: its turn guard (unless held) and token counts."""
+    with _thread_locks_lock:
+        lock = _thread_locks.get(thread_id)
+        if lock is not None and lock.acquire(blocking=False):
+            del _thread_locks[thread_id]
+            lock.release()
+    if _summarizer is not None:
+        _summarizer.forget(thread_id)
+
+# ===== Compaction ====
+def _thread_id(config: Dict[str, Any]) -> str:
+    return str(config["configurable"]["thread_id"])
+
+def thread_token_counts(values: Dict[str, Any]) -> Dict[str, int]:
+    """Prompt tokens a thread's state contributes to the next turn: history and summary."""
+    history, summary = count_message_tokens(values.get("messages", [])), count_tokens(values.get("summary", ""))
+    return {"history_tokens": history, "summary_tokens": summary, "prompt_tokens": history + summary}
+
+async def compact_thread(graph, config: Dict[str, Any]) -> bool:
+    """Summarize a thread's older messages and write the result back to its checkpoint.
+
+    Returns True when a new summary was written.
+    """
+    snapshot = await graph.aget_state(config)
+    values = snapshot.values or {}
+    if compaction_cut(values.get("messages", [])) == 0:
+        return False
+    update = await summarize_conversation(values, config)
+    if not update.get("summary"):
+        return False
+    async with thread_guard(_thread_id(config)):
+        # The user may have sent another message meanwhile: prune only what still exists
+        current = await graph.aget_state(config)
+        present = {m.id for m in (current.values or {}).get("messages", [])}
+        removals = [m for m in update["messages"] if isinstance(m, RemoveMessage) and m.id in present]
+        await graph.aupdate_state(config, {"summary": update["summary"], "messages": removals}, as_node=SUMMARIZER_NODE)
+    logger.info({"thread_id": _thread_id(config), "removed": len(removals), "message": "🧠 Conversation compacted"})
+    return True
+
+class BackgroundSummarizer:
+    """🧠 Runs conversation compaction on a long-lived background event loop."""
+
+    def __init__(self):
+        self._loop = BackgroundLoop("dinemate-summarizer")
+        self._inflight: Dict[str, Any] = {}
+        self._token_counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self.counters = {"scheduled": 0, "skipped_inflight": 0, "compacted": 0, "failed": 0, "seconds": 0.0}
+
+    def schedule(self, graph, config: Dict[str, Any]) -> bool:
+        """Queue a compaction of the thread in `config`. Returns False if one is already running."""
+        thread_id = _thread_id(config)
+        with self._lock:
+            running = self._inflight.get(thread_id)
+            if running is not None and not running.done():
+                self.counters["skipped_inflight"] += 1
+                return False
+            self.counters["scheduled"] += 1
+            future = self._loop.submit(self._run(graph, config))
+            self._inflight[thread_id] = future
+        future.add_done_callback(lambda f: self._done(thread_id, f))
+        return True
+
+    async def _run(self, graph, config: Dict[str, Any]) -> bool:
+        start = time.perf_counter()
+        try:
+            with get_metrics().timer("dinemate_node_seconds", "dinemate_node_errors_total", node=SUMMARIZER_NODE):
+                compacted = await compact_thread(graph, config)
+        except Exception as e:
+            self.counters["failed"] += 1
+            logger.error({"error": str(e), "message": "❌ Background summarization failed"})
+            return False
+        if compacted:
+            self.counters["compacted"] += 1
+            self.counters["seconds"] += time.perf_counter() - start
+        try:
+            counts = thread_token_counts((await graph.aget_state(config)).values or {})
+            with self._lock:
+                self._token_counts[_thread_id(config)] = counts
+        except Exception as e:
+            logger.error({"error": str(e), "message": "❌ Token count failed"})
+        return compacted
+
+    def _done(self, thread_id: str, future) -> None:
+        with self._lock:
+            if self._inflight.get(thread_id) is future:
+                del self._inflight[thread_id]
+
+    def wait(self, thread_id: Optional[str] = None, timeout: Optional[float] = None) -> None:
+        """Block until the compaction of `thread_id` (or of every thread) has finished."""
+        with self._lock:
+            futures = [f for t, f in self._inflight.items() if thread_id is None or t == thread_id]
+        for future in futures:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+
+    def token_counts(self, thread_id: Optional[str] = None) -> Dict[str, Any]:
+        """Latest prompt token counts per thread (after compaction), or of one thread."""
+        with self._lock:
+            if thread_id is not None:
+                return dict(self._token_counts.get(thread_id, {}))
+            return {t: dict(c) for t, c in self._token_counts.items()}
+
+    def forget(self, thread_id: str) -> None:
+        with self._lock:
+            self._token_counts.pop(thread_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, "inflight": len(self._inflight)}
+
+_summarizer: Optional[BackgroundSummarizer] = None
+_summarizer_lock = threading.Lock()
+
+def get_background_summarizer() -> BackgroundSummarizer:
+    """Return the process-wide background summarizer."""
+    global _summarizer
+    with _summarizer_lock:
+        if _summarizer is None:
+            _summarizer = BackgroundSummarizer()
+        return _summarizer
@@ -0,0 +1,298 @@
+"""
+# DineMate Metrics 📈
+
+This module records where a chatbot turn's time goes and exposes it in the Prometheus
+text format, offline (no external service needed):
+
+- Latency histograms for every graph node (guardrail, router, chatbot, tools, ...), every
+  chatbot tool and every async database query, plus the background summarizer.
+- Per turn: time to first visible token, total turn time and the number of tool loops.
+- Error counters next to each histogram, so error rates are `errors / count`.
+
+`instrument_node()` and `instrument_tool()` wrap graph nodes and tools, `timed()` wraps
+any other sync or async function. `start_metrics_server()` serves `/metrics` on
+`METRICS_HOST:METRICS_PORT`; the admin "Metrics" page reads the same registry.
+
+Metrics are kept in process memory and reset when the app restarts.
+
+## Dependencies
+- `bisect`: For histogram bucket lookup 🔍.
+- `http.server`: For the local `/metrics` endpoint 🌐.
+- `langgraph.errors` (imported on the first error): For telling control flow from node failures 🚦.
+- `logger`: For logging 📜.
+"""
+
+import functools, inspect, threading, time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from scripts.config import METRICS_HOST, METRICS_PORT
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13)
+
+# Metric name -> (help text, histogram buckets or None for a counter)
+METRICS = {
+    "dinemate_node_seconds": ("Graph node latency", LATENCY_BUCKETS),
+    "dinemate_node_errors_total": ("Graph node calls that raised", None),
+    "dinemate_tool_seconds": ("Chatbot tool latency", LATENCY_BUCKETS),
+    "dinemate_tool_errors_total": ("Chatbot tool calls that raised or returned an error status", None),
+    "dinemate_db_query_seconds": ("Async database query latency", LATENCY_BUCKETS),
+    "dinemate_db_query_errors_total": ("Async database queries that raised", None),
+    "dinemate_time_to_first_token_seconds": ("Time from user message to first visible reply text", LATENCY_BUCKETS),
+    "dinemate_turn_seconds": ("Time from user message to end of reply", LATENCY_BUCKETS),
+    "dinemate_turn_tool_loops": ("Tool node executions per turn", COUNT_BUCKETS),
+    "dinemate_turn_errors_total": ("Turns that failed", None),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """📊 Cumulative-bucket histogram, Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate of the q-quantile, interpolated within its bucket."""
+        if not self.count:
+            return None
+        rank, seen, lower = q * self.count, 0, 0.0
+        for upper, n in zip(self.buckets, self.counts):
+            if n and seen + n >= rank:
+                return lower + (upper - lower) * (rank - seen) / n
+            seen, lower = seen + n, upper
+        return self.buckets[-1]  # in the +Inf bucket: report the largest finite bound
+
+class MetricsRegistry:
+    """📈 Process-wide histograms and counters keyed by metric name and labels."""
+
+    def __init__(self, definitions: Dict[str, Tuple[str, Optional[Sequence[float]]]] = METRICS):
+        self.definitions = definitions
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.definitions[name][1])
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name: str, errors: Optional[str] = None, **labels: str) -> Iterator[None]:
+        """Observe the duration of the `with` block; count it in `errors` if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            if errors and not _is_control_flow(e):
+                self.inc(errors, **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def summary(self, name: str, errors: Optional[str] = None) -> List[Dict[str, Any]]:
+        """One row per label set of histogram `name`: count, errors, mean / p50 / p95 / p99."""
+        with self._lock:
+            series = [(labels, h) for (n, labels), h in self._histograms.items() if n == name]
+            rows = []
+            for labels, h in sorted(series, key=lambda item: item[0]):
+                failed = self._counters.get((errors, labels), 0) if errors else 0
+                rows.append({**dict(labels), "count": h.count, "errors": int(failed),
+                             "error_rate": failed / h.count if h.count else 0.0,
+                             "mean": h.sum / h.count if h.count else None,
+                             "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99)})
+            return rows
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            for name, (help_text, buckets) in self.definitions.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {'counter' if buckets is None else 'histogram'}"]
+                if buckets is None:
+                    for (n, labels), value in sorted(self._counters.items()):
+                        if n == name:
+                            lines.append(f"{name}{_labels(labels)} {value:g}")
+                    continue
+                for (n, labels), h in sorted(self._histograms.items(), key=lambda item: item[0]):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for upper, count in zip(h.buckets + (float("inf"),), h.counts):
+                        cumulative += count
+                        le = "+Inf" if upper == float("inf") else f"{upper:g}"
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {h.sum:.6f}")
+                    lines.append(f"{name}_count{_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+def _is_control_flow(error: Exception) -> bool:
+    """Interrupts and parent commands (LangGraph's `GraphBubbleUp`) are control flow, not failures."""
+    try:
+        # Imported here: the database layer records metrics without loading LangGraph
+        from langgraph.errors import GraphBubbleUp
+    except ImportError:
+        return False
+    return isinstance(error, GraphBubbleUp)
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry()
+        return _metrics
+
+# ===== Instrumentation ====
+def timed(name: str, errors: Optional[str] = None, **labels: str) -> Callable:
+    """Decorator: observe each call of a sync or async function (or callable object) in histogram `name`."""
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(getattr(fn, "__call__", None)):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with get_metrics().timer(name, errors, **labels):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_metrics().timer(name, errors, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def instrument_node(node: str, fn: Callable) -> Callable:
+    """Wrap a graph node (function or callable object) with latency and error metrics.
+
+    The wrapper keeps the node's signature, so LangGraph still passes `config` and
+    friends to nodes that ask for them.
+    """
+    return timed("dinemate_node_seconds", "dinemate_node_errors_total", node=node)(fn)
+
+_INSTRUMENTED = "__dinemate_instrumented__"  # marks a tool function already wrapped by `instrument_tool`
+
+def instrument_tool(tool: Any) -> Any:
+    """Time a LangChain tool's function in place; error-status results count as errors.
+
+    Idempotent: a tool instrumented again (e.g. on a module reload) is timed once.
+    """
+    name = tool.name
+
+    def check(result: Any) -> Any:
+        if isinstance(result, dict) and result.get("status") == "error":
+            get_metrics().inc("dinemate_tool_errors_total", tool=name)
+        return result
+
+    if tool.coroutine is not None and not getattr(tool.coroutine, _INSTRUMENTED, False):
+        coroutine = tool.coroutine
+
+        @functools.wraps(coroutine)
+        async def timed_coroutine(*args, **kwargs):
+            with get_metrics().timer("dinemate_tool_seconds", "dinemate_tool_errors_total", tool=name):
+                return check(await coroutine(*args, **kwargs))
+        setattr(timed_coroutine, _INSTRUMENTED, True)
+        tool.coroutine = timed_coroutine
+    if tool.func is not None and not getattr(tool.func, _INSTRUMENTED, False):
+        func = tool.func
+
+        @functools.wraps(func)
+        def timed_func(*args, **kwargs):
+            with get_metrics().timer("dinemate_tool_seconds", "dinemate_tool_errors_total", tool=name):
+                return check(func(*args, **kwargs))
+        setattr(timed_func, _INSTRUMENTED, True)
+        tool.func = timed_func
+    return tool
+
+class TurnMetrics:
+    """⏱️ Time to first token, duration and tool loops of one chatbot turn."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or get_metrics()
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.tool_loops = 0
+
+    def node_finished(self, node: str) -> None:
+        if node == "tools":
+            self.tool_loops += 1
+
+    def token(self) -> None:
+        """Mark visible reply text; only the first call is recorded."""
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.started
+            self.registry.observe("dinemate_time_to_first_token_seconds", self.first_token)
+
+    def finish(self, failed: bool = False) -> None:
+        self.registry.observe("dinemate_turn_seconds", time.perf_counter() - self.started)
+        self.registry.observe("dinemate_turn_tool_loops", self.tool_loops)
+        if failed:
+            self.registry.inc("dinemate_turn_errors_total")
+
+# ===== Endpoint ====
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = get_metrics().render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # scrapes are not worth a log line each
+        pass
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> Optional[ThreadingHTTPServer]:
+    """Serve `/metrics` on a daemon thread (once per process). `port <= 0` disables it."""
+    global _server
+    with _server_lock:
+        if _server is None and port > 0:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                logger.error({"error": str(e), "host": host, "port": port, "message": "❌ Metrics endpoint not started"})
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="dinemate-metrics", daemon=True).start()
+            logger.info({"url": f"http://{host}:{_server.server_port}/metrics", "message": "📈 Metrics endpoint started"})
+        return _server
@@ -1,6 +1,6 @@
 """Utility helpers for order validation and price recomputation."""
 
-import json
+import json, re
 from typing import Any
 
 from scripts.db import AsyncDatabase
@@ -108,3 +108,57 @@ async def recompute_total_price(items: dict) -> tuple[float | None, str | None]:
         total_price += price_value * quantity_value
 
     return total_price, None
+
+
+_QUANTITY_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+                   "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+_ITEM_SEPARATOR = re.compile(r"\s*(?:,(?:\s*and\b)?|&|\+|\band\b|\bplus\b)\s*")
+
+
+def match_order_items(text: str, menu: dict, max_quantity: int = 50) -> dict | None:
+    """Strictly parse a cart like "2 cheese burgers and a pepsi" against exact menu names.
+
+    Every part of the text must be a quantity followed by a menu item name (singular
+    or plural, case-insensitive); anything else makes the whole parse fail.
+
+    Args:
+        text: The cart text, without any leading "I'd like" style phrase.
+        menu: Mapping of menu item names to prices.
+        max_quantity: Largest quantity accepted per item.
+
+    Returns:
+        A dictionary mapping menu item names to quantities, or None if the text is not a clean cart.
+    """
+    names = {}
+    for name in menu:
+        lowered = str(name).lower()
+        for form in (lowered, lowered + "s", lowered + "es"):
+            names.setdefault(form, name)
+    # Longest names first, so "fish and chips" wins over the "and" separator
+    forms = sorted(names, key=len, reverse=True)
+
+    rest, items = text.lower().strip(), {}
+    while rest:
+        match = re.match(r"(\d+|[a-z]+)\s+", rest)
+        if not match:
+            return None
+        token = match.group(1)
+        quantity = int(token) if token.isdigit() else _QUANTITY_WORDS.get(token)
+        if not quantity or quantity > max_quantity:
+            return None
+        rest = rest[match.end():]
+        form = next((f for f in forms if rest.startswith(f) and re.match(r"\W|$", rest[len(f):len(f) + 1])), None)
+        if form is None:
+            return None
+        items[names[form]] = items.get(names[form], 0) + quantity
+        rest = rest[len(form):]
+        separator = _ITEM_SEPARATOR.match(rest)
+        if separator and separator.end():
+            rest = rest[separator.end():]
+            if not rest:
+                return None  # dangling "and"
+        elif rest.strip():
+            return None
+        else:
+            rest = ""
+    return items or None
@@ -0,0 +1,227 @@
+"""
+# DineMate Response Cache 💾
+
+This module implements an opt-in semantic cache for FAQ-style turns ("what's on the
+menu", "who made you", "is the veggie burger vegetarian").
+
+User messages are normalized and embedded locally with hashed word and character
+n-grams (CPU only, no model download), and a near-duplicate of a previously answered
+question is served from the cache instead of running the chatbot.
+Entries are keyed on a hash of the menu, so any price or item change invalidates
+them, and a cached answer is only reused for a question about the same menu items.
+
+Only standalone questions are cached: messages with digits (quantities, order ids)
+or words that depend on the conversation or the customer ("yes", "that", "my", "I",
+"ordered", "paid") are skipped. A turn is only stored when its answer came from the
+menu, price or developer tools (and no other tool), so an answer the LLM wrote from
+one customer's conversation is never served to another.
+
+## Dependencies
+- `zlib`: For stable feature hashing 🔢.
+- `langchain_core.messages`: For message types 💬.
+- `cache`: For the bounded TTL store ⏳.
+- `db`: For the menu version 🗄️.
+- `logger`: For logging 📜.
+"""
+
+import hashlib, json, math, re, threading, time, zlib
+from typing import Any, Dict, FrozenSet, List, Literal, Optional, Tuple
+from langchain_core.messages import AIMessage
+from scripts.cache import TTLCache
+from scripts.config import (RESPONSE_CACHE_THRESHOLD, RESPONSE_CACHE_MAX_ENTRIES,
+                            RESPONSE_CACHE_TTL_SECONDS)
+from scripts.db import AsyncDatabase
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+EMBEDDING_DIMS = 1024
+READ_ONLY_TOOLS = {"get_full_menu", "get_prices_for_items", "introduce_developer"}
+
+_STOPWORDS = {"a", "an", "the", "is", "are", "am", "be", "do", "does", "can", "could", "would", "will",
+              "please", "pls", "you", "your", "me", "i", "s", "of", "to", "in", "on", "for", "at", "what",
+              "whats", "tell", "show", "give", "see", "have", "has", "get", "know", "any", "some", "about",
+              "hi", "hello", "hey", "there", "us", "we"}
+# Words whose meaning depends on earlier turns or on who is asking, so the answer is not reusable
+_CONTEXT_WORDS = {"yes", "yeah", "yep", "no", "nope", "ok", "okay", "sure", "confirm", "confirmed", "that",
+                  "it", "this", "those", "these", "them", "same", "again", "instead", "previous",
+                  "i", "im", "ive", "id", "my", "mine", "myself", "our", "ours",
+                  "did", "ordered", "paid", "pay", "charged", "charge", "billed", "placed", "bought", "spent",
+                  "receipt", "refund"}
+_MIN_WORDS, _MAX_WORDS = 2, 25
+
+# ===== Text features ====
+def normalize_query(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    text = text.lower().replace("'", "")
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+def is_cacheable_query(text: str) -> bool:
+    """Whether a user message is a standalone question whose answer can be reused."""
+    words = normalize_query(text).split()
+    if not _MIN_WORDS <= len(words) <= _MAX_WORDS:
+        return False
+    return not any(ch.isdigit() for ch in text) and not _CONTEXT_WORDS.intersection(words)
+
+def embed(text: str, dims: int = EMBEDDING_DIMS) -> Dict[int, float]:
+    """Sparse, L2-normalized hashed n-gram vector of a message.
+
+    Content words and their character trigrams are hashed into `dims` buckets, so
+    spelling variants ("burger" / "burgers") still overlap.
+    """
+    words = [w for w in normalize_query(text).split() if w not in _STOPWORDS]
+    features: List[str] = [f"w:{w}" for w in words]
+    features += [f"b:{a}_{b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"#{word}#"
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    vector: Dict[int, float] = {}
+    for feature in features:
+        bucket = zlib.crc32(feature.encode()) % dims
+        vector[bucket] = vector.get(bucket, 0.0) + (2.0 if feature[0] == "w" else 1.0)
+    norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {k: v / norm for k, v in vector.items()}
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+def menu_version(menu: Dict[str, float]) -> str:
+    """Short stable hash of the menu (names and prices)."""
+    return hashlib.sha1(json.dumps(menu, sort_keys=True).encode()).hexdigest()[:12]
+
+def mentioned_items(text: str, menu: Dict[str, float]) -> FrozenSet[str]:
+    """Menu items named in a message, matched on normalized names (singular or plural)."""
+    padded = f" {normalize_query(text)} "
+    found = set()
+    for name in menu:
+        item = normalize_query(name)
+        if f" {item} " in padded or f" {item}s " in padded:
+            found.add(name)
+    return frozenset(found)
+
+# ===== Cache ====
+class ResponseCache:
+    """💾 Near-duplicate question → answer store, scoped to one menu version."""
+
+    def __init__(self, threshold: float = RESPONSE_CACHE_THRESHOLD, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.threshold = threshold
+        self._entries = TTLCache(max_entries, ttl_seconds)
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.counters = {"lookups": 0, "hits": 0, "stores": 0, "skipped": 0, "latency_saved_seconds": 0.0}
+
+    def _use_version(self, version: str) -> None:
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    logger.info({"old": self._version, "new": version, "message": "💾 Menu changed, response cache cleared"})
+                self._entries.clear()
+                self._version = version
+
+    def lookup(self, query: str, menu: Dict[str, float]) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Return (entry, similarity) for the best cached match of `query`, or (None, best_similarity)."""
+        self._use_version(menu_version(menu))
+        self.counters["lookups"] += 1
+        normalized, items = normalize_query(query), mentioned_items(query, menu)
+        entry = self._entries.get(normalized)
+        if entry is not None:
+            return entry, 1.0
+        vector, best, best_score = embed(query), None, 0.0
+        for _, candidate in self._entries.items():
+            if candidate["items"] != items:
+                continue
+            score = cosine(vector, candidate["vector"])
+            if score > best_score:
+                best, best_score = candidate, score
+        if best is not None and best_score >= self.threshold:
+            self._entries.get(best["normalized"])  # refresh LRU position
+            return best, best_score
+        return None, best_score
+
+    def record_hit(self, entry: Dict[str, Any], lookup_seconds: float) -> None:
+        self.counters["hits"] += 1
+        self.counters["latency_saved_seconds"] += max(entry["cost_seconds"] - lookup_seconds, 0.0)
+
+    def store(self, query: str, menu: Dict[str, float], answer: str, cost_seconds: float) -> None:
+        self._use_version(menu_version(menu))
+        normalized = normalize_query(query)
+        self._entries.set(normalized, {"normalized": normalized, "vector": embed(query), "answer": answer,
+                                       "items": mentioned_items(query, menu), "cost_seconds": cost_seconds})
+        self.counters["stores"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["lookups"]
+        return {**self.counters, "entries": len(self._entries), "menu_version": self._version,
+                "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0}
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+# ===== Graph nodes ====
+def _latest_turn(messages: list) -> Tuple[Optional[str], list]:
+    """Return the content of the latest user message and the messages after it."""
+    for index in range(len(messages) - 1, -1, -1):
+        if getattr(messages[index], "type", None) == "human":
+            content = messages[index].content
+            return (content if isinstance(content, str) else None), messages[index + 1:]
+    return None, []
+
+async def response_cache_lookup_node(state: dict) -> dict:
+    """Serve a cached answer for a near-duplicate FAQ question, or record the turn start for storing."""
+    start = time.time()
+    query, _ = _latest_turn(state.get("messages", []))
+    cache = get_response_cache()
+    if not query or not is_cacheable_query(query):
+        cache.counters["skipped"] += 1
+        return {"response_cache": {"status": "SKIP"}}
+    try:
+        async with AsyncDatabase() as db:
+            menu = await db.load_menu()
+        entry, score = cache.lookup(query, menu)
+    except Exception as e:
+        logger.error({"error": str(e), "message": "❌ Response cache lookup failed"})
+        return {"response_cache": {"status": "SKIP"}}
+
+    if entry is None:
+        return {"response_cache": {"status": "MISS", "started": start, "menu_version": menu_version(menu)}}
+    lookup_seconds = time.time() - start
+    cache.record_hit(entry, lookup_seconds)
+    logger.info({"similarity": round(score, 3), "saved_seconds": round(entry["cost_seconds"] - lookup_seconds, 3),
+                 "message": "💾 Response cache hit"})
+    return {"messages": [AIMessage(content=entry["answer"])], "response_cache": {"status": "HIT"}}
+
+def route_after_cache_lookup(state: dict) -> Literal["HIT", "MISS"]:
+    """Routing function: end the turn on a cache hit, otherwise continue to the agent."""
+    return "HIT" if (state.get("response_cache") or {}).get("status") == "HIT" else "MISS"
+
+async def response_cache_store_node(state: dict) -> dict:
+    """Store the final answer of a cacheable turn that was answered by read-only tools only."""
+    marker = state.get("response_cache") or {}
+    if marker.get("status") != "MISS":
+        return {}
+    query, turn = _latest_turn(state.get("messages", []))
+    if not query or not turn or not isinstance(turn[-1], AIMessage) or not turn[-1].content:
+        return {}
+    tools_used = {call["name"] for msg in turn for call in (getattr(msg, "tool_calls", None) or [])}
+    if not tools_used or not tools_used <= READ_ONLY_TOOLS:
+        return {}  # answered from the conversation, or touched orders
+    try:
+        async with AsyncDatabase() as db:
+            menu = await db.load_menu()
+        if menu_version(menu) != marker.get("menu_version"):
+            return {}  # menu changed while the turn was running; the answer may be stale
+        get_response_cache().store(query, menu, turn[-1].content, time.time() - marker["started"])
+    except Exception as e:
+        logger.error({"error": str(e), "message": "❌ Response cache store failed"})
+    return {}
@@ -0,0 +1,211 @@
+"""
+# DineMate Fast-Path Router 🚦
+
+This module answers trivially parseable turns without the LLM: order status checks
+("status of order 162"), cancellations ("cancel 162") and carts naming exact menu
+items ("2 cheese burgers and a pepsi"). It calls the existing tools directly and
+renders the usual DineMate reply, so these turns take milliseconds instead of
+seconds. Anything it is not sure about falls through to the chatbot.
+
+Actions that change an order follow the same confirm-first flow as the agent: the
+router shows the order table (or the order to cancel), keeps it as the pending
+action, and only calls `save_order` / `cancel_order` when the next message is a
+plain "yes". Any other reply drops the pending action.
+
+Only fresh turns are fast-pathed: when the chatbot's last reply asked the customer
+something ("what would you like to add?", "shall I confirm?"), the answer belongs to
+the chatbot's flow, so "2 cheese burgers" there is not taken as a new order.
+
+## Dependencies
+- `re`: For intent patterns 🔍.
+- `langchain_core.messages`: For the reply message 💬.
+- `tools`: For check_order_status, cancel_order and save_order 🛠️.
+- `order_utils`: For strict cart parsing 🛒.
+- `db`: For the menu 🗄️.
+- `logger`: For logging 📜.
+"""
+
+import re, threading, time
+from collections import Counter
+from typing import Any, Dict, Literal, Optional
+from langchain_core.messages import AIMessage
+from scripts.db import AsyncDatabase
+from scripts.logger import get_logger
+from scripts.order_utils import match_order_items
+from scripts.tools import cancel_order, check_order_status, save_order
+
+logger = get_logger(__name__)
+
+CLOSING = "Anything else I can help with? 😊"
+ROUTER_SOURCE = "router"  # response_metadata["source"] of the router's replies
+
+_ORDER_ID = r"(?:order\s+)?(?:no\.?\s+|number\s+|id\s+)?#?(\d{1,9})"
+_STATUS_PATTERNS = [
+    re.compile(rf"^(?:whats\s+|what\s+is\s+|check\s+)?(?:the\s+)?status\s+(?:of\s+|for\s+)?(?:my\s+)?{_ORDER_ID}$"),
+    re.compile(rf"^(?:where\s+is|track)\s+(?:my\s+)?{_ORDER_ID}$"),
+    re.compile(r"^order\s+#?(\d{1,9})\s+status$"),
+]
+_CANCEL_PATTERN = re.compile(rf"^cancel\s+(?:my\s+)?{_ORDER_ID}$")
+_ORDER_PREFIX = re.compile(r"^(?:i\s+want\s+|i\s+would\s+like\s+|id\s+like\s+|can\s+i\s+(?:get|have)\s+|"
+                           r"could\s+i\s+(?:get|have)\s+|give\s+me\s+|(?:i\s+)?(?:want\s+to\s+)?order\s+)")
+CONFIRM_REPLIES = {"yes", "y", "yeah", "yep", "sure", "ok", "okay", "confirm", "confirmed", "yes confirm", "yes please",
+        "go ahead", "place it", "place the order", "yes place it", "do it"}
+DECLINE_REPLIES = {"no", "n", "nope", "no thanks", "dont", "never mind", "nevermind", "not now"}
+
+# ===== Intent classification ====
+def normalize_message(text: str) -> str:
+    """Lowercase, drop apostrophes, trailing punctuation and polite padding."""
+    text = text.lower().replace("'", "").replace("’", "").strip()
+    text = re.sub(r"[?!.]+$", "", text).strip()
+    text = re.sub(r"^(?:hi|hello|hey)[,!\s]+", "", text)
+    text = re.sub(r"^please\s+|[,\s]+please$", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def classify_message(text: str, menu: Dict[str, float], pending: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Return the high-confidence intent of a message, or None to let the LLM handle it.
+
+    Intents: {"intent": "status"|"cancel", "order_id": int}, {"intent": "order", "items": {...}},
+    and {"intent": "confirm"|"decline"} when `pending` holds an action awaiting confirmation.
+    Any other reply to a pending action is classified as a fresh message.
+    """
+    message = normalize_message(text)
+    if pending and message in CONFIRM_REPLIES:
+        return {"intent": "confirm"}
+    if pending and message in DECLINE_REPLIES:
+        return {"intent": "decline"}
+    for pattern in _STATUS_PATTERNS:
+        match = pattern.match(message)
+        if match:
+            return {"intent": "status", "order_id": int(match.group(1))}
+    match = _CANCEL_PATTERN.match(message)
+    if match:
+        return {"intent": "cancel", "order_id": int(match.group(1))}
+    if menu and (any(ch.isdigit() for ch in message) or re.search(r"\b(?:a|an|one|two|three)\b", message)):
+        items = match_order_items(_ORDER_PREFIX.sub("", message), menu or {})
+        if items:
+            return {"intent": "order", "items": items}
+    return None
+
+def order_table(items: Dict[str, int], menu: Dict[str, float]) -> str:
+    """Render the standard order summary table."""
+    rows, total = [], 0.0
+    for item, qty in items.items():
+        subtotal = menu[item] * qty
+        total += subtotal
+        rows.append(f"| {item} | {qty} | ${menu[item]:.2f} | ${subtotal:.2f} |")
+    header = "| Item | Qty | Unit Price | Subtotal |\n|------|-----|------------|----------|\n"
+    return header + "\n".join(rows) + f"\n\n**Total: ${total:.2f}**"
+
+# ===== Stats ====
+class RouterStats:
+    """🚦 Per-intent counters of routed turns."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.handled: Counter = Counter()
+        self.handled_seconds = 0.0
+
+    def record(self, intent: Optional[str], seconds: float = 0.0) -> None:
+        with self._lock:
+            self.turns += 1
+            if intent:
+                self.handled[intent] += 1
+                self.handled_seconds += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            handled = sum(self.handled.values())
+            return {"turns": self.turns, "handled": handled, "fell_through": self.turns - handled,
+                    "handled_fraction": round(handled / self.turns, 3) if self.turns else 0.0,
+                    "by_intent": dict(self.handled),
+                    "avg_handled_ms": round(self.handled_seconds / handled * 1000, 2) if handled else 0.0}
+
+router_stats = RouterStats()
+
+# ===== Graph node ====
+_CLOSING_LINE = re.compile(r"anything else(?: i can help (?:you )?with)?\s*\?", re.IGNORECASE)
+
+def _latest_user_text(messages: list) -> Optional[str]:
+    for message in reversed(messages):
+        if getattr(message, "type", None) == "human":
+            return message.content if isinstance(message.content, str) else None
+    return None
+
+def awaiting_chatbot_reply(messages: list) -> bool:
+    """Whether the latest user message answers a question the chatbot asked in its last reply.
+
+    The standard closing line ("Anything else I can help with?") does not count; replies
+    of the router itself never do, as its own confirmations are kept in `pending_action`.
+    """
+    seen_user = False
+    for message in reversed(messages):
+        kind = getattr(message, "type", None)
+        if kind == "human":
+            if seen_user:
+                return False
+            seen_user = True
+        elif kind == "ai" and seen_user and isinstance(message.content, str) and message.content:
+            if message.response_metadata.get("source") == ROUTER_SOURCE:
+                return False
+            text = _CLOSING_LINE.sub("", message.content)
+            return "?" in text or re.search(r"\bconfirm", text, re.IGNORECASE) is not None
+    return False
+
+def _reply(content: str, pending: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    message = AIMessage(content=content, response_metadata={"source": ROUTER_SOURCE})
+    return {"messages": [message], "router_status": "HANDLED", "pending_action": pending}
+
+async def _handle(intent: Dict[str, Any], menu: Dict[str, float], pending: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    kind = intent["intent"]
+    if kind == "status":
+        result = await check_order_status.ainvoke({"order_id": str(intent["order_id"])})
+        return _reply(f"📦 Order {intent['order_id']}: {result}\n\n{CLOSING}")
+    if kind == "cancel":
+        return _reply(f"❌ Cancel order **{intent['order_id']}**? Reply **yes** to confirm or **no** to keep it.",
+                      pending={"intent": "cancel", "order_id": intent["order_id"]})
+    if kind == "order":
+        table = order_table(intent["items"], menu)
+        return _reply(f"🍔 Here's your order:\n\n{table}\n\nReply **yes** to confirm ✅ or **no** to cancel ❌.",
+                      pending={"intent": "order", "items": intent["items"]})
+    if kind == "decline":
+        what = "Order not placed" if pending["intent"] == "order" else f"Order {pending['order_id']} kept"
+        return _reply(f"👍 {what}.\n\n{CLOSING}")
+    # confirm
+    if pending["intent"] == "cancel":
+        result = await cancel_order.ainvoke({"order_id": str(pending["order_id"])})
+        return _reply(f"❌ {result}\n\n{CLOSING}")
+    result = await save_order.ainvoke({"order_details": {"items": pending["items"]}})
+    if result.get("status") == "success":
+        return _reply(f"✅ {result['message']}\n\n{order_table(pending['items'], menu)}\n\n{CLOSING}")
+    return _reply(f"⚠️ {result.get('message', 'Order could not be saved.')}\n\n{CLOSING}")
+
+async def router_node(state: dict) -> dict:
+    """Answer simple status / cancel / order turns directly, or fall through to the agent."""
+    start = time.perf_counter()
+    messages = state.get("messages", [])
+    text, pending = _latest_user_text(messages), state.get("pending_action")
+    fall_through = {"router_status": "FALLTHROUGH", "pending_action": None}
+    if not text or (not pending and awaiting_chatbot_reply(messages)):
+        router_stats.record(None)
+        return fall_through
+    try:
+        async with AsyncDatabase() as db:
+            menu = await db.load_menu() or {}
+        intent = classify_message(text, menu, pending)
+        if intent is None:
+            router_stats.record(None)
+            return fall_through
+        update = await _handle(intent, menu, pending)
+    except Exception as e:
+        logger.error({"error": str(e), "message": "❌ Fast-path router failed, falling through"})
+        router_stats.record(None)
+        return fall_through
+    elapsed = time.perf_counter() - start
+    router_stats.record(intent["intent"], elapsed)
+    logger.info({"intent": intent["intent"], "ms": round(elapsed * 1000, 2), "message": "🚦 Handled by fast-path router"})
+    return update
+
+def route_after_router(state: dict) -> Literal["HANDLED", "FALLTHROUGH"]:
+    """Routing function: end the turn when the router answered it."""
+    return "HANDLED" if state.get("router_status") == "HANDLED" else "FALLTHROUGH"
@@ -0,0 +1,120 @@
+"""
+# DineMate Chat Sessions 🪪
+
+This module gives every authenticated browser session its own conversation thread,
+instead of one thread shared by every customer on the server.
+
+- A thread id is `<username>:<random session id>`, created on the session's first chat
+  turn, so two customers (or two logins of one customer) never share a checkpoint or
+  wait on each other's turn guard.
+- `SessionRegistry` tracks live threads. Threads idle longer than `SESSION_IDLE_SECONDS`,
+  and the least recently used beyond `MAX_LIVE_THREADS`, are released: their in-process
+  state (turn guard, token counts, cached latest checkpoint) is dropped while their
+  checkpoints stay in the SQLite store, so a returning customer continues where they
+  left off.
+- Logging out ends the session and deletes its thread.
+
+## Dependencies
+- `collections`: For least-recently-used ordering 📚.
+- `checkpointer`: For releasing / deleting stored threads 💾.
+- `memory`: For releasing turn guards and token counts 🧠.
+- `logger`: For logging 📜.
+"""
+
+import threading, time, uuid
+from collections import OrderedDict
+from typing import Any, Dict, MutableMapping, Optional
+from scripts.checkpointer import get_checkpointer
+from scripts.config import MAX_LIVE_THREADS, SESSION_IDLE_SECONDS
+from scripts.memory import release_thread
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+THREAD_ID_KEY = "thread_id"  # st.session_state key holding the session's thread id
+
+class SessionRegistry:
+    """🪪 Live conversation threads, released when idle or beyond the live-thread cap."""
+
+    def __init__(self, idle_seconds: float = SESSION_IDLE_SECONDS, max_live: int = MAX_LIVE_THREADS):
+        self.idle_seconds = idle_seconds
+        self.max_live = max(1, max_live)
+        self._live: "OrderedDict[str, float]" = OrderedDict()  # thread id -> last activity, oldest first
+        self._lock = threading.Lock()
+        self.counters = {"opened": 0, "ended": 0, "released_idle": 0, "released_cap": 0}
+
+    def open(self, username: str) -> str:
+        """Create the thread of a new chat session."""
+        thread_id = f"{username}:{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self.counters["opened"] += 1
+        self.touch(thread_id)
+        logger.info({"thread_id": thread_id, "message": "🪪 Chat session opened"})
+        return thread_id
+
+    def touch(self, thread_id: str, now: Optional[float] = None) -> None:
+        """Mark a thread active, then release idle and over-cap threads."""
+        now = time.monotonic() if now is None else now
+        released = []
+        with self._lock:
+            self._live[thread_id] = now
+            self._live.move_to_end(thread_id)
+            while self._live:
+                oldest, last_active = next(iter(self._live.items()))
+                if now - last_active > self.idle_seconds:
+                    self.counters["released_idle"] += 1
+                elif len(self._live) > self.max_live:
+                    self.counters["released_cap"] += 1
+                else:
+                    break
+                del self._live[oldest]
+                released.append(oldest)
+        for old in released:
+            self._release(old)
+
+    def end(self, thread_id: str) -> None:
+        """End a session: its thread is released and its checkpoints deleted."""
+        with self._lock:
+            self._live.pop(thread_id, None)
+            self.counters["ended"] += 1
+        self._release(thread_id)
+        try:
+            get_checkpointer().delete_thread(thread_id)
+        except Exception as e:
+            logger.error({"error": str(e), "thread_id": thread_id, "message": "❌ Thread deletion failed"})
+
+    @staticmethod
+    def _release(thread_id: str) -> None:
+        release_thread(thread_id)
+        get_checkpointer().release(thread_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, "live": len(self._live)}
+
+_registry: Optional[SessionRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_session_registry() -> SessionRegistry:
+    """Return the process-wide session registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SessionRegistry()
+        return _registry
+
+def session_thread_id(session_state: MutableMapping[str, Any]) -> str:
+    """Thread id of a Streamlit session (created on first use), marked active."""
+    registry = get_session_registry()
+    thread_id = session_state.get(THREAD_ID_KEY)
+    if thread_id is None:
+        thread_id = session_state[THREAD_ID_KEY] = registry.open(session_state.get("username") or "guest")
+    else:
+        registry.touch(thread_id)
+    return thread_id
+
+def end_session(session_state: MutableMapping[str, Any]) -> None:
+    """End the chat session of a Streamlit session, if it has one."""
+    thread_id = session_state.pop(THREAD_ID_KEY, None)
+    if thread_id is not None:
+        get_session_registry().end(thread_id)
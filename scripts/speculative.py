@@ -0,0 +1,131 @@
+"""
+# DineMate Speculative Turn ⚡
+
+This module implements speculative mode (`SPECULATIVE_MODE=true`): when a message
+needs the remote guardrail classifier, the classifier and the first chatbot LLM call
+start at the same time instead of one after the other.
+
+The chatbot's streamed tokens are held in a gate until the verdict arrives:
+- PASS (or a fail-open ERROR): buffered tokens are released to the graph's custom
+  stream and the rest stream live, so the user sees the answer as soon as both the
+  verdict and the first tokens exist.
+- BLOCK: the chatbot call is cancelled and nothing it produced is shown.
+
+Tool calls are only executed by the `tools` node after this node returns, so no tool
+side effect can happen before the verdict. Messages with a local verdict (prefilter
+or verdict cache) skip speculation and take the normal serial path.
+
+## Dependencies
+- `asyncio`: For running the guardrail and the chatbot concurrently ⚡.
+- `langchain_core.callbacks`: For the token gate 🚧.
+- `langgraph.config`: For the custom stream writer 📡.
+- `guardrails`: For local and remote verdicts 🛡️.
+- `agent`: For the chatbot 🤖.
+- `logger`: For logging 📜.
+"""
+
+import asyncio, threading, time
+from typing import Any, Callable, Dict, List, Literal
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
+from langgraph.prebuilt import tools_condition
+from scripts.agent import chatbot
+from scripts.guardrails import latest_user_text, local_verdict, remote_verdict
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+# A speculated turn skips the router and response cache nodes, so clear what they would
+# have reset: a stale pending confirmation or a previous turn's cache marker.
+_SKIPPED_NODE_STATE = {"pending_action": None, "response_cache": {"status": "SKIP"}}
+
+# Updated from every session's event loop; only touch it through _count()
+_stats_lock = threading.Lock()
+speculative_stats = {"local_verdicts": 0, "speculated": 0, "released": 0, "cancelled": 0,
+                     "buffered_tokens": 0, "overlapped_guardrail_seconds": 0.0}
+
+def _count(key: str, amount: float = 1) -> None:
+    with _stats_lock:
+        speculative_stats[key] += amount
+
+def get_speculative_stats() -> Dict[str, Any]:
+    """Counters of local verdicts, speculated / released / cancelled turns and overlapped guardrail time."""
+    with _stats_lock:
+        return dict(speculative_stats)
+
+class TokenGate(AsyncCallbackHandler):
+    """🚧 Buffers streamed LLM tokens until `release()`, then forwards them to `writer`."""
+
+    def __init__(self, writer: Callable[[Any], None]):
+        self.writer = writer
+        self.buffer: List[Dict[str, Any]] = []
+        self.released = False
+
+    async def on_llm_new_token(self, token: str, *, chunk: Any = None, **kwargs: Any) -> None:
+        if not token:
+            return
+        message = getattr(chunk, "message", None)
+        item = {"type": "token", "id": getattr(message, "id", None), "content": token}
+        if self.released:
+            self.writer(item)
+        else:
+            self.buffer.append(item)
+
+    def release(self) -> int:
+        """Flush buffered tokens and stream the rest live. Returns the number flushed."""
+        self.released = True
+        flushed = len(self.buffer)
+        for item in self.buffer:
+            self.writer(item)
+        self.buffer.clear()
+        return flushed
+
+async def _speculative_answer(state: Dict[str, Any], config: RunnableConfig, gate: TokenGate) -> Dict[str, Any]:
+    """Run the first chatbot call with its streamed tokens going to `gate`."""
+    return await chatbot(state, config={**config, "callbacks": [gate]})
+
+async def speculative_guardrail_node(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+    """Guardrail node that overlaps the remote classification with the first chatbot call."""
+    message_content = latest_user_text(state)
+    if message_content is None:
+        return {"guardrail_status": "PASS", "guardrail_score": 0.0, "speculative_status": "LOCAL"}
+    verdict = local_verdict(message_content, state.get("menu"))
+    if verdict is not None:
+        _count("local_verdicts")
+        return {**verdict, "speculative_status": "LOCAL"}
+
+    _count("speculated")
+    gate = TokenGate(get_stream_writer())
+    started = time.perf_counter()
+    answer_task = asyncio.create_task(_speculative_answer(state, config, gate))
+    verdict = await remote_verdict(message_content, state)
+    verdict_seconds = time.perf_counter() - started
+
+    if verdict["guardrail_status"] == "BLOCK":
+        answer_task.cancel()
+        try:
+            await answer_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _count("cancelled")
+        logger.warning("Speculative chatbot call cancelled after guardrail BLOCK")
+        return {**verdict, **_SKIPPED_NODE_STATE, "speculative_status": "BLOCKED"}
+
+    flushed = gate.release()
+    _count("released")
+    _count("buffered_tokens", flushed)
+    answer = await answer_task
+    # Guardrail time the chatbot call overlapped, i.e. removed from the serial path
+    _count("overlapped_guardrail_seconds", verdict_seconds)
+    logger.info({"verdict_seconds": round(verdict_seconds, 3), "buffered_tokens": flushed,
+                 "message": "⚡ Speculative answer released"})
+    return {**verdict, **answer, **_SKIPPED_NODE_STATE, "speculative_status": "ANSWERED"}
+
+def route_after_speculative(state: Dict[str, Any]) -> Literal["BLOCK", "LOCAL", "tools", "__end__"]:
+    """Routing function: blocked, serial path (local verdict), or continue the speculative answer."""
+    if state.get("guardrail_status") == "BLOCK":
+        return "BLOCK"
+    if state.get("speculative_status") == "LOCAL":
+        return "LOCAL"
+    return tools_condition(state)
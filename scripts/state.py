@@ -6,34 +6,80 @@ This module defines the state structure for the DineMate foodbot.
 ## Dependencies
 - `typing`: For type hints.
 - `typing_extensions`: For TypedDict.
+- `json`: For comparing tool-call arguments.
 - `langgraph.graph.message`: For message handling.
 - `logger`: For logging.
 """
 
+import json
 from typing import Annotated
 from typing_extensions import TypedDict
-from langgraph.graph.message import add_messages
+from langchain_core.messages import RemoveMessage, ToolMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES, add_messages
+from scripts.config import MAX_STATE_MESSAGES
 from scripts.logger import get_logger
 
 logger = get_logger(__name__)
 
+SUPERSEDED_PREFIX = "[superseded:"
+
+# Read-only tools whose older result is superseded by a later call with the same arguments
+SUPERSEDABLE_TOOLS = {"get_full_menu", "get_prices_for_items", "check_order_status", "get_order_details",
+                      "introduce_developer"}
+
 def prune_messages(left: list, right: list) -> list:
-    """Prune old get_full_menu tool messages to reduce token usage."""
+    """Bounded `add_messages`: cap the history and drop superseded read-only tool outputs.
+
+    - Keeps the newest `MAX_STATE_MESSAGES` messages, never starting on a tool result
+      whose tool call was dropped.
+    - Replaces the output of an older read-only tool call (e.g. `get_full_menu`) with a
+      short placeholder once the same call was made again, so every tool call keeps a result.
+    - Ignores removals of messages the cap already dropped.
+    """
+    if isinstance(right, list):
+        present = {getattr(m, "id", None) for m in left}
+        right = [m for m in right
+                 if not (isinstance(m, RemoveMessage) and m.id != REMOVE_ALL_MESSAGES and m.id not in present)]
     combined = add_messages(left, right)
-    # Keep last 10 messages, and exclude old get_full_menu ToolMessages
-    filtered = []
-    for msg in combined[-10:]:  # Limit to last 10 messages
-        if isinstance(msg, dict) and msg.get("type") == "tool" and msg.get("name") == "get_full_menu":
-            continue  # Skip old get_full_menu ToolMessages
-        filtered.append(msg)
-    return filtered
+
+    calls = {call["id"]: (call["name"], json.dumps(call.get("args", {}), sort_keys=True, default=str))
+             for msg in combined for call in (getattr(msg, "tool_calls", None) or [])}
+    latest: dict = {}
+    for index, msg in enumerate(combined):
+        key = calls.get(getattr(msg, "tool_call_id", None)) if isinstance(msg, ToolMessage) else None
+        if key and key[0] in SUPERSEDABLE_TOOLS:
+            previous = latest.get(key)
+            if previous is not None and not str(combined[previous].content).startswith(SUPERSEDED_PREFIX):
+                old = combined[previous]
+                combined[previous] = ToolMessage(content=f"{SUPERSEDED_PREFIX} see later {key[0]} result]",
+                                                 tool_call_id=old.tool_call_id, name=old.name, id=old.id)
+            latest[key] = index
+
+    if len(combined) > MAX_STATE_MESSAGES:
+        combined = combined[find_safe_cut(combined, len(combined) - MAX_STATE_MESSAGES):]
+    return combined
+
+def find_safe_cut(messages: list, index: int) -> int:
+    """Move a cut point earlier until it does not separate tool results from their tool call.
+
+    `messages[:index]` may be summarized away; `messages[index:]` must not start with a
+    tool result whose calling AI message would be gone.
+    """
+    index = max(0, min(index, len(messages)))
+    while 0 < index < len(messages) and getattr(messages[index], "type", None) == "tool":
+        index -= 1
+    return index
 
 class State(TypedDict):
-    messages: Annotated[list, add_messages]  # Use custom reducer
+    messages: Annotated[list, prune_messages]  # Bounded history (see prune_messages)
     summary: str  # Store summary of conversation
     menu: dict  # Store menu as a dict, not in messages
     guardrail_status: str
     guardrail_score: float
+    response_cache: dict  # Response cache status of the current turn (HIT / MISS / SKIP)
+    router_status: str  # Fast-path router outcome of the current turn (HANDLED / FALLTHROUGH)
+    pending_action: dict  # Router action awaiting the user's yes/no confirmation
+    speculative_status: str  # Speculative mode outcome (LOCAL / ANSWERED / BLOCKED)
 
     def __init__(self):
         logger.info("🍽️ State initialized")
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+# DineMate Stream Pipeline 🚰
+
+This module post-processes streamed LLM output before it reaches the UI, as a chain of
+small stages each chunk flows through:
+
+- `ThinkTagStripper`: drops `<think>...</think>` reasoning blocks (case-insensitive),
+  holding back only a possible partial tag at the end of a chunk.
+- `WhitespaceNormalizer`: drops leading and trailing whitespace of the reply and
+  collapses runs of blank lines.
+- `MarkdownTableBuffer`: holds markdown table rows until the table is complete, so the
+  UI never renders half a table.
+
+Each stage has `feed(text) -> str` and `flush() -> str` and looks at every character
+once: plain text is skipped with `str.find`, and only a `<` / line start is examined
+character by character. `apply_stages()` runs an async chunk stream through stages.
+
+## Dependencies
+- `re`: For collapsing blank lines 🔤.
+"""
+
+import re
+from typing import AsyncIterator, List, Protocol
+
+class StreamStage(Protocol):
+    """🚰 One streaming transformation: text in, text out, state kept between chunks."""
+
+    def feed(self, text: str) -> str: ...
+
+    def flush(self) -> str: ...
+
+class ThinkTagStripper:
+    """🧠 Removes `<think>...</think>` blocks and the newline right after a closing tag."""
+
+    OPEN, CLOSE = "<think>", "</think>"
+
+    def __init__(self):
+        self.inside = False
+        self._partial = ""  # original characters of a tag being matched
+        self._skip_newline = False
+
+    def feed(self, text: str) -> str:
+        out: List[str] = []
+        i, n = 0, len(text)
+        while i < n:
+            if self._partial:
+                tag = self.CLOSE if self.inside else self.OPEN
+                if text[i].lower() == tag[len(self._partial)]:
+                    self._partial += text[i]
+                    i += 1
+                    if len(self._partial) == len(tag):
+                        self._partial, self.inside = "", not self.inside
+                        self._skip_newline = not self.inside
+                    continue
+                # Not a tag after all: the held characters are ordinary text ("<" only starts a tag)
+                if not self.inside:
+                    out.append(self._partial)
+                self._partial = ""
+                continue  # re-examine this character
+            if self._skip_newline:
+                self._skip_newline = False
+                if text[i] == "\n":
+                    i += 1
+                    continue
+            j = text.find("<", i)
+            if j == -1:
+                if not self.inside:
+                    out.append(text[i:])
+                break
+            if not self.inside:
+                out.append(text[i:j])
+            self._partial, i = "<", j + 1
+        return "".join(out)
+
+    def flush(self) -> str:
+        partial, self._partial = self._partial, ""
+        return partial if not self.inside else ""
+
+class WhitespaceNormalizer:
+    """🧹 Strips the reply's leading / trailing whitespace and collapses 3+ line breaks into one blank line."""
+
+    _BLANK_LINES = re.compile(r"\n[ \t]*\n(?:[ \t]*\n)+")
+
+    def __init__(self):
+        self._started = False
+        self._pending = ""  # trailing whitespace, emitted only if more text follows
+
+    def feed(self, text: str) -> str:
+        text = text.replace("\r\n", "\n")
+        body = text.rstrip()
+        if not body:
+            self._pending += text
+            return ""
+        body, self._pending = self._pending + body, text[len(body):]
+        if not self._started:
+            body, self._started = body.lstrip(), True
+        return self._BLANK_LINES.sub("\n\n", body)
+
+    def flush(self) -> str:
+        self._pending = ""
+        return ""
+
+class MarkdownTableBuffer:
+    """📋 Holds markdown table rows (lines starting with `|`) until the table ends."""
+
+    def __init__(self):
+        self._at_line_start = True
+        self._in_table = False
+        self._indent = ""  # leading whitespace of a line not yet known to be a table row
+        self._held: List[str] = []
+
+    def feed(self, text: str) -> str:
+        out: List[str] = []
+        i, n = 0, len(text)
+        while i < n:
+            if self._at_line_start:
+                j = i
+                while j < n and text[j] in " \t":
+                    j += 1
+                self._indent += text[i:j]
+                i = j
+                if i == n:
+                    break
+                self._in_table = text[i] == "|"
+                if self._in_table:
+                    self._held.append(self._indent)
+                else:
+                    out.extend(self._held)  # first line after a table: release it whole
+                    self._held = []
+                    out.append(self._indent)
+                self._indent, self._at_line_start = "", False
+            k = text.find("\n", i)
+            end = n if k == -1 else k + 1
+            (self._held if self._in_table else out).append(text[i:end])
+            self._at_line_start, i = k != -1, end
+        return "".join(out)
+
+    def flush(self) -> str:
+        held, self._held = "".join(self._held) + self._indent, []
+        self._indent = ""
+        return held
+
+def default_stages() -> List[StreamStage]:
+    """Fresh stages for one chatbot reply: think stripping, whitespace, then table buffering."""
+    return [ThinkTagStripper(), WhitespaceNormalizer(), MarkdownTableBuffer()]
+
+def run_stages(stages: List[StreamStage], text: str) -> str:
+    for stage in stages:
+        if not text:
+            break
+        text = stage.feed(text)
+    return text
+
+async def apply_stages(chunks: AsyncIterator[str], stages: List[StreamStage]) -> AsyncIterator[str]:
+    """Yield the non-empty output of `stages` for an async stream of text chunks."""
+    async for chunk in chunks:
+        if chunk and (text := run_stages(stages, chunk)):
+            yield text
+    # End of stream: each stage's held text still goes through the stages after it
+    for i, stage in enumerate(stages):
+        if text := run_stages(stages[i + 1:], stage.flush()):
+            yield text
@@ -5,133 +5,226 @@ This module handles streaming updates for the DineMate foodbot UI using Streamli
 
 ## Dependencies
 - `langchain_core.callbacks`: For streaming callbacks.
-- `streamlit`: For UI rendering.
+- `streamlit`: For UI rendering (batched re-renders of streamed replies).
 - `graph`: For LangGraph workflow.
+- `memory`: For per-thread turn guards and background summarization.
+- `event_loops`: For the long-lived event loop replies run on.
+- `sessions`: For the session's conversation thread.
+- `metrics`: For time to first token, turn latency and tool loops per turn.
+- `tracing`: For the sampled root span of each turn.
+- `stream_pipeline`: For think stripping and output clean-up stages.
 - `logger`: For logging.
 """
 
-import streamlit as st, traceback
+import queue, streamlit as st, time, traceback
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.messages import AIMessage
-from scripts.graph import build_graph
+from scripts.config import STREAM_RENDER_INTERVAL_MS, STREAM_RENDER_MAX_CHARS
+from scripts.event_loops import get_reply_loop
+from scripts.graph import get_graph
+from scripts.memory import get_background_summarizer, thread_guard
+from scripts.metrics import TurnMetrics
+from scripts.tracing import TRACE_CONFIG_KEY, get_tracer
+from scripts.sessions import session_thread_id
+from scripts.stream_pipeline import ThinkTagStripper, apply_stages, default_stages
 from scripts.logger import get_logger
 
 logger = get_logger(__name__)
 
 class StreamHandler(BaseCallbackHandler):
-    def __init__(self, container, initial_text=""):
+    """🖥️ Renders a streamed reply into a Streamlit container, coalescing tokens into batches.
+
+    The container is re-rendered at most every `STREAM_RENDER_INTERVAL_MS`, or sooner once
+    `STREAM_RENDER_MAX_CHARS` of new text are pending, instead of once per token. Tokens are
+    collected in a list and joined only when rendered.
+    """
+
+    def __init__(self, container, initial_text="", interval_ms: float = STREAM_RENDER_INTERVAL_MS,
+                 max_chars: int = STREAM_RENDER_MAX_CHARS, clock: Callable[[], float] = time.monotonic):
         """Initialize the StreamHandler."""
         self.container = container
-        self.text = initial_text
+        self.interval = interval_ms / 1000
+        self.max_chars = max_chars
+        self.clock = clock
+        self._parts: List[str] = [initial_text] if initial_text else []
+        self._chars = self._bytes = len(initial_text)
+        self._pending = 0  # characters received since the last render
+        self._started = self._last_render = None
+        self.counters = {"tokens": 0, "renders": 0, "bytes_pushed": 0}
         logger.info("StreamHandler initialized")
 
+    @property
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
     def on_llm_new_token(self, token: str, **kwargs):
         """Handle new LLM tokens for streaming."""
-        self.text += token
+        self.write(token)
+
+    def write(self, token: str) -> None:
+        """Add streamed text; the container is re-rendered once the batch is due."""
+        if not token:
+            return
+        now = self.clock()
+        if self._started is None:
+            self._started = now
+        self._parts.append(token)
+        self._chars += len(token)
+        self._bytes += len(token.encode("utf-8"))
+        self._pending += len(token)
+        self.counters["tokens"] += 1
+        # The first token renders at once; later ones wait for the interval or a full batch
+        if self._last_render is None or now - self._last_render >= self.interval or self._pending >= self.max_chars:
+            self.render(now)
+
+    def render(self, now: Optional[float] = None) -> None:
+        """Push the full text received so far to the container."""
         self.container.markdown(self.text)
-        logger.debug(f"Received token: {token}")
+        self._last_render = self.clock() if now is None else now
+        self._pending = 0
+        self.counters["renders"] += 1
+        self.counters["bytes_pushed"] += self._bytes
+
+    def tick(self) -> None:
+        """Render pending text once the interval has passed, even when no new token arrived
+        (e.g. while a tool call stalls the stream)."""
+        if self._pending and self.clock() - self._last_render >= self.interval:
+            self.render()
+
+    def finish(self) -> str:
+        """Render any pending text, log the response's render stats and return the full text."""
+        if self._pending:
+            self.render()
+        logger.info({**self.stats(), "message": "🖥️ Streamed response rendered"})
+        return self.text
+
+    def stats(self) -> Dict[str, Any]:
+        """Render frequency and volume for the response so far."""
+        duration = (self._last_render - self._started) if self._started is not None and self._last_render is not None else 0.0
+        return {**self.counters, "chars": self._chars, "bytes": self._bytes, "duration_s": round(duration, 3),
+                "renders_per_s": round(self.counters["renders"] / duration, 1) if duration > 0 else None}
+
+_END_OF_STREAM = object()
+
+async def _pump(stream: AsyncIterator[str], chunks: queue.Queue) -> None:
+    try:
+        async with aclosing(stream):
+            async for chunk in stream:
+                chunks.put(chunk)
+    finally:
+        chunks.put(_END_OF_STREAM)
+
+def render_stream(stream: AsyncIterator[str], container=None, **handler_kwargs) -> str:
+    """Render an async text stream into `container` (a new `st.empty()` by default); returns the full text.
+
+    Replaces `st.write_stream`, which re-renders the whole reply on every chunk. The stream
+    runs on the long-lived reply loop (`get_reply_loop()`), so pooled LLM connections (kept
+    per loop) are reused across replies; the calling script thread only renders.
+    """
+    handler = StreamHandler(container if container is not None else st.empty(), **handler_kwargs)
+    chunks: queue.Queue = queue.Queue()
+    future = get_reply_loop().submit(_pump(stream, chunks))
+    try:
+        while True:
+            try:
+                chunk = chunks.get(timeout=handler.interval or None)
+            except queue.Empty:
+                handler.tick()  # the stream stalled: show the batched text now
+                continue
+            if chunk is _END_OF_STREAM:
+                break
+            handler.write(chunk)
+        future.result()  # re-raise an error of the stream
+    finally:
+        future.cancel()  # e.g. the script was stopped: close the stream on its loop
+    return handler.finish()
 
 async def filter_thinking_stream(async_gen):
     """Filters out any <think>...</think> block from the stream of chunks."""
-    buffer = ""
-    inside_think = False
-    
-    async for chunk in async_gen:
-        buffer += chunk
-        
-        while True:
-            if not inside_think:
-                # Find if START_TAG is in the buffer (case-insensitive)
-                idx = buffer.lower().find("<think>")
-                if idx != -1:
-                    # Yield everything before <think>
-                    text_to_yield = buffer[:idx]
-                    if text_to_yield:
-                        yield text_to_yield
-                    # Move past <think>
-                    buffer = buffer[idx + 7:]
-                    inside_think = True
-                else:
-                    # Check for partial match of <think> at the end of the buffer
-                    partial_match = False
-                    for i in range(1, len("<think>")):
-                        if buffer.lower().endswith("<think>"[:i]):
-                            text_to_yield = buffer[:-i]
-                            if text_to_yield:
-                                yield text_to_yield
-                            buffer = buffer[-i:]
-                            partial_match = True
-                            break
-                    if not partial_match:
-                        # No match and no partial match, yield the whole buffer
-                        if buffer:
-                            yield buffer
-                            buffer = ""
-                        break
-                    else:
-                        break
-            else:
-                # Inside think block, we look for END_TAG
-                idx = buffer.lower().find("</think>")
-                if idx != -1:
-                    # Move past </think>
-                    buffer = buffer[idx + 8:]
-                    # Strip leading newlines/whitespace that typically follow </think>
-                    if buffer.startswith("\n"):
-                        buffer = buffer[1:]
-                    inside_think = False
-                else:
-                    # Check for partial match of </think> at the end of the buffer
-                    partial_match = False
-                    for i in range(1, len("</think>")):
-                        if buffer.lower().endswith("</think>"[:i]):
-                            buffer = buffer[-i:]
-                            partial_match = True
-                            break
-                    if not partial_match:
-                        # Discard the whole buffer since we are inside <think> and no partial match of </think>
-                        buffer = ""
-                        break
-                    else:
-                        break
-    
-    # After generator is done, if we are not inside think, yield any remaining buffer
-    if not inside_think and buffer:
-        yield buffer
+    async for chunk in apply_stages(async_gen, [ThinkTagStripper()]):
+        yield chunk
 
-async def stream_graph_updates(user_query: str):
-    """Streams AI chatbot responses for a user query using LangGraph (Async)."""
-    
-    logger.info(f"Streaming query: {user_query}")
-    graph = st.session_state.get("graph")
-    if not graph:
-        logger.info("Graph not found, building new graph")
+async def iter_graph_text(graph, inputs: dict, config: dict, turn: Optional[TurnMetrics] = None):
+    """Yield the text of AI messages as the graph produces them.
+
+    Listens to LLM token streams ("messages") and to tokens released by speculative
+    mode ("custom"); a message already streamed through the custom channel is not
+    repeated when the node that produced it finishes. Finished nodes ("updates") are
+    reported to `turn`, which counts tool loops.
+    """
+    custom_ids = set()
+    modes = ["messages", "custom"] + (["updates"] if turn is not None else [])
+    async for mode, payload in graph.astream(inputs, config=config, stream_mode=modes):
+        if mode == "updates":
+            for node in payload or {}:
+                turn.node_finished(node)
+            continue
+        if mode == "custom":
+            if isinstance(payload, dict) and payload.get("type") == "token":
+                custom_ids.add(payload.get("id"))
+                yield payload["content"]
+            continue
+        message_chunk, _ = payload
+        if isinstance(message_chunk, AIMessage) and message_chunk.id not in custom_ids:
+            yield message_chunk.content
+
+async def stream_turn(graph, user_query: str, thread_id: str):
+    """Stream the reply to one user message of a conversation thread through the output stages.
+
+    The turn holds the thread's guard, so turns of one thread never interleave while
+    other threads run concurrently; compaction is scheduled after the reply.
+    """
+    config = {'configurable': {'thread_id': thread_id}}
+    turn = TurnMetrics()
+    # Root span of the turn's trace (sampled or not); nodes find it in their config
+    span = get_tracer().start_span("turn", thread_id=thread_id)
+    run_config = {'configurable': {**config['configurable'], TRACE_CONFIG_KEY: span}}
+    # No background summary may be written into the checkpoint while the turn runs
+    async with thread_guard(thread_id):
+        raw_stream = iter_graph_text(graph, {"messages": [{"role": "user", "content": user_query}]}, run_config, turn)
         try:
-            graph = build_graph()
-            st.session_state["graph"] = graph
-            logger.info("Graph initialized")
+            async for chunk in apply_stages(raw_stream, default_stages()):
+                turn.token()
+                yield chunk
         except Exception as e:
-            logger.error({
-                "error": str(e),
-                "error_type": type(e).__name__,
-                "traceback": traceback.format_exc(),
-                "message": "Failed to build graph"
-            })
+            turn.finish(failed=True)
+            span.end(e)
             raise
+        turn.finish()
+        span.set(tool_loops=turn.tool_loops, first_token_ms=round((turn.first_token or 0) * 1000, 1))
+        span.end()
+    # Compact long conversations after the reply, off the user's critical path
+    get_background_summarizer().schedule(graph, config)
 
-    config = {'configurable': {'thread_id': '5'}}
+def stream_graph_updates(user_query: str, thread_id: Optional[str] = None) -> AsyncIterator[str]:
+    """Streams AI chatbot responses for a user query using LangGraph (Async).
+
+    The conversation thread defaults to the current Streamlit session's own thread. It is
+    resolved on call, in the script thread: the returned stream may run on another thread.
+    """
+    
+    logger.info(f"Streaming query: {user_query}")
+    try:
+        # One compiled graph per process; sessions are told apart by their thread id only
+        graph = get_graph()
+    except Exception as e:
+        logger.error({
+            "error": str(e),
+            "error_type": type(e).__name__,
+            "traceback": traceback.format_exc(),
+            "message": "Failed to build graph"
+        })
+        raise
 
-    async def raw_stream():
-        async for message_chunk, _ in graph.astream(
-            {"messages": [{"role": "user", "content": user_query}]}, 
-            config=config, 
-            stream_mode="messages"
-        ):
-            if isinstance(message_chunk, AIMessage):
-                yield message_chunk.content
+    return _logged_turn(graph, user_query, thread_id or session_thread_id(st.session_state))
 
+async def _logged_turn(graph, user_query: str, thread_id: str):
     try:
-        async for chunk in filter_thinking_stream(raw_stream()):
+        async for chunk in stream_turn(graph, user_query, thread_id):
             yield chunk
     except Exception as e:
         logger.error({
@@ -0,0 +1,90 @@
+"""
+# DineMate Token Counting 🔢
+
+This module measures prompt sizes locally, without an API call, so conversation
+compaction can be driven by a token budget instead of a message count.
+
+Counts use `tiktoken` (`TOKENIZER_ENCODING`). tiktoken fetches the encoding file
+(a few MB) on first use and caches it in `TIKTOKEN_CACHE_DIR` (`database/tiktoken` by
+default); the Docker image fetches it at build time, so a running app never reaches
+the network. Copying the cached file into that directory works for offline installs.
+If the encoding can't be loaded, counts fall back to a word-piece estimate and a
+warning is logged. Either way they are meant for budgeting, not billing.
+
+## Dependencies
+- `tiktoken`: For BPE token counts 🔢.
+- `state`: For tool-call-safe cut points ✂️.
+- `logger`: For logging 📜.
+"""
+
+import json, math, os, re
+from typing import Any, Iterable, Optional
+from scripts.config import HISTORY_TOKEN_BUDGET, KEEP_RECENT_TOKENS, TIKTOKEN_CACHE_DIR, TOKENIZER_ENCODING
+from scripts.state import find_safe_cut
+from scripts.logger import get_logger
+
+try:
+    import tiktoken
+except ImportError:  # a requirement; a broken install still counts with the estimate
+    tiktoken = None
+
+logger = get_logger(__name__)
+
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators per chat message
+_WORD_PIECES = re.compile(r"\w+|[^\w\s]")
+_encoding: Any = None
+_encoding_loaded = False
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is None:
+            logger.warning({"message": "tiktoken not installed, estimating token counts"})
+            return None
+        os.environ["TIKTOKEN_CACHE_DIR"] = TIKTOKEN_CACHE_DIR  # read by tiktoken when it loads the file
+        try:
+            _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception as e:
+            logger.warning({"error": str(e), "cache_dir": TIKTOKEN_CACHE_DIR,
+                            "message": "tiktoken encoding unavailable, estimating token counts"})
+    return _encoding
+
+def count_tokens(text: Optional[str]) -> int:
+    """Number of tokens in `text` (tiktoken, or the estimate if its encoding is unavailable)."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # ~4 characters per token for words, one token per punctuation mark
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _WORD_PIECES.findall(text))
+
+def message_tokens(message: Any) -> int:
+    """Tokens of one chat message: its content, tool-call arguments and a fixed overhead."""
+    content = getattr(message, "content", "")
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    tokens = count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += count_tokens(call.get("name", "")) + count_tokens(json.dumps(call.get("args", {}), default=str))
+    return tokens
+
+def count_message_tokens(messages: Iterable[Any]) -> int:
+    return sum(message_tokens(m) for m in messages)
+
+def compaction_cut(messages: list, budget: int = HISTORY_TOKEN_BUDGET, keep_recent: int = KEEP_RECENT_TOKENS) -> int:
+    """Index splitting `messages` into a prefix to summarize and a suffix kept verbatim.
+
+    Returns 0 while the history fits in `budget`. Otherwise the suffix is the newest
+    messages fitting in `keep_recent` tokens (at least the latest message), moved so a
+    tool call and its results are never split.
+    """
+    sizes = [message_tokens(m) for m in messages]
+    if sum(sizes) <= budget:
+        return 0
+    cut, kept = len(messages) - 1, sizes[-1]
+    while cut > 0 and kept + sizes[cut - 1] <= keep_recent:
+        cut -= 1
+        kept += sizes[cut]
+    return find_safe_cut(messages, cut)
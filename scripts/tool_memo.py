@@ -0,0 +1,144 @@
+"""
+# DineMate Tool Memo 🧾
+
+This module memoizes read-only tool results within a turn, so a tool the LLM calls
+again with the same arguments (e.g. `get_prices_for_items` across tool loops, or
+`get_full_menu` already fetched by the chatbot) is answered from memory instead of
+hitting the database again.
+
+- Keys are the tool name plus normalized arguments (case-folded strings, sorted lists).
+- Entries live for one turn (the latest user message) of one thread.
+- Any write tool (`save_order`, `modify_order`, `cancel_order`) clears the turn's memo,
+  and nothing from a batch of parallel calls containing a write is memoized, since its
+  reads may have run before the write.
+
+`MemoizedToolNode` wraps LangGraph's `ToolNode`: cached calls become `ToolMessage`s
+directly, the rest run through `ToolNode` as before.
+
+## Dependencies
+- `langgraph.prebuilt`: For the wrapped ToolNode 🛠️.
+- `cache`: For bounding the number of memoized turns ⏳.
+- `budget`: For the (thread, turn) scope 🧵.
+- `logger`: For logging 📜.
+"""
+
+import json, threading
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.prebuilt import ToolNode
+from scripts.budget import ledger_scope
+from scripts.cache import TTLCache
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+MEMOIZABLE_TOOLS = {"get_full_menu", "get_prices_for_items", "check_order_status", "get_order_details",
+                    "introduce_developer"}
+WRITE_TOOLS = {"save_order", "modify_order", "cancel_order"}
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().casefold()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        items = [_normalize(v) for v in value]
+        return sorted(set(items), key=str) if all(isinstance(i, (str, int, float)) for i in items) else items
+    return value
+
+def memo_key(name: str, args: Dict[str, Any]) -> Tuple[str, str]:
+    """Tool name plus normalized, order-independent arguments."""
+    return name, json.dumps(_normalize(args or {}), sort_keys=True, default=str)
+
+class ToolMemo:
+    """🧾 Per-turn memo of read-only tool outputs, with duplicate-call counters."""
+
+    def __init__(self, max_turns: int = 1024):
+        self._turns = TTLCache(max_turns)  # (thread id, turn id) -> {memo key: tool output}
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "duplicates_avoided": 0, "invalidations": 0}
+
+    def get(self, scope: Hashable, name: str, args: Dict[str, Any]) -> Optional[Any]:
+        with self._lock:
+            self.counters["calls"] += 1
+            output = (self._turns.get(scope) or {}).get(memo_key(name, args))
+            if output is not None:
+                self.counters["duplicates_avoided"] += 1
+            return output
+
+    def set(self, scope: Hashable, name: str, args: Dict[str, Any], output: Any) -> None:
+        if name not in MEMOIZABLE_TOOLS:
+            return
+        with self._lock:
+            entries = self._turns.get(scope)
+            if entries is None:
+                entries = {}
+                self._turns.set(scope, entries)
+            entries[memo_key(name, args)] = output
+
+    def invalidate(self, scope: Hashable) -> None:
+        with self._lock:
+            if self._turns.pop(scope) is not None:
+                self.counters["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, "turns": len(self._turns)}
+
+_memo: Optional[ToolMemo] = None
+_memo_lock = threading.Lock()
+
+def get_tool_memo() -> ToolMemo:
+    """Return the process-wide tool memo."""
+    global _memo
+    with _memo_lock:
+        if _memo is None:
+            _memo = ToolMemo()
+        return _memo
+
+async def memoized_tool_call(tool: Any, args: Dict[str, Any], scope: Hashable) -> Any:
+    """Invoke `tool` with `args` unless the same call already ran this turn."""
+    memo = get_tool_memo()
+    if tool.name in MEMOIZABLE_TOOLS:
+        output = memo.get(scope, tool.name, args)
+        if output is not None:
+            return output
+    output = await tool.ainvoke(args)
+    if tool.name in WRITE_TOOLS:
+        memo.invalidate(scope)
+    else:
+        memo.set(scope, tool.name, args, output)
+    return output
+
+class MemoizedToolNode:
+    """🛠️ `ToolNode` that answers repeated read-only calls of the current turn from the memo."""
+
+    def __init__(self, tools: Sequence[Any]):
+        self.tool_node = ToolNode(tools)
+
+    async def __call__(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        calls = state["messages"][-1].tool_calls
+        scope, memo = ledger_scope(state, config), get_tool_memo()
+        results: Dict[str, ToolMessage] = {}
+        pending = []
+        for call in calls:
+            output = memo.get(scope, call["name"], call["args"]) if call["name"] in MEMOIZABLE_TOOLS else None
+            if output is None:
+                pending.append(call)
+            else:
+                results[call["id"]] = ToolMessage(content=output, name=call["name"], tool_call_id=call["id"])
+        if pending:
+            executed = await self.tool_node.ainvoke({"messages": [AIMessage(content="", tool_calls=pending)]}, config)
+            by_id = {call["id"]: call for call in pending}
+            writes = any(call["name"] in WRITE_TOOLS for call in pending)
+            if writes:
+                memo.invalidate(scope)
+            for message in executed["messages"]:
+                results[message.tool_call_id] = message
+                call = by_id[message.tool_call_id]
+                if not writes and message.status != "error":
+                    memo.set(scope, call["name"], call["args"], message.content)
+        if len(pending) < len(calls):
+            logger.info({"memoized": len(calls) - len(pending), "executed": len(pending), "message": "🧾 Tool calls served from memo"})
+        return {"messages": [results[call["id"]] for call in calls]}
@@ -8,6 +8,7 @@ saving orders to the database.
 - `json`: For JSON handling.
 - `langchain_core.tools`: For tool decorator.
 - `db`: Custom module for database operations.
+- `metrics`: For per-tool latency and error metrics.
 - `logger`: Custom module for logging.
 """
 
@@ -15,6 +16,7 @@ import json
 from langchain_core.tools import tool
 from scripts.db import AsyncDatabase
 from scripts.logger import get_logger
+from scripts.metrics import instrument_tool
 from scripts.order_utils import coerce_order_payload, fetch_price_lookup, recompute_total_price
 
 logger = get_logger(__name__)
@@ -207,3 +209,12 @@ def introduce_developer() -> str:
         - GitHub: https://github.com/MuhammadUmerKhan?tab=repositories. 
         Anything else? 😊"""
     )
+
+# Tools exposed to the chatbot, in the order they are bound to the model
+ALL_TOOLS = [
+    get_full_menu, get_prices_for_items, save_order, check_order_status,
+    cancel_order, modify_order, get_order_details, introduce_developer
+]
+# Latency / error metrics per tool, wherever it is called from (ToolNode, router, chatbot prefetch)
+for _tool in ALL_TOOLS:
+    instrument_tool(_tool)
@@ -0,0 +1,279 @@
+"""
+# DineMate Tracing 🔭
+
+This module traces chatbot turns off the request path, replacing LangSmith's synchronous
+`@traceable` on hot functions:
+
+- Head-based sampling: whether a trace is recorded is decided once, when its root span
+  starts (`TRACE_SAMPLE_RATE`, with per-root overrides in `TRACE_SAMPLE_RATES`, e.g.
+  `turn=0.2,summarize_conversation=0.01`). Spans of an unsampled trace cost one check.
+- Finished spans go to a bounded queue drained by a background thread; when the queue
+  is full, spans are dropped (and counted), never waited on.
+- Exporters: `file` writes JSON lines to `TRACE_FILE_PATH` (works offline),
+  `langsmith` sends runs to `LANGSMITH_ENDPOINT`, `none` only counts.
+- `TRACING_ENABLED=false` (or `get_tracer().enabled = False` at runtime) turns every
+  span into a no-op.
+
+`traced(name)` decorates sync or async functions. The parent span is the one running in
+the same task, or the one passed in a LangGraph config under `TRACE_CONFIG_KEY`, so graph
+nodes join the turn's trace even though they run in their own tasks.
+
+## Dependencies
+- `contextvars`: For the span running in the current task 🧵.
+- `queue`: For the bounded export queue 📬.
+- `langsmith`: For the optional LangSmith exporter 🔭.
+- `logger`: For logging 📜.
+"""
+
+import functools, inspect, json, os, queue, random, threading, time, uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from scripts.config import (LANGSMITH_API_KEY, LANGSMITH_ENDPOINT, LANGSMITH_PROJECT, TRACE_EXPORTER, TRACE_FILE_PATH,
+                            TRACE_FLUSH_SECONDS, TRACE_QUEUE_SIZE, TRACE_SAMPLE_RATE, TRACE_SAMPLE_RATES, TRACING_ENABLED)
+from scripts.logger import get_logger
+
+logger = get_logger(__name__)
+
+TRACE_CONFIG_KEY = "__dinemate_span"  # "__" keys are never copied into checkpoint metadata
+
+class Span:
+    """🔭 One timed operation of a sampled trace."""
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "dotted_order", "started_at", "start",
+                 "attributes", "sampled")
+
+    def __init__(self, tracer: Optional["Tracer"], name: str, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None, sampled: bool = True):
+        self.tracer, self.name, self.sampled = tracer, name, sampled
+        if not sampled:
+            return
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+        self.span_id = str(uuid.uuid4())
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.parent_id = parent.span_id if parent else None
+        order = f"{self.started_at:%Y%m%dT%H%M%S%fZ}{self.span_id}"
+        self.dotted_order = f"{parent.dotted_order}.{order}" if parent else order
+        self.attributes = dict(attributes or {})
+
+    def set(self, **attributes: Any) -> None:
+        if self.sampled:
+            self.attributes.update(attributes)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.sampled:
+            self.tracer._finish(self, time.perf_counter() - self.start, error)
+
+NOT_SAMPLED = Span(None, "not_sampled", sampled=False)  # shared by every span of an unsampled trace
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("dinemate_span", default=None)
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """`"turn=0.2,summarize_conversation=0.01"` -> {"turn": 0.2, "summarize_conversation": 0.01}."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            logger.warning({"item": item, "message": "⚠️ Ignoring malformed trace sample rate"})
+    return rates
+
+class Tracer:
+    """🔭 Head-sampled spans, exported by a background thread through a bounded queue."""
+
+    def __init__(self, exporter: Optional[Callable[[List[Dict[str, Any]]], None]], enabled: bool = TRACING_ENABLED,
+                 sample_rate: float = TRACE_SAMPLE_RATE, sample_rates: Optional[Dict[str, float]] = None,
+                 queue_size: int = TRACE_QUEUE_SIZE, flush_seconds: float = TRACE_FLUSH_SECONDS,
+                 rng: Callable[[], float] = random.random):
+        self.exporter = exporter
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.sample_rates = sample_rates if sample_rates is not None else parse_sample_rates(TRACE_SAMPLE_RATES)
+        self.flush_seconds = flush_seconds
+        self._rng = rng
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Updated without a lock on purpose: spans must stay cheap, and a rare lost increment is harmless
+        self.counters = {"traces": 0, "sampled": 0, "spans": 0, "exported": 0, "dropped": 0, "export_errors": 0}
+
+    # ===== Spans ====
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        """Start a span under `parent` (default: the current task's span); a new trace if there is none."""
+        if not self.enabled:
+            return NOT_SAMPLED
+        parent = parent if parent is not None else _current_span.get()
+        if parent is None:  # root span: the sampling decision for the whole trace
+            self.counters["traces"] += 1
+            if self._rng() >= self.sample_rates.get(name, self.sample_rate):
+                return NOT_SAMPLED
+            self.counters["sampled"] += 1
+        elif not parent.sampled:
+            return NOT_SAMPLED
+        return Span(self, name, parent, attributes)
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Iterator[Span]:
+        """Run the `with` block as a span; spans started inside it (same task) are its children."""
+        span = self.start_span(name, parent, **attributes)
+        if not self.enabled:
+            yield span
+            return
+        token = _current_span.set(span)  # also for unsampled spans, so nested spans are not sampled again
+        try:
+            yield span
+        except BaseException as e:
+            span.end(e)
+            raise
+        else:
+            span.end()
+        finally:
+            _current_span.reset(token)
+
+    def _finish(self, span: Span, seconds: float, error: Optional[BaseException]) -> None:
+        record = {"trace_id": span.trace_id, "span_id": span.span_id, "parent_id": span.parent_id,
+                  "dotted_order": span.dotted_order, "name": span.name, "start": span.started_at.isoformat(),
+                  "duration_ms": round(seconds * 1000, 3), "error": repr(error) if error else None,
+                  "attributes": span.attributes}
+        try:
+            self._queue.put_nowait(record)
+            self.counters["spans"] += 1
+        except queue.Full:
+            self.counters["dropped"] += 1  # never block a request on tracing
+            return
+        if self._worker is None:
+            self._start_worker()
+
+    # ===== Export ====
+    def _start_worker(self) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._export_loop, name="dinemate-tracing", daemon=True)
+                self._worker.start()
+
+    def _export_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < 500 and (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                if self.exporter is not None:
+                    self.exporter(batch)
+                self.counters["exported"] += len(batch)
+            except Exception as e:
+                self.counters["export_errors"] += 1
+                logger.error({"error": str(e), "spans": len(batch), "message": "❌ Trace export failed"})
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued span has been handed to the exporter."""
+        self._queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "queued": self._queue.qsize(), "enabled": self.enabled}
+
+class FileTraceExporter:
+    """📄 Appends spans as JSON lines to a local file."""
+
+    def __init__(self, path: str = TRACE_FILE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def __call__(self, batch: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(record, default=str) + "\n" for record in batch)
+
+class LangSmithTraceExporter:
+    """🔭 Sends spans to LangSmith as runs, in one batch request per export."""
+
+    def __init__(self, project: str = LANGSMITH_PROJECT):
+        from langsmith import Client
+        self.project = project
+        self.client = Client(api_url=LANGSMITH_ENDPOINT, api_key=LANGSMITH_API_KEY.get_secret_value() or None,
+                             auto_batch_tracing=False)
+
+    def __call__(self, batch: List[Dict[str, Any]]) -> None:
+        runs = []
+        for record in batch:
+            start = datetime.fromisoformat(record["start"])
+            runs.append({
+                "id": record["span_id"], "trace_id": record["trace_id"], "parent_run_id": record["parent_id"],
+                "dotted_order": record["dotted_order"], "name": record["name"], "run_type": "chain",
+                "start_time": start, "end_time": datetime.fromtimestamp(start.timestamp() + record["duration_ms"] / 1000, timezone.utc),
+                "inputs": {}, "outputs": {}, "error": record["error"], "session_name": self.project,
+                "extra": {"metadata": record["attributes"]},
+            })
+        self.client.batch_ingest_runs(create=runs)
+
+def make_exporter(kind: str = TRACE_EXPORTER) -> Optional[Callable[[List[Dict[str, Any]]], None]]:
+    """Exporter for `TRACE_EXPORTER`: "file", "langsmith" or "none"."""
+    kind = kind.lower()
+    if kind == "file":
+        return FileTraceExporter()
+    if kind == "langsmith":
+        return LangSmithTraceExporter()
+    if kind != "none":
+        logger.warning({"exporter": kind, "message": "⚠️ Unknown trace exporter, spans are only counted"})
+    return None
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            try:
+                exporter = make_exporter() if TRACING_ENABLED else None
+            except Exception as e:
+                logger.error({"error": str(e), "message": "❌ Trace exporter unavailable, spans are only counted"})
+                exporter = None
+            _tracer = Tracer(exporter)
+        return _tracer
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator: run a sync or async function as a span (named after the function by default).
+
+    A `config` argument carrying a span under `TRACE_CONFIG_KEY` becomes the parent when
+    no span is running in the current task.
+    """
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or fn.__name__
+        params = list(inspect.signature(fn).parameters)
+        config_index = params.index("config") if "config" in params else None
+
+        def parent_of(args, kwargs) -> Optional[Span]:
+            if _current_span.get() is not None or config_index is None:
+                return None
+            config = kwargs.get("config", args[config_index] if len(args) > config_index else None)
+            return ((config or {}).get("configurable") or {}).get(TRACE_CONFIG_KEY)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                tracer = _tracer or get_tracer()
+                if not tracer.enabled:
+                    return await fn(*args, **kwargs)
+                with tracer.span(span_name, parent_of(args, kwargs)):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer or get_tracer()
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(span_name, parent_of(args, kwargs)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -1,12 +1,11 @@
 # Import required libraries
 
 from dotenv import load_dotenv
-from langsmith import traceable
 import streamlit as st
 from scripts.logger import get_logger
-from langchain_groq import ChatGroq
 from scripts.db import Database
-from scripts.config import GROQ_API_KEY, TEMPERATURE, LANGSMITH_PROJECT
+from scripts.llm_registry import get_llm_registry
+from scripts.config import GROQ_API_KEY
 
 load_dotenv()
 
@@ -80,26 +79,14 @@ def display_msg(msg, author):
     st.session_state.messages.append({"role": author, "content": msg})
     st.chat_message(author).write(msg)
 
-# Singleton LLM instance
-_llm_instance, _current_model = None, None
-
-@st.cache_resource(show_spinner=False)
-@traceable(run_type="llm", project_name=LANGSMITH_PROJECT)
 def configure_llm(model_name: str, force_reload: bool = False, streaming: bool = True):
-    global _llm_instance, _current_model
-    
-    if force_reload or _llm_instance is None or _current_model != model_name:
-        logger.info(f"🔄 (Re)configuring LLM → {model_name}")
-        _llm_instance = ChatGroq(
-            model_name=model_name,
-            temperature=TEMPERATURE,
-            groq_api_key=GROQ_API_KEY.get_secret_value(),
-            streaming=streaming
-            
-        )
-        _current_model = model_name
-    
-    return _llm_instance
+    """
+    Returns the shared chat client for `model_name` from the process-wide LLM registry.
+
+    Clients are kept per (model, streaming, temperature) and reuse pooled HTTP
+    connections, so switching between models no longer rebuilds them.
+    """
+    return get_llm_registry().get(model_name, streaming=streaming, force_reload=force_reload)
 
 def print_qa(cls, question, answer):
     """
@@ -0,0 +1,16 @@
+"""
+# DineMate Test Setup 🧪
+
+Settings are read from the environment when `scripts.config` is imported, so they are
+set here first: conversations go to a throwaway checkpoint store, no spans or metrics
+leave the process, and the LLM clients are fakes that never reach the Groq API.
+"""
+
+import os, tempfile
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["CHECKPOINT_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="dinemate-tests-"), "checkpoints.db")
+os.environ["CHECKPOINT_COMPACTION_SECONDS"] = "0"
+os.environ["TRACE_EXPORTER"] = "none"
+os.environ["METRICS_PORT"] = "0"
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
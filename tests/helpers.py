@@ -0,0 +1,20 @@
+import math
+from typing import Dict
+import pandas as pd
+
+def assert_payloads_equal(left: Dict[str, object], right: Dict[str, object], rtol: float = 1e-9) -> None:
+    """Fail if two dashboard aggregate payloads differ beyond float rounding."""
+    assert left.keys() == right.keys()
+    for key, value in left.items():
+        other = right[key]
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(
+                value.reset_index(drop=True), other.reset_index(drop=True), check_dtype=False, rtol=rtol
+            )
+        elif key == "spending":
+            assert_payloads_equal({"histogram": value["histogram"], "box": value["box"]},
+                                  {"histogram": other["histogram"], "box": other["box"]}, rtol)
+        else:
+            assert value.keys() == other.keys(), key
+            for stat, number in value.items():
+                assert math.isclose(number, other[stat], rel_tol=rtol), f"{key}.{stat}: {number} != {other[stat]}"
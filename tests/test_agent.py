@@ -0,0 +1,35 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from scripts.agent import SUMMARY_HEADER, SYSTEM_MESSAGE, build_chat_prompt, compile_agent, menu_digest
+from scripts.tools import ALL_TOOLS
+from scripts.utils import configure_llm
+
+def test_compile_agent_builds_once_per_model_and_tool_set():
+    agent = compile_agent("compile-test-model")  # a real ChatGroq client; binding sends no request
+    assert compile_agent("compile-test-model") is agent
+    assert compile_agent("compile-test-model", tools=ALL_TOOLS[:2]) is not agent
+    assert {t["function"]["name"] for t in agent.kwargs["tools"]} == {t.name for t in ALL_TOOLS}
+
+def test_compile_agent_rebinds_a_reloaded_client():
+    agent = compile_agent("reload-test-model")
+    configure_llm("reload-test-model", force_reload=True)
+    rebuilt = compile_agent("reload-test-model")
+    assert rebuilt is not agent
+    assert compile_agent("reload-test-model") is rebuilt
+
+def test_menu_digest_is_deterministic_and_versioned():
+    digest = menu_digest({"pepsi": 2.5, "burger": 8.0})
+    assert digest == menu_digest({"burger": 8.0, "pepsi": 2.5})  # independent of insertion order
+    assert digest.splitlines()[1:] == ["burger $8.00", "pepsi $2.50"]
+    assert menu_digest({"pepsi": 2.75, "burger": 8.0}) != digest
+
+def test_chat_prompt_keeps_its_prefix_stable_across_turns():
+    menu, first = {"burger": 8.0}, HumanMessage(content="hi")
+    prompt = build_chat_prompt({"messages": [first], "summary": "- likes burgers", "menu": menu})
+    assert [m.type for m in prompt] == ["system", "system", "system", "human"]
+    assert prompt[0] is SYSTEM_MESSAGE and prompt[1].content == menu_digest(menu)
+    assert prompt[2].content == f"{SUMMARY_HEADER}\n- likes burgers"
+    # The next turn only appends: the previous prompt is a prefix of the new one
+    later = build_chat_prompt({"messages": [first, AIMessage(content="hello"), HumanMessage(content="menu?")],
+                               "summary": "- likes burgers", "menu": dict(menu)})
+    assert [m.content for m in later[:len(prompt)]] == [m.content for m in prompt]
+    assert [m.type for m in build_chat_prompt({"messages": [first]})] == ["system", "human"]
@@ -0,0 +1,63 @@
+import math, random, sqlite3
+import pandas as pd, pytest
+from scripts.analytics import SpendingSummary, _attach_statement, aggregate_duckdb, aggregate_pandas, duckdb
+from scripts.benchmarks import make_orders_db
+from scripts.db import OrderFilter
+from tests.helpers import assert_payloads_equal
+
+def test_spending_quantiles_match_pandas():
+    rng = random.Random(1)
+    values = [round(rng.uniform(2, 80), 2) for _ in range(501)]
+    summary = SpendingSummary(bin_width=5).update(values)
+    series = pd.Series(values)
+    for q in (0.0, 0.25, 0.5, 0.75, 1.0):
+        assert math.isclose(summary.quantile(q), series.quantile(q))
+    box = summary.box_stats()
+    assert box["min"] == min(values) and box["max"] == max(values)
+    assert math.isclose(box["mean"], series.mean())
+    assert box["lowerfence"] >= box["q1"] - 1.5 * (box["q3"] - box["q1"])
+
+def test_spending_histogram_fills_empty_bins():
+    histogram = SpendingSummary(bin_width=5).update([1.0, 2.0, 17.5]).histogram()
+    assert histogram["bin_start"].tolist() == [0, 5, 10, 15]
+    assert histogram["count"].tolist() == [2, 0, 0, 1]
+
+def test_spending_remove_undoes_add():
+    summary = SpendingSummary(bin_width=5).update([4.0, 9.0, 12.0])
+    summary.add(30.0)
+    summary.remove(30.0)
+    summary.remove(99.0)  # never added: ignored
+    fresh = SpendingSummary(bin_width=5).update([4.0, 9.0, 12.0])
+    assert summary.box_stats() == fresh.box_stats()
+    assert summary.histogram().equals(fresh.histogram())
+
+@pytest.fixture(scope="module")
+def orders_db(tmp_path_factory):
+    path = tmp_path_factory.mktemp("owner's orders") / "orders.db"  # a quote in the path must not break ATTACH
+    make_orders_db(str(path), 3_000)
+    with sqlite3.connect(path) as conn:
+        menu = dict(conn.execute("SELECT name, price FROM menu").fetchall())
+    return str(path), menu
+
+@pytest.mark.parametrize("order_filter", [
+    OrderFilter(), OrderFilter(statuses=("Delivered", "Canceled")), OrderFilter(years=(2024,)),
+    OrderFilter(start_date="2024-03-01", end_date="2024-09-30"), OrderFilter(items=("Pepsi",)),
+])
+def test_duckdb_matches_pandas(orders_db, order_filter):
+    pytest.importorskip("duckdb")
+    path, menu = orders_db
+    expected = aggregate_pandas(order_filter, menu, db_path=path)
+    assert expected is not None
+    assert_payloads_equal(expected, aggregate_duckdb(order_filter, menu, db_path=path))
+
+def test_empty_filter_gives_no_payload(orders_db):
+    path, menu = orders_db
+    assert aggregate_pandas(OrderFilter(years=(1999,)), menu, db_path=path) is None
+    if duckdb is not None:
+        assert aggregate_duckdb(OrderFilter(years=(1999,)), menu, db_path=path) is None
+
+def test_attach_statement_quotes_path():
+    duckdb = pytest.importorskip("duckdb")
+    statement = _attach_statement("/data/owner's orders/dinemate.db")
+    assert len(duckdb.extract_statements(statement)) == 1
+    assert "'/data/owner''s orders/dinemate.db'" in statement
@@ -0,0 +1,100 @@
+import json, random, sqlite3
+import pytest
+from scripts.analytics import IncrementalOrderFrame, aggregate_frame
+from scripts.benchmarks import STATUSES, make_orders_db
+from scripts.db import Database, OrderFilter
+from tests.helpers import assert_payloads_equal
+
+FILTERS = [OrderFilter(), OrderFilter(statuses=("Delivered",)), OrderFilter(years=(2025,)),
+           OrderFilter(statuses=("Pending", "Canceled"), start_date="2024-01-01")]
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "orders.db")
+    make_orders_db(path, 400)
+    database = Database(path)
+    yield database
+    database.close_connection()
+
+def assert_matches_rebuild(frame: IncrementalOrderFrame, db: Database, menu) -> None:
+    rebuilt = db.fetch_order_data(order_filter=frame.order_filter)
+    expected = aggregate_frame(rebuilt, menu, frame.bin_width) if not rebuilt.empty else None
+    actual = frame.payload(menu)
+    if expected is None or actual is None:
+        assert expected is None and actual is None
+        return
+    assert_payloads_equal(expected, actual)
+    assert frame.frame()["id"].tolist() == sorted(rebuilt["id"].tolist())
+
+def mutate(db: Database, rng: random.Random) -> None:
+    conn = db.connection
+    max_id = conn.execute("SELECT MAX(id) FROM orders").fetchone()[0]
+    for _ in range(rng.randint(1, 8)):  # new orders
+        conn.execute(
+            "INSERT INTO orders (items, total_price, status, date, time) VALUES (?, ?, 'Pending', ?, ?)",
+            (json.dumps({"pepsi": rng.randint(1, 3)}), round(rng.uniform(2, 60), 2),
+             f"2025-{rng.randint(1, 12):02d}-10", "07:15:00 PM"),
+        )
+    for _ in range(rng.randint(0, 6)):  # status changes on old orders
+        conn.execute("UPDATE orders SET status = ? WHERE id = ?", (rng.choice(STATUSES), rng.randint(1, max_id)))
+    conn.execute(  # item edits on open orders
+        "UPDATE orders SET items = ?, total_price = total_price + 1 WHERE id IN "
+        "(SELECT id FROM orders WHERE status = 'Pending' ORDER BY id LIMIT 2)",
+        (json.dumps({"coca-cola": 2}),),
+    )
+    conn.execute("DELETE FROM orders WHERE id = ?", (rng.randint(1, max_id),))
+    conn.commit()
+
+@pytest.mark.parametrize("order_filter", FILTERS)
+def test_incremental_frame_matches_full_rebuild(db, order_filter):
+    rng, menu = random.Random(11), db.load_menu()
+    frame = IncrementalOrderFrame(order_filter)
+    frame.refresh(db)
+    assert_matches_rebuild(frame, db, menu)
+    for _ in range(15):
+        mutate(db, rng)
+        frame.refresh(db)
+        assert_matches_rebuild(frame, db, menu)
+
+def test_refresh_without_changes_touches_nothing(db):
+    frame = IncrementalOrderFrame(OrderFilter(statuses=("Delivered",)))
+    assert frame.refresh(db) > 0
+    assert frame.refresh(db) == 0
+
+def test_frame_empties_when_every_order_leaves_the_filter(db):
+    frame, menu = IncrementalOrderFrame(OrderFilter(statuses=("Ready",))), db.load_menu()
+    frame.refresh(db)
+    assert frame.payload(menu) is not None
+    db.connection.execute("UPDATE orders SET status = 'Delivered' WHERE status = 'Ready'")
+    db.connection.commit()
+    frame.refresh(db)
+    assert frame.payload(menu) is None
+    assert_matches_rebuild(frame, db, menu)
+
+def test_status_index_reads_the_covering_index(db):
+    db.ensure_order_indexes()
+    plan = " ".join(row[3] for row in db.connection.execute("EXPLAIN QUERY PLAN SELECT id, status FROM orders"))
+    assert "COVERING INDEX idx_orders_status" in plan
+    with sqlite3.connect(":memory:") as conn:  # without the index it is a plain table scan
+        conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY, status TEXT)")
+        assert "INDEX" not in conn.execute("EXPLAIN QUERY PLAN SELECT id, status FROM orders").fetchone()[3]
+
+def test_order_inserted_between_the_index_and_row_reads(db, monkeypatch):
+    frame, menu = IncrementalOrderFrame(OrderFilter()), db.load_menu()
+    frame.refresh(db)
+    read_index = db.fetch_order_status_index
+
+    def index_then_insert():
+        index = read_index()
+        db.connection.execute("INSERT INTO orders (items, total_price, status, date, time) "
+                              "VALUES ('{\"pepsi\": 1}', 2.49, 'Ready', '2025-06-01', '07:15:00 PM')")
+        db.connection.commit()
+        return index
+    monkeypatch.setattr(db, "fetch_order_status_index", index_then_insert)
+    frame.refresh(db)
+    monkeypatch.undo()
+    # The newcomer is not open, so only the status index can reveal this change
+    db.connection.execute("UPDATE orders SET status = 'Delivered' WHERE id = (SELECT MAX(id) FROM orders)")
+    db.connection.commit()
+    frame.refresh(db)
+    assert_matches_rebuild(frame, db, menu)
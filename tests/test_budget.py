@@ -0,0 +1,59 @@
+import asyncio, json
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from scripts.benchmarks import register_fake_models
+from scripts.budget import TokenLedger, apply_prompt_budget, get_token_ledger
+from scripts.graph import build_graph
+from scripts.tokens import count_message_tokens
+
+MENU_JSON = json.dumps({f"dish {i}": 5.0 + i for i in range(60)})
+
+def prompt_with_tool_turns(turns: int) -> list:
+    """Every earlier turn fetched the menu; the current turn fetched prices."""
+    prompt = [SystemMessage(content="You are DineMate."), SystemMessage(content="menu digest")]
+    for i in range(turns):
+        call = {"name": "get_full_menu" if i < turns - 1 else "get_prices_for_items", "args": {}, "id": f"call-{i}"}
+        prompt += [HumanMessage(content=f"question {i}"), AIMessage(content="", tool_calls=[call]),
+                   ToolMessage(content=MENU_JSON, tool_call_id=call["id"], name=call["name"]),
+                   AIMessage(content=f"answer {i}")]
+    return prompt
+
+def test_budget_trims_old_tool_outputs_only():
+    prompt = prompt_with_tool_turns(6)
+    trimmed, removed = apply_prompt_budget(prompt, 1_000)
+    assert removed == count_message_tokens(prompt) - count_message_tokens(trimmed) > 0
+    assert count_message_tokens(trimmed) <= 1_000
+    assert trimmed[-4:] == prompt[-4:]  # the current turn is untouched
+    assert trimmed[:2] == prompt[:2]  # so are the system messages
+    calls = {c["id"] for m in trimmed for c in (getattr(m, "tool_calls", None) or [])}
+    assert calls == {m.tool_call_id for m in trimmed if isinstance(m, ToolMessage)}  # every call keeps a result
+    assert len(trimmed) == len(prompt)
+
+def test_budget_trims_menu_dumps_before_other_tools():
+    prompt = prompt_with_tool_turns(3)
+    prompt[7] = ToolMessage(content=MENU_JSON, tool_call_id="call-1", name="check_order_status")
+    trimmed, _ = apply_prompt_budget(prompt, count_message_tokens(prompt) - 10)
+    assert trimmed[4].content == "[get_full_menu output omitted]"
+    assert trimmed[7] is prompt[7]
+
+def test_budget_within_limit_or_disabled_is_a_no_op():
+    prompt = prompt_with_tool_turns(4)
+    assert apply_prompt_budget(prompt, count_message_tokens(prompt)) == (prompt, 0)
+    assert apply_prompt_budget(prompt, 0) == (prompt, 0)
+
+def test_ledger_sums_turns_per_thread():
+    ledger = TokenLedger(max_turns=2)
+    ledger.record("t", "turn-1", "chatbot", prompt=100, completion=20)
+    ledger.record("t", "turn-2", "chatbot", prompt=150, completion=30)
+    ledger.record("t", "turn-2", "guardrails", prompt=10)
+    assert ledger.turn("t") == {"chatbot": {"calls": 1, "prompt": 150, "completion": 30},
+                                "guardrails": {"calls": 1, "prompt": 10}}
+    assert ledger.thread("t")["chatbot"] == {"calls": 2, "prompt": 250, "completion": 50}
+    ledger.record("t", "turn-3", "chatbot", prompt=1)
+    assert ledger.turn("t", "turn-1") == {}  # only the newest `max_turns` are kept
+
+def test_graph_records_chatbot_tokens_per_turn():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    graph, config = build_graph(), {"configurable": {"thread_id": "budget-ledger"}}
+    asyncio.run(graph.ainvoke({"messages": [{"role": "user", "content": "Do you have anything vegetarian?"}]}, config))
+    chatbot = get_token_ledger().turn("budget-ledger")["chatbot"]
+    assert chatbot["calls"] >= 1 and chatbot["prompt"] > 0 and chatbot["completion"] > 0
@@ -0,0 +1,82 @@
+import asyncio, os
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from scripts.benchmarks import register_fake_models
+from scripts.checkpointer import SQLiteCheckpointer, _list_delta, apply_delta, diff_channels
+from scripts.graph import build_graph
+from tests.test_checkpointer import conversation, save
+
+@pytest.mark.parametrize("old, new, expected", [
+    ([1, 2, 3], [1, 2, 3, 4], (0, [4])),  # append
+    ([1, 2, 3], [2, 3, 4, 5], (1, [4, 5])),  # pruned from the front, then appended
+    ([1, 2, 3], [3], (2, [])),
+    ([1, 2, 3], [], (3, [])),
+    ([], [1, 2], (0, [1, 2])),
+    ([1, 2, 3], [7, 8], (3, [7, 8])),  # nothing kept
+    ([1, 1, 1], [1, 1, 1, 1], (0, [1])),  # repeated values: the longest overlap
+    ([1, 2, 3], [2, 9, 3], None),  # edited in the middle: stored in full
+])
+def test_list_delta(old, new, expected):
+    assert _list_delta(old, new) == expected
+    if expected is not None:
+        drop, appended = expected
+        assert old[drop:] + appended == new
+
+def test_list_delta_matches_messages_by_identity_or_id():
+    old = [HumanMessage(content=f"q{i}", id=f"h{i}") for i in range(20_000)]
+    assert _list_delta(old, old[1:] + [AIMessage(content="a", id="a")]) == (1, [AIMessage(content="a", id="a")])
+
+def test_diff_and_apply_round_trip():
+    base = {"messages": conversation(3), "summary": "", "menu": {"pepsi": 2.5}, "guardrail_status": "safe"}
+    values = {"messages": conversation(4)[2:], "summary": "- q0", "menu": {"pepsi": 2.5}}
+    delta = diff_channels(base, values, ["messages", "summary"])
+    assert delta["extend"] == {"messages": [2, conversation(4)[6:]]}
+    assert delta["set"] == {"summary": "- q0"} and delta["unset"] == ["guardrail_status"]
+    assert apply_delta(base, delta) == values
+    assert base["messages"] == conversation(3)  # the base is not modified
+
+def test_unchanged_channels_are_not_stored():
+    base = {"messages": conversation(1), "menu": {"pepsi": 2.5}}
+    assert diff_channels(base, dict(base), []) == {"set": {}, "extend": {}, "unset": []}
+    replaced = diff_channels(base, {**base, "menu": {"fanta": 3.0}}, ["menu"])
+    assert replaced["set"] == {"menu": {"fanta": 3.0}}
+
+def stored_deltas(saver, thread_id: str) -> list:
+    return [row[0] is not None for row in saver.conn.execute(
+        "SELECT delta FROM checkpoints WHERE thread_id = ? ORDER BY checkpoint_id", (thread_id,))]
+
+def test_snapshot_every_n_steps_and_when_the_parent_is_unknown(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "c.db"), max_per_thread=100, compaction_seconds=0, snapshot_every=3)
+    config = {"configurable": {"thread_id": "t"}}
+    for step in range(7):
+        config = save(saver, config, {"messages": conversation(step + 1)})
+    assert stored_deltas(saver, "t") == [False, True, True, False, True, True, False]
+    # The parent was evicted (or never stored): the full state is written
+    orphan = {"configurable": {"thread_id": "t2", "checkpoint_id": "missing"}}
+    latest = save(saver, orphan, {"messages": conversation(2)})
+    assert stored_deltas(saver, "t2") == [False]
+    saver._recent.clear()
+    assert saver.get_tuple(latest).checkpoint["channel_values"] == {"messages": conversation(2)}
+    saver.close()
+
+def test_delta_checkpoints_match_full_snapshots(tmp_path):
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    config, history = {"configurable": {"thread_id": "deltas"}}, {}
+    for name, snapshot_every in (("full", 1), ("delta", 5)):
+        store = SQLiteCheckpointer(os.path.join(tmp_path, f"{name}.db"), max_per_thread=10**6,
+                                   compaction_seconds=0, snapshot_every=snapshot_every)
+        graph = build_graph(checkpointer=store)
+
+        async def turns():
+            for i in range(6):
+                await graph.ainvoke({"messages": [{"role": "user", "content": f"Tell me something nice about dish {i}"}]}, config)
+        asyncio.run(turns())
+        store._recent.clear()  # cold read: replay from the nearest snapshot
+        history[name] = [(t.checkpoint["channel_values"], t.metadata.get("step")) for t in store.list(config)]
+        store.close()
+    # Message ids are random per run; compare everything else
+    dump = lambda values: {ch: [m.model_dump(exclude={"id"}) for m in v] if ch == "messages" else v
+                           for ch, v in values.items()}
+    assert len(history["full"]) == len(history["delta"]) > 6
+    for (full, full_step), (delta, delta_step) in zip(history["full"], history["delta"]):
+        assert dump(full) == dump(delta) and full_step == delta_step
@@ -0,0 +1,110 @@
+import asyncio, time
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from scripts.benchmarks import register_fake_models
+from scripts.checkpointer import SQLiteCheckpointer
+from scripts.graph import build_graph
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "checkpoints.db")
+
+@pytest.fixture
+def saver(db_path):
+    store = SQLiteCheckpointer(db_path, compaction_seconds=0)
+    yield store
+    store.close()
+
+def save(saver, config, values, metadata=None):
+    """Store a checkpoint holding `values` after the one in `config`; returns the new config."""
+    checkpoint = {**empty_checkpoint(), "channel_values": values,
+                  "channel_versions": {ch: saver.get_next_version(None, None) for ch in values}}
+    return saver.put(config, checkpoint, metadata or {"source": "loop", "step": 0}, dict(checkpoint["channel_versions"]))
+
+def conversation(turns: int) -> list:
+    return [m for i in range(turns) for m in (HumanMessage(content=f"q{i}", id=f"h{i}"), AIMessage(content=f"a{i}", id=f"a{i}"))]
+
+def test_put_get_round_trip(saver):
+    config = save(saver, {"configurable": {"thread_id": "t"}}, {"messages": conversation(1), "summary": ""})
+    latest = save(saver, config, {"messages": conversation(2), "summary": "- hi"}, {"source": "loop", "step": 1})
+    stored = saver.get_tuple({"configurable": {"thread_id": "t"}})
+    assert stored.config == latest
+    assert stored.checkpoint["channel_values"] == {"messages": conversation(2), "summary": "- hi"}
+    assert stored.metadata["step"] == 1
+    assert stored.parent_config["configurable"]["checkpoint_id"] == config["configurable"]["checkpoint_id"]
+    assert saver.get_tuple(config).checkpoint["channel_values"]["messages"] == conversation(1)
+    assert saver.get_tuple({"configurable": {"thread_id": "unknown"}}) is None
+
+def test_list_is_newest_first_with_filter_before_and_limit(saver):
+    configs, config = [], {"configurable": {"thread_id": "t"}}
+    for step in range(4):
+        config = save(saver, config, {"messages": conversation(step + 1)}, {"source": "loop", "step": step})
+        configs.append(config)
+    save(saver, {"configurable": {"thread_id": "other"}}, {"messages": []})
+    listed = list(saver.list({"configurable": {"thread_id": "t"}}))
+    assert [t.config for t in listed] == configs[::-1]
+    assert [t.metadata["step"] for t in saver.list({"configurable": {"thread_id": "t"}}, before=configs[2])] == [1, 0]
+    assert [t.metadata["step"] for t in saver.list({"configurable": {"thread_id": "t"}}, filter={"step": 2})] == [2]
+    assert len(list(saver.list({"configurable": {"thread_id": "t"}}, limit=2))) == 2
+    assert len(list(saver.list(None))) == 5
+
+def test_put_writes_round_trip(saver):
+    config = save(saver, {"configurable": {"thread_id": "t"}}, {"messages": conversation(1)})
+    saver.put_writes(config, [("messages", [HumanMessage(content="next", id="h9")]), ("summary", "s")], task_id="task-1")
+    saver.put_writes(config, [("messages", ["ignored"])], task_id="task-1")  # a regular write is stored once
+    pending = saver.get_tuple(config).pending_writes
+    assert pending == [("task-1", "messages", [HumanMessage(content="next", id="h9")]), ("task-1", "summary", "s")]
+
+def test_async_interface_matches_sync(saver):
+    async def run():
+        config = await saver.aput({"configurable": {"thread_id": "t"}},
+                                  {**empty_checkpoint(), "channel_values": {"summary": "x"}}, {"step": 0}, {})
+        await saver.aput_writes(config, [("summary", "y")], task_id="task")
+        return await saver.aget_tuple(config), [t async for t in saver.alist({"configurable": {"thread_id": "t"}})]
+    stored, listed = asyncio.run(run())
+    assert stored.checkpoint["channel_values"] == {"summary": "x"} and stored.pending_writes == [("task", "summary", "y")]
+    assert [t.config for t in listed] == [stored.config]
+
+def test_conversation_survives_restart(db_path):
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    config = {"configurable": {"thread_id": "restart"}}
+    store = SQLiteCheckpointer(db_path, compaction_seconds=0)
+
+    async def turns(graph, n):
+        for i in range(n):
+            await graph.ainvoke({"messages": [{"role": "user", "content": f"Tell me about dish {i}"}]}, config)
+        return (await graph.aget_state(config)).values["messages"]
+
+    before = asyncio.run(turns(build_graph(checkpointer=store), 3))
+    store.close()
+    reopened = SQLiteCheckpointer(db_path, compaction_seconds=0)
+    after = asyncio.run(build_graph(checkpointer=reopened).aget_state(config)).values["messages"]
+    assert [m.id for m in after] == [m.id for m in before] and after
+    assert len(asyncio.run(turns(build_graph(checkpointer=reopened), 1))) > len(before)  # and continues
+    reopened.close()
+
+def test_ttl_evicts_idle_threads_only(saver):
+    saver.ttl_seconds = 60
+    for thread_id in ("idle", "active"):
+        save(saver, {"configurable": {"thread_id": thread_id}}, {"messages": conversation(1)})
+    saver.conn.execute("UPDATE threads SET updated_at = ? WHERE thread_id = 'idle'", (time.time() - 3600,))
+    assert saver.compact() == {"evicted_threads": 1, "pruned_checkpoints": 0}
+    assert saver.get_tuple({"configurable": {"thread_id": "idle"}}) is None
+    assert saver.get_tuple({"configurable": {"thread_id": "active"}}) is not None
+    assert saver.compact(now=time.time() + 3600)["evicted_threads"] == 1
+    assert saver.stats()["checkpoints"] == saver.stats()["threads"] == 0
+
+def test_compaction_caps_history_per_thread(db_path):
+    saver = SQLiteCheckpointer(db_path, max_per_thread=3, compaction_seconds=0)
+    config = {"configurable": {"thread_id": "t"}}
+    for step in range(8):
+        config = save(saver, config, {"messages": conversation(step + 1)}, {"step": step})
+    saver.put_writes(config, [("summary", "s")], task_id="task")
+    assert saver.compact()["pruned_checkpoints"] == 5
+    saver._recent.clear()  # read from the store, not the latest-state cache
+    listed = list(saver.list({"configurable": {"thread_id": "t"}}))
+    assert [t.metadata["step"] for t in listed] == [7, 6, 5]
+    assert [t.checkpoint["channel_values"]["messages"] for t in listed] == [conversation(n) for n in (8, 7, 6)]
+    assert listed[0].pending_writes == [("task", "summary", "s")]
+    saver.close()
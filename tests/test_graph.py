@@ -0,0 +1,37 @@
+import asyncio, threading
+from scripts import graph as graph_module
+from scripts.benchmarks import register_fake_models
+from scripts.graph import get_graph
+from scripts.memory import SUMMARIZER_NODE
+
+def test_get_graph_builds_once_across_threads(monkeypatch):
+    builds = []
+    monkeypatch.setattr(graph_module, "_graph", None)
+    monkeypatch.setattr(graph_module, "build_graph", lambda: builds.append(object()) or builds[-1])
+    barrier, seen = threading.Barrier(8), []
+
+    def session():
+        barrier.wait()
+        seen.append(get_graph())
+    workers = [threading.Thread(target=session) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(builds) == 1 and all(g is builds[0] for g in seen)
+
+def test_shared_graph_keeps_sessions_apart():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    graph = get_graph()
+    assert get_graph() is graph
+    # Only written to through aupdate_state(as_node=...): registered, never on the turn path
+    assert SUMMARIZER_NODE in graph.nodes
+
+    async def turn(thread_id: str, message: str):
+        config = {"configurable": {"thread_id": thread_id}}
+        await graph.ainvoke({"messages": [{"role": "user", "content": message}]}, config)
+        return [m.content for m in (await graph.aget_state(config)).values["messages"] if m.type == "human"]
+
+    async def both():
+        return await asyncio.gather(turn("graph-a", "Hi from a"), turn("graph-b", "Hi from b"))
+    assert asyncio.run(both()) == [["Hi from a"], ["Hi from b"]]
@@ -0,0 +1,51 @@
+import asyncio, inspect, threading
+import pytest
+from langchain_core.messages import HumanMessage
+from scripts.benchmarks import INJECTION_MESSAGES, register_fake_models
+from scripts.guardrails import get_guardrail_stats, guardrail_node, is_trivially_safe
+
+MENU = {"Cheese Burger": 6.0, "Veggie Burger": 5.49, "Pepsi": 2.49}
+
+@pytest.mark.parametrize("message", ["yes", "No thanks", "2", "#162", "thanks!", "Status of order 162", "cancel 162"])
+def test_prefilter_passes_trivial_messages_without_a_menu(message):
+    assert is_trivially_safe(message)
+
+def test_prefilter_recognizes_carts_only_with_the_callers_menu():
+    assert not inspect.iscoroutinefunction(is_trivially_safe)  # no database round trip on the hot path
+    assert is_trivially_safe("2 cheese burgers and a pepsi", MENU)
+    assert not is_trivially_safe("2 cheese burgers and a pepsi")
+
+@pytest.mark.parametrize("message", INJECTION_MESSAGES + ["2 cheese burgers; drop table orders", "x" * 61])
+def test_prefilter_never_passes_instructions(message):
+    assert not is_trivially_safe(message, MENU)
+
+def test_repeated_message_uses_the_cached_verdict():
+    register_fake_models(guardrail_latency=0.0)
+    before = get_guardrail_stats()
+    state = {"messages": [HumanMessage(content="Can you book a table for 6 people on Friday?")]}
+    for _ in range(3):
+        assert asyncio.run(guardrail_node(state))["guardrail_status"] == "PASS"
+    after = get_guardrail_stats()
+    assert after["remote_calls"] - before["remote_calls"] == 1
+    assert after["cache_hits"] - before["cache_hits"] == 2
+
+def test_stats_stay_consistent_across_concurrent_sessions():
+    register_fake_models(guardrail_latency=0.0)
+    before = get_guardrail_stats()
+
+    def session(i: int):
+        async def turns():
+            for j in range(50):
+                text = ["yes", f"Is table {i} free at {j} pm tonight?", "Is the patio open in the evening?"][j % 3]
+                await guardrail_node({"messages": [HumanMessage(content=text)]})
+        asyncio.run(turns())
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    after = get_guardrail_stats()
+    delta = {k: after[k] - before[k] for k in ("messages", "prefilter_passes", "cache_hits", "remote_calls")}
+    assert delta["messages"] == 8 * 50
+    assert delta["messages"] == delta["prefilter_passes"] + delta["cache_hits"] + delta["remote_calls"]
@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from langchain_core.messages import HumanMessage
+from scripts.benchmarks import _fake_groq_server
+from scripts.llm_registry import LLMRegistry
+
+@pytest.fixture
+def groq():
+    server, stats = _fake_groq_server()
+    yield f"http://127.0.0.1:{server.server_port}", stats
+    server.shutdown()
+
+def test_one_client_per_key():
+    registry = LLMRegistry()
+    client = registry.get("model-a", streaming=True)
+    assert registry.get("model-a", streaming=True) is client
+    assert registry.get("model-a", streaming=False) is not client
+    assert registry.get("model-a", streaming=True, force_reload=True) is not client
+
+def test_models_share_pooled_connections(groq):
+    url, server_stats = groq
+    registry = LLMRegistry(base_url=url)
+    prompt = [HumanMessage(content="hi")]
+
+    async def turn():
+        for model, streaming in (("guard", False), ("chat", True), ("summary", True)):
+            await registry.get(model, streaming=streaming).ainvoke(prompt)
+
+    async def conversation():
+        for _ in range(5):
+            await turn()
+
+    asyncio.run(conversation())
+    assert server_stats["requests"] == 15
+    assert server_stats["connections"] == 1
+    stats = registry.stats()
+    assert sum(s["requests"] for s in stats.values()) == 15
+    assert sum(s["connections_opened"] for s in stats.values()) == 1
+
+def test_each_event_loop_gets_its_own_pool(groq):
+    url, server_stats = groq
+    registry = LLMRegistry(base_url=url)
+    for _ in range(3):  # pooled connections cannot move between loops
+        asyncio.run(registry.get("chat").ainvoke([HumanMessage(content="hi")]))
+    assert server_stats["connections"] == 3
@@ -0,0 +1,67 @@
+import asyncio, math
+import pytest
+from scripts.benchmarks import register_fake_models
+from scripts.config import HISTORY_TOKEN_BUDGET
+from scripts.graph import build_graph
+from scripts.memory import compact_thread, get_background_summarizer, thread_guard, thread_token_counts
+
+def question(i: int) -> str:
+    return f"Tell me about dish {i} " * 20
+
+async def conversation(thread_id: str, turns: int, background: bool = True):
+    """Run `turns` turns compacting after each (in the background) or before each (inline).
+
+    Returns the final state values and the history token counts seen after every turn.
+    """
+    graph, config = build_graph(), {"configurable": {"thread_id": thread_id}}
+    summarizer, history = get_background_summarizer(), []
+    for i in range(turns):
+        if not background:
+            await compact_thread(graph, config)
+        async with thread_guard(thread_id):
+            await graph.ainvoke({"messages": [{"role": "user", "content": question(i)}]}, config)
+        history.append(thread_token_counts((await graph.aget_state(config)).values)["history_tokens"])
+        if background:
+            summarizer.schedule(graph, config)
+            await asyncio.sleep(0.01)  # user think time; shorter than the summary call
+    summarizer.wait(thread_id, timeout=30)
+    return (await graph.aget_state(config)).values, history
+
+def test_background_summary_keeps_every_question():
+    register_fake_models(chat_latency=0.02, guardrail_latency=0.0, summary_latency=0.1)
+    compacted = get_background_summarizer().stats()["compacted"]
+    turns = 16
+    values, _ = asyncio.run(conversation("memory-questions", turns))
+    assert values.get("summary")
+    assert get_background_summarizer().stats()["compacted"] > compacted
+    # The newest questions are kept verbatim and in order, including those sent mid-compaction
+    asked = [m.content for m in values["messages"] if m.type == "human"]
+    assert 0 < len(asked) < turns
+    assert asked == [question(i) for i in range(turns - len(asked), turns)]
+
+def test_schedule_skips_a_thread_already_being_compacted():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0, summary_latency=0.2)
+    summarizer = get_background_summarizer()
+    graph, config = build_graph(), {"configurable": {"thread_id": "memory-inflight"}}
+
+    async def long_history():
+        for i in range(12):
+            await graph.ainvoke({"messages": [{"role": "user", "content": question(i)}]}, config)
+    asyncio.run(long_history())
+    skipped = summarizer.stats()["skipped_inflight"]
+    assert summarizer.schedule(graph, config)
+    assert not summarizer.schedule(graph, config)
+    assert summarizer.stats()["skipped_inflight"] == skipped + 1
+    summarizer.wait("memory-inflight", timeout=30)
+    assert summarizer.token_counts("memory-inflight") == thread_token_counts(asyncio.run(graph.aget_state(config)).values)
+
+@pytest.mark.parametrize("background", [False, True])
+def test_history_stays_within_the_token_budget(background):
+    chat_latency, summary_latency = 0.02, 0.1
+    register_fake_models(chat_latency=chat_latency, guardrail_latency=0.0, summary_latency=summary_latency)
+    values, history = asyncio.run(conversation(f"memory-budget-{background}", 30, background))
+    assert values.get("summary")
+    # Past the budget, history only grows by the turns that run while a summary is being written
+    overlap_turns = 1 + (math.ceil(summary_latency / chat_latency) + 1 if background else 0)
+    assert max(history) > HISTORY_TOKEN_BUDGET // 2
+    assert max(history) <= HISTORY_TOKEN_BUDGET + overlap_turns * history[0]
@@ -0,0 +1,118 @@
+import asyncio, json, socket, subprocess, sys, time, urllib.error, urllib.request
+import pytest
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.tools import tool
+from langgraph.errors import GraphInterrupt
+from scripts.benchmarks import make_orders_db, register_fake_models
+from scripts.config import DEFAULT_MODEL_NAME
+from scripts.db import AsyncDatabase
+from scripts.graph import build_graph
+from scripts.llm_registry import get_llm_registry
+from scripts.metrics import Histogram, MetricsRegistry, get_metrics, instrument_tool, start_metrics_server
+from scripts.streaming import stream_turn
+
+def count(name: str, **labels) -> int:
+    return sum(row["count"] for row in get_metrics().summary(name) if labels.items() <= row.items())
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0, 10.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 1] and histogram.count == 5 and histogram.sum == 16.5
+    assert histogram.quantile(0.5) == pytest.approx(1.75)
+    assert histogram.quantile(1.0) == 4.0  # in +Inf: the largest finite bound
+    assert Histogram((1.0,)).quantile(0.5) is None
+
+def test_timer_counts_failures_but_not_control_flow():
+    registry = MetricsRegistry()
+    for error in (ValueError("boom"), GraphInterrupt()):
+        with pytest.raises(type(error)):
+            with registry.timer("dinemate_node_seconds", "dinemate_node_errors_total", node="chatbot"):
+                raise error
+    [row] = registry.summary("dinemate_node_seconds", "dinemate_node_errors_total")
+    assert row["count"] == 2 and row["errors"] == 1
+
+def test_render_uses_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.observe("dinemate_node_seconds", 0.02, node='say "hi"')
+    registry.inc("dinemate_turn_errors_total")
+    body = registry.render()
+    assert "# TYPE dinemate_node_seconds histogram" in body
+    assert 'dinemate_node_seconds_bucket{node="say \\"hi\\"",le="0.025"} 1' in body
+    assert 'dinemate_node_seconds_bucket{node="say \\"hi\\"",le="+Inf"} 1' in body
+    assert "dinemate_turn_errors_total 1" in body
+
+def test_instrument_tool_is_idempotent():
+    @tool
+    def metered_lookup(order_id: str) -> dict:
+        """Look up an order."""
+        return {"status": "error"} if order_id == "0" else {"status": "ok"}
+
+    instrument_tool(instrument_tool(metered_lookup))
+    metered_lookup.invoke({"order_id": "7"})
+    metered_lookup.invoke({"order_id": "0"})
+    [row] = [r for r in get_metrics().summary("dinemate_tool_seconds", "dinemate_tool_errors_total")
+             if r["tool"] == "metered_lookup"]
+    assert row["count"] == 2 and row["errors"] == 1
+
+def test_database_layer_does_not_load_langgraph():
+    code = "import sys, scripts.db; print(any(m.startswith('langgraph') for m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+def test_async_queries_are_timed_but_connecting_is_not(tmp_path):
+    path = str(tmp_path / "orders.db")
+    make_orders_db(path, 10)
+    before = count("dinemate_db_query_seconds", query="load_menu")
+
+    async def load():
+        async with AsyncDatabase(path) as db:
+            return await db.load_menu()
+    assert asyncio.run(load())
+    assert count("dinemate_db_query_seconds", query="load_menu") == before + 1
+    assert count("dinemate_db_query_seconds", query="connect") == 0
+
+def test_turns_record_nodes_tools_and_time_to_first_token():
+    FakeChatModel = register_fake_models(chat_latency=0.01, guardrail_latency=0.0, token_delay=0.001)
+
+    class PriceCheckModel(FakeChatModel):
+        """Looks up prices once per "price" question, then answers in streamed words."""
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            if "price" in messages[-1].content.lower():
+                call = {"name": "get_prices_for_items", "args": {"items": ["Pepsi"]}, "id": f"call-{time.perf_counter_ns()}"}
+                yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}]))
+                return
+            async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+                yield chunk
+
+    get_llm_registry().register(DEFAULT_MODEL_NAME, PriceCheckModel(latency=0.01, token_delay=0.001, streaming=True))
+    graph, turns = build_graph(), ["What's the price of a Pepsi?", "Any vegetarian options?"]
+    before = {name: count(name) for name in ("dinemate_turn_seconds", "dinemate_time_to_first_token_seconds",
+                                              "dinemate_turn_tool_loops")}
+    nodes = {node: count("dinemate_node_seconds", node=node) for node in ("guardrails", "chatbot", "tools")}
+    tools = count("dinemate_tool_seconds", tool="get_prices_for_items")
+
+    async def conversation():
+        for question in turns:
+            async for _ in stream_turn(graph, question, "metrics-turns"):
+                pass
+    asyncio.run(conversation())
+    assert {name: count(name) - n for name, n in before.items()} == {name: len(turns) for name in before}
+    assert all(count("dinemate_node_seconds", node=node) > n for node, n in nodes.items())
+    assert count("dinemate_tool_seconds", tool="get_prices_for_items") == tools + 1
+
+def test_endpoint_serves_the_registry():
+    get_metrics().observe("dinemate_turn_seconds", 0.5)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = start_metrics_server("127.0.0.1", port)
+    base = f"http://127.0.0.1:{server.server_port}"
+    body = urllib.request.urlopen(f"{base}/metrics", timeout=5).read().decode()
+    assert "# TYPE dinemate_turn_seconds histogram" in body and "dinemate_turn_seconds_count" in body
+    with pytest.raises(urllib.error.HTTPError):
+        urllib.request.urlopen(f"{base}/other", timeout=5)
+    assert start_metrics_server("127.0.0.1", port) is server  # once per process
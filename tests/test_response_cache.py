@@ -0,0 +1,67 @@
+import asyncio
+from scripts.benchmarks import register_fake_models
+from scripts.graph import build_graph
+from scripts.response_cache import ResponseCache, get_response_cache, is_cacheable_query
+
+MENU = {"Cheese Burger": 6.0, "Veggie Burger": 5.49, "Pepsi": 2.49}
+
+def test_only_standalone_questions_are_cacheable():
+    assert is_cacheable_query("What's on the menu?")
+    assert is_cacheable_query("Is the veggie burger vegetarian?")
+    assert not is_cacheable_query("yes, confirm that")      # depends on the conversation
+    assert not is_cacheable_query("Status of order 162")     # order ids and quantities
+    assert not is_cacheable_query("menu")                    # too short to match reliably
+
+def test_near_duplicate_question_hits():
+    cache = ResponseCache(threshold=0.8)
+    cache.store("Is the veggie burger vegetarian?", MENU, "Yes! 🥗", cost_seconds=2.0)
+    entry, score = cache.lookup("is veggie burger vegetarian", MENU)
+    assert entry is not None and entry["answer"] == "Yes! 🥗" and score >= 0.8
+
+def test_question_about_other_items_misses():
+    cache = ResponseCache(threshold=0.5)
+    cache.store("Is the veggie burger vegetarian?", MENU, "Yes! 🥗", cost_seconds=2.0)
+    entry, _ = cache.lookup("Is the cheese burger vegetarian?", MENU)
+    assert entry is None
+
+def test_menu_change_clears_entries():
+    cache = ResponseCache()
+    cache.store("How much is a Pepsi?", MENU, "$2.49", cost_seconds=1.0)
+    entry, _ = cache.lookup("How much is a Pepsi?", {**MENU, "Pepsi": 2.99})
+    assert entry is None and cache.stats()["entries"] == 0
+
+def ask(graph, question: str, thread_id: str) -> str:
+    result = asyncio.run(graph.ainvoke({"messages": [{"role": "user", "content": question}]},
+                                       {"configurable": {"thread_id": thread_id}}))
+    return result["messages"][-1].content
+
+def test_repeated_faq_is_answered_from_the_cache():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0, faq_tools=True)
+    graph, cache = build_graph(response_cache=True), get_response_cache()
+    hits = cache.counters["hits"]
+    first = ask(graph, "Who built the DineMate assistant?", "cache-a")
+    second = ask(graph, "who built the dinemate assistant", "cache-b")
+    assert second == first and cache.counters["hits"] == hits + 1
+
+def test_customer_specific_questions_are_not_cacheable():
+    for question in ("what did I order", "What was I charged?", "how much was the total I paid",
+                     "Where are my burgers?", "what was ordered on our table"):
+        assert not is_cacheable_query(question), question
+
+def test_customer_questions_are_never_served_across_threads():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0, faq_tools=True)
+    graph, cache = build_graph(response_cache=True), get_response_cache()
+    ask(graph, "2 cheese burgers please", "cache-customer-a")
+    before = dict(cache.counters)
+    ask(graph, "what did I order", "cache-customer-a")
+    ask(graph, "what did I order", "cache-customer-b")
+    assert cache.counters["hits"] == before["hits"] and cache.counters["stores"] == before["stores"]
+    assert cache.counters["skipped"] == before["skipped"] + 2
+
+def test_answers_written_without_a_tool_are_not_stored():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0, faq_tools=True)
+    graph, cache = build_graph(response_cache=True), get_response_cache()
+    stores, hits = cache.counters["stores"], cache.counters["hits"]
+    ask(graph, "Do you deliver to the office park?", "cache-notool-a")
+    ask(graph, "do you deliver to the office park", "cache-notool-b")
+    assert cache.counters["stores"] == stores and cache.counters["hits"] == hits
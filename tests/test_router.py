@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from scripts.benchmarks import register_fake_models
+from scripts.graph import build_graph
+from scripts.router import ROUTER_SOURCE, awaiting_chatbot_reply, classify_message, order_table, router_stats
+
+MENU = {"Cheese Burger": 6.0, "Veggie Burger": 5.49, "Pepsi": 2.49}
+
+@pytest.mark.parametrize("message, intent", [
+    ("What's the status of order 162?", {"intent": "status", "order_id": 162}),
+    ("track my order #7", {"intent": "status", "order_id": 7}),
+    ("Order 12 status", {"intent": "status", "order_id": 12}),
+    ("cancel order 162", {"intent": "cancel", "order_id": 162}),
+    ("Hi, 2 cheese burgers and a pepsi please", {"intent": "order", "items": {"Cheese Burger": 2, "Pepsi": 1}}),
+])
+def test_simple_turns_are_classified(message, intent):
+    assert classify_message(message, MENU) == intent
+
+@pytest.mark.parametrize("message", [
+    "What do you recommend?", "2 pizzas please", "cancel the burger but keep the pepsi", "yes",
+])
+def test_anything_unsure_falls_through(message):
+    assert classify_message(message, MENU) is None
+
+def test_confirmation_needs_a_pending_action():
+    pending = {"intent": "cancel", "order_id": 5}
+    assert classify_message("Yes please", MENU, pending) == {"intent": "confirm"}
+    assert classify_message("no thanks", MENU, pending) == {"intent": "decline"}
+    assert classify_message("cancel order 9", MENU, pending) == {"intent": "cancel", "order_id": 9}
+
+def test_order_table_totals():
+    assert order_table({"Cheese Burger": 2, "Pepsi": 1}, MENU).endswith("**Total: $14.49**")
+
+def test_only_replies_to_a_chatbot_question_await_the_chatbot():
+    asked = AIMessage(content="Sure! What would you like to add to order 5?\n\nAnything else I can help with? 😊")
+    answered = AIMessage(content="📦 Order 5 is Preparing.\n\nAnything else I can help with? 😊")
+    confirm = AIMessage(content="| Cheese Burger | 2 |\n\nPlease confirm to place the order ✅")
+    routed = AIMessage(content="Reply **yes** to confirm?", response_metadata={"source": ROUTER_SOURCE})
+    user = HumanMessage(content="2 cheese burgers")
+    assert awaiting_chatbot_reply([HumanMessage(content="modify order 5"), asked, user])
+    assert awaiting_chatbot_reply([HumanMessage(content="burgers"), confirm, user])
+    assert not awaiting_chatbot_reply([HumanMessage(content="status of 5"), answered, user])
+    assert not awaiting_chatbot_reply([HumanMessage(content="cancel 5"), routed, user])
+    assert not awaiting_chatbot_reply([user])
+
+def test_reply_to_the_chatbot_mid_flow_is_not_a_new_order():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    graph = build_graph(router=True, response_cache=False)
+    config = {"configurable": {"thread_id": "router-mid-flow"}}
+    handled = sum(router_stats.handled.values())
+
+    async def turn(*messages):
+        return await graph.ainvoke({"messages": list(messages)}, config)
+    result = asyncio.run(turn(HumanMessage(content="I want to change my order 5"),
+                              AIMessage(content="Sure! What would you like to add or change?"),
+                              HumanMessage(content="2 cheese burgers")))
+    assert result["router_status"] == "FALLTHROUGH" and not result.get("pending_action")
+    result = asyncio.run(turn(HumanMessage(content="yes")))
+    assert result["router_status"] == "FALLTHROUGH"
+    assert result["messages"][-1].response_metadata.get("source") != ROUTER_SOURCE
+    assert sum(router_stats.handled.values()) == handled
+
+def test_fresh_order_after_an_answer_is_fast_pathed():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    graph = build_graph(router=True, response_cache=False)
+    result = asyncio.run(graph.ainvoke(
+        {"messages": [HumanMessage(content="Do you deliver?"),
+                      AIMessage(content="Yes, we deliver! 🚚 Anything else I can help with? 😊"),
+                      HumanMessage(content="2 cheese burgers")]},
+        {"configurable": {"thread_id": "router-fresh"}}))
+    assert result["router_status"] == "HANDLED"
+    assert result["pending_action"] == {"intent": "order", "items": {"Cheese Burger": 2}}
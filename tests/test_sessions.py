@@ -0,0 +1,65 @@
+import asyncio, time
+from scripts import memory
+from scripts.benchmarks import register_fake_models
+from scripts.checkpointer import get_checkpointer
+from scripts.graph import build_graph
+from scripts.sessions import THREAD_ID_KEY, SessionRegistry, end_session, session_thread_id
+from scripts.streaming import stream_turn
+
+async def customer(graph, name: str, thread_id: str, turns: int) -> None:
+    for t in range(turns):
+        async for _ in stream_turn(graph, f"{name} asks about dish {t}", thread_id):
+            pass
+
+async def crowd(graph, names, thread_ids, turns: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(customer(graph, name, tid, turns) for name, tid in zip(names, thread_ids)))
+    return time.perf_counter() - start
+
+def asked(graph, thread_id: str) -> list:
+    values = asyncio.run(graph.aget_state({"configurable": {"thread_id": thread_id}})).values
+    return [m.content for m in values["messages"] if m.type == "human"]
+
+def test_concurrent_sessions_only_see_their_own_turns():
+    register_fake_models(chat_latency=0.05, guardrail_latency=0.01)
+    graph, registry, turns = build_graph(), SessionRegistry(), 3
+    names = [f"isolated-{i}" for i in range(4)]
+    thread_ids = [registry.open(name) for name in names]
+    assert len(set(thread_ids)) == len(names)
+    asyncio.run(crowd(graph, names, thread_ids, turns))
+    memory.get_background_summarizer().wait(timeout=30)
+    for name, thread_id in zip(names, thread_ids):
+        assert asked(graph, thread_id) == [f"{name} asks about dish {t}" for t in range(turns)]
+
+def test_sessions_run_concurrently():
+    register_fake_models(chat_latency=0.2, guardrail_latency=0.0)
+    graph, registry, turns, n = build_graph(), SessionRegistry(), 2, 6
+    single = asyncio.run(crowd(graph, ["solo"], [registry.open("solo")], turns))
+    names = [f"concurrent-{i}" for i in range(n)]
+    elapsed = asyncio.run(crowd(graph, names, [registry.open(name) for name in names], turns))
+    assert elapsed < single * n / 3  # a shared thread would take about n times as long
+
+def test_idle_and_over_cap_threads_are_released():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    graph, registry = build_graph(), SessionRegistry(idle_seconds=60, max_live=2)
+    thread_ids = []
+    for i in range(3):  # each session's first turn opens its thread
+        thread_ids.append(registry.open(f"visitor-{i}"))
+        asyncio.run(customer(graph, f"visitor-{i}", thread_ids[-1], 1))
+        memory.get_background_summarizer().wait(timeout=30)
+    assert registry.stats()["released_cap"] == 1
+    registry.touch(thread_ids[-1], now=time.monotonic() + 3600)  # the others have been idle for an hour
+    assert registry.stats() == {"opened": 3, "ended": 0, "released_idle": 1, "released_cap": 1, "live": 1}
+    assert not set(thread_ids[:2]) & set(memory._thread_locks)
+    assert asked(graph, thread_ids[0]) == ["visitor-0 asks about dish 0"]  # released, not deleted
+
+def test_logout_deletes_the_thread():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    graph, session_state = build_graph(), {"username": "leaving"}
+    thread_id = session_thread_id(session_state)
+    assert thread_id.startswith("leaving:") and session_thread_id(session_state) == thread_id
+    asyncio.run(customer(graph, "leaving", thread_id, 1))
+    memory.get_background_summarizer().wait(timeout=30)
+    end_session(session_state)
+    assert THREAD_ID_KEY not in session_state
+    assert get_checkpointer().get_tuple({"configurable": {"thread_id": thread_id}}) is None
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, ToolMessage
+from scripts import state
+from scripts.benchmarks import register_fake_models
+from scripts.config import MAX_STATE_MESSAGES
+from scripts.graph import build_graph
+from scripts.state import SUPERSEDED_PREFIX, find_safe_cut, prune_messages
+
+def tool_turn(i: int, name: str = "get_full_menu", args: dict = None) -> list:
+    call = {"name": name, "args": args or {}, "id": f"call-{i}"}
+    return [HumanMessage(content=f"question {i}", id=f"h{i}"), AIMessage(content="", tool_calls=[call], id=f"c{i}"),
+            ToolMessage(content=f"result {i}", tool_call_id=f"call-{i}", name=name, id=f"t{i}"),
+            AIMessage(content=f"answer {i}", id=f"a{i}")]
+
+def test_removal_of_an_already_pruned_message_is_ignored(monkeypatch):
+    monkeypatch.setattr(state, "MAX_STATE_MESSAGES", 4)
+    history = prune_messages(tool_turn(0), tool_turn(1))
+    assert [m.id for m in history] == ["h1", "c1", "t1", "a1"]
+    # A summarizer computed its removals before the cap dropped h0: add_messages alone would raise
+    history = prune_messages(history, [RemoveMessage(id="h0"), RemoveMessage(id="h1")])
+    assert [m.id for m in history] == ["c1", "t1", "a1"]
+
+def test_superseded_tool_output_becomes_a_placeholder():
+    history = prune_messages(tool_turn(0), tool_turn(1))
+    old, new = history[2], history[6]
+    assert old.content.startswith(SUPERSEDED_PREFIX) and old.tool_call_id == "call-0" and old.id == "t0"
+    assert new.content == "result 1"
+    again = prune_messages(history, [HumanMessage(content="thanks", id="h2")])
+    assert again[2].content == old.content  # placeholders are not rewritten
+
+def test_tool_outputs_with_other_arguments_or_write_tools_are_kept():
+    history = prune_messages(tool_turn(0, "get_order_details", {"order_id": "7"}),
+                             tool_turn(1, "get_order_details", {"order_id": "8"}))
+    history = prune_messages(history, tool_turn(2, "cancel_order", {"order_id": "7"}) +
+                             tool_turn(3, "cancel_order", {"order_id": "7"}))
+    assert not any(str(m.content).startswith(SUPERSEDED_PREFIX) for m in history)
+
+def test_cap_never_starts_on_an_orphaned_tool_result(monkeypatch):
+    monkeypatch.setattr(state, "MAX_STATE_MESSAGES", 6)
+    history = prune_messages(tool_turn(0), tool_turn(1, "check_order_status", {"order_id": "3"}))
+    # The newest 6 would start at the tool result t0: its call c0 is kept too
+    assert [m.id for m in history] == ["c0", "t0", "a0", "h1", "c1", "t1", "a1"]
+    monkeypatch.setattr(state, "MAX_STATE_MESSAGES", 2)
+    assert [m.id for m in prune_messages(history, [])] == ["c1", "t1", "a1"]
+
+@pytest.mark.parametrize("index, expected", [(0, 0), (2, 1), (3, 3), (6, 5), (8, 8), (99, 8)])
+def test_find_safe_cut_keeps_calls_with_their_results(index, expected):
+    call = AIMessage(content="", tool_calls=[{"name": "a", "args": {}, "id": "x"}, {"name": "b", "args": {}, "id": "y"}])
+    messages = [HumanMessage(content="q"), AIMessage(content="", tool_calls=[{"name": "a", "args": {}, "id": "z"}]),
+                ToolMessage(content="r", tool_call_id="z"), AIMessage(content="ok"), HumanMessage(content="q2"),
+                call, ToolMessage(content="r1", tool_call_id="x"), ToolMessage(content="r2", tool_call_id="y")]
+    assert find_safe_cut(messages, index) == expected
+
+def test_checkpointed_state_stays_bounded():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    graph, config = build_graph(), {"configurable": {"thread_id": "state-bounded"}}
+    serde, sizes = graph.checkpointer.serde, []
+
+    async def conversation(turns: int):
+        for i in range(turns):
+            await graph.ainvoke({"messages": [{"role": "user", "content": f"Tell me something nice about dish {i}"}]}, config)
+            values = (await graph.aget_state(config)).values
+            sizes.append((len(values["messages"]), len(serde.dumps_typed(values)[1])))
+
+    turns = MAX_STATE_MESSAGES  # at least two messages per turn: the cap is reached halfway
+    asyncio.run(conversation(turns))
+    assert max(kept for kept, _ in sizes) == MAX_STATE_MESSAGES
+    at_cap = next(size for kept, size in sizes if kept == MAX_STATE_MESSAGES)
+    assert sizes[-1][1] <= at_cap * 1.2  # flat once the cap is reached
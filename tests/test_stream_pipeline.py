@@ -0,0 +1,49 @@
+import asyncio, random
+import pytest
+from scripts.stream_pipeline import (MarkdownTableBuffer, ThinkTagStripper, WhitespaceNormalizer, apply_stages,
+                                     default_stages)
+
+TABLE = "| Item | Qty |\n|------|-----|\n| Burger | 2 |\n| Coke | 1 |\n"
+ANSWER = f"Here is your order:\n\n\n\n{TABLE}\nTotal: $15 (that's < $20) <thinking> done."
+REPLY = f"<THINK>the customer wants <b> 2 burgers < 3 </thin total\n</think>\n\n{ANSWER}  \n"
+
+def feed_all(stage, parts) -> str:
+    return "".join(stage.feed(p) for p in parts) + stage.flush()
+
+def split(text: str, rng: random.Random, cuts: int) -> list:
+    points = sorted(rng.sample(range(1, len(text)), min(cuts, len(text) - 1)))
+    return [text[a:b] for a, b in zip([0] + points, points + [len(text)])]
+
+async def collect(parts, stages) -> list:
+    async def source():
+        for part in parts:
+            yield part
+    return [piece async for piece in apply_stages(source(), stages)]
+
+def test_think_blocks_are_removed_and_other_tags_kept():
+    assert feed_all(ThinkTagStripper(), [REPLY]) == f"\n{ANSWER}  \n"  # one newline after </think> is dropped
+    assert feed_all(ThinkTagStripper(), ["a <b>bold</b> < c <thin"]) == "a <b>bold</b> < c <thin"
+    assert feed_all(ThinkTagStripper(), ["<think>never closed"]) == ""
+
+@pytest.mark.parametrize("seed", range(20))
+def test_think_stripping_does_not_depend_on_chunking(seed):
+    rng, expected = random.Random(seed), feed_all(ThinkTagStripper(), [REPLY])
+    assert feed_all(ThinkTagStripper(), split(REPLY, rng, rng.randint(1, 60))) == expected
+    assert feed_all(ThinkTagStripper(), list(REPLY)) == expected
+
+def test_whitespace_is_trimmed_and_blank_lines_collapsed_across_chunks():
+    parts = ["  \n Hi", "\n\n", " \n", "\nthere  ", "\n", "again", "  \n\n"]
+    assert feed_all(WhitespaceNormalizer(), parts) == "Hi\n\nthere  \nagain"
+
+def test_tables_are_released_whole():
+    buffer = MarkdownTableBuffer()
+    out = [buffer.feed(p) for p in ["Order:\n", "| Item ", "| Qty |\n|---|---|\n", "| Burger | 2 |\n", "Total"]]
+    assert out == ["Order:\n", "", "", "", "| Item | Qty |\n|---|---|\n| Burger | 2 |\nTotal"]
+    assert feed_all(MarkdownTableBuffer(), ["x\n  | a |\n", "| b |"]) == "x\n  | a |\n| b |"  # flushed at the end
+
+@pytest.mark.parametrize("seed", range(5))
+def test_full_pipeline(seed):
+    pieces = asyncio.run(collect(split(REPLY, random.Random(seed), 80), default_stages()))
+    assert "".join(pieces) == ANSWER.replace("\n\n\n\n", "\n\n")
+    assert any(TABLE in piece for piece in pieces)
+    assert all(pieces)  # nothing empty reaches the UI
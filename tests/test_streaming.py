@@ -0,0 +1,95 @@
+import asyncio, random, threading
+import pytest
+from scripts.benchmarks import register_fake_models
+from scripts.event_loops import get_reply_loop
+from scripts.streaming import StreamHandler, render_stream, stream_graph_updates
+
+class Container:
+    def __init__(self):
+        self.renders = []
+
+    def markdown(self, text):
+        self.renders.append(text)
+
+def test_handler_batches_renders_and_ends_with_the_full_text():
+    rng = random.Random(4)
+    reply = [rng.choice(["Your", "order", "of", "2", "Cheese", "Burgers", "🍔", "\n"]) + " " for _ in range(2_000)]
+    container, clock = Container(), [0.0]
+    handler = StreamHandler(container, interval_ms=50, max_chars=10**6, clock=lambda: clock[0])
+    for token in reply:
+        clock[0] += 0.005  # one token every 5 ms
+        handler.on_llm_new_token(token)
+    assert handler.finish() == container.renders[-1] == "".join(reply)
+    assert len(container.renders) * 5 < len(reply)  # per-token rendering would render every token
+    assert handler.stats()["renders"] == len(container.renders)
+    assert handler.stats()["bytes_pushed"] == sum(len(text.encode("utf-8")) for text in container.renders)
+
+def test_first_token_renders_at_once_and_large_batches_early():
+    container, clock = Container(), [0.0]
+    handler = StreamHandler(container, interval_ms=1_000, max_chars=10, clock=lambda: clock[0])
+    handler.write("Hi")
+    handler.write(" there")
+    assert container.renders == ["Hi"]
+    handler.write(", friend")  # 14 characters pending
+    assert container.renders == ["Hi", "Hi there, friend"]
+
+def test_tick_renders_pending_text_of_a_stalled_stream():
+    container, clock = Container(), [0.0]
+    handler = StreamHandler(container, interval_ms=50, clock=lambda: clock[0])
+    handler.write("Let me check")
+    clock[0] += 0.01
+    handler.write(" your order")
+    handler.tick()
+    assert container.renders == ["Let me check"]  # not due yet
+    clock[0] += 0.05
+    handler.tick()
+    assert container.renders == ["Let me check", "Let me check your order"]
+    handler.tick()
+    assert len(container.renders) == 2  # nothing pending
+
+def test_render_stream_flushes_while_the_stream_stalls():
+    renders_before_last_chunk = []
+    container = Container()
+
+    async def stream():
+        yield "Let me check"
+        yield " your order"
+        await asyncio.sleep(0.3)  # e.g. a tool call
+        renders_before_last_chunk.extend(container.renders)
+        yield "... done."
+
+    assert render_stream(stream(), container, interval_ms=50) == "Let me check your order... done."
+    assert renders_before_last_chunk[-1] == "Let me check your order"
+
+def test_render_stream_runs_every_reply_on_one_long_lived_loop():
+    loops = []
+
+    async def stream():
+        loops.append((asyncio.get_running_loop(), threading.current_thread()))
+        yield "ok"
+
+    for _ in range(3):
+        assert render_stream(stream(), Container()) == "ok"
+    assert {loop for loop, _ in loops} == {get_reply_loop().loop}
+    assert {thread.name for _, thread in loops} == {"dinemate-replies"}  # not the summarizer's loop
+
+def test_render_stream_raises_stream_errors_and_closes_the_stream():
+    closed = []
+
+    async def stream():
+        try:
+            yield "partial"
+            raise ValueError("model failed")
+        finally:
+            closed.append(True)
+
+    with pytest.raises(ValueError, match="model failed"):
+        render_stream(stream(), Container())
+    assert closed == [True]
+
+def test_graph_reply_renders_through_the_shared_loop():
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0, token_delay=0.001)
+    container = Container()
+    reply = render_stream(stream_graph_updates("Tell me about the veggie burger", "render-graph"), container)
+    assert reply == "Here is what I know about: Tell me about the veggie burger. Anything else I can help with? 😊"
+    assert container.renders[-1] == reply
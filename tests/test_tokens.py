@@ -0,0 +1,32 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from scripts.tokens import compaction_cut, count_message_tokens, count_tokens, message_tokens
+
+def test_count_tokens_grows_with_text():
+    assert count_tokens("") == count_tokens(None) == 0
+    assert 0 < count_tokens("two cheese burgers") < count_tokens("two cheese burgers and a large pepsi please")
+
+def test_tool_call_arguments_are_counted():
+    plain = AIMessage(content="")
+    call = AIMessage(content="", tool_calls=[{"name": "get_order_details", "args": {"order_id": "7"}, "id": "c1"}])
+    assert message_tokens(call) > message_tokens(plain)
+    assert count_message_tokens([plain, call]) == message_tokens(plain) + message_tokens(call)
+
+def test_no_cut_while_the_history_fits():
+    history = [HumanMessage(content="hi"), AIMessage(content="hello")]
+    assert compaction_cut(history, budget=count_message_tokens(history)) == 0
+
+def test_cut_keeps_the_newest_messages_within_keep_recent():
+    history = [HumanMessage(content=f"question {i} " * 30) for i in range(10)]
+    per_message = message_tokens(history[0])
+    cut = compaction_cut(history, budget=100, keep_recent=3 * per_message)
+    assert cut == 7
+    assert compaction_cut(history, budget=100, keep_recent=1) == 9  # always keeps the latest message
+
+def test_cut_never_splits_a_tool_call_from_its_result():
+    # The recent window ends between the call and its (large) result: the call moves into the kept suffix
+    call = AIMessage(content="", tool_calls=[{"name": "get_order_details", "args": {"order_id": "7"}, "id": "c1"}])
+    result = ToolMessage(content="x " * 580, tool_call_id="c1")
+    history = [HumanMessage(content="word " * 400), AIMessage(content="ok " * 400), HumanMessage(content="details of 7"),
+               call, result, AIMessage(content="done")]
+    cut = compaction_cut(history, budget=100, keep_recent=message_tokens(result) + message_tokens(history[-1]))
+    assert history[cut] is call
@@ -0,0 +1,103 @@
+import asyncio, itertools
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+from scripts.benchmarks import register_fake_models
+from scripts.config import DEFAULT_MODEL_NAME
+from scripts.graph import build_graph
+from scripts.llm_registry import get_llm_registry
+from scripts.tool_memo import MemoizedToolNode, get_tool_memo, memo_key
+
+def test_memo_key_ignores_case_whitespace_and_order():
+    assert memo_key("get_prices_for_items", {"items": ["Cheese Burger", "Pepsi"]}) == \
+        memo_key("get_prices_for_items", {"items": ["pepsi ", "cheese burger"]})
+    assert memo_key("get_prices_for_items", {"items": ["Pepsi"]}) != memo_key("get_prices_for_items", {"items": ["Fanta"]})
+    assert memo_key("get_order_details", {"order_id": "7"}) != memo_key("check_order_status", {"order_id": "7"})
+
+def tools_only_graph(runs: dict):
+    def fake_tool(name):
+        def run(items: list = None) -> str:
+            runs[name] += 1
+            return f"{name} run {runs[name]}"
+        return StructuredTool.from_function(run, name=name, description=name)
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("tools", MemoizedToolNode([fake_tool(name) for name in runs]))
+    builder.add_edge(START, "tools")
+    builder.add_edge("tools", END)
+    return builder.compile(checkpointer=MemorySaver())
+
+async def tool_loop(graph, thread_id: str, turns):
+    """Each turn is a user message followed by one tool call per listed name."""
+    config, ids = {"configurable": {"thread_id": thread_id}}, itertools.count()
+    outputs = []
+    for turn in turns:
+        await graph.aupdate_state(config, {"messages": [HumanMessage(content="x")]})
+        for name in turn:
+            call = {"name": name, "args": {"items": ["a"]}, "id": f"{name}-{next(ids)}"}
+            result = await graph.ainvoke({"messages": [AIMessage(content="", tool_calls=[call])]}, config)
+            outputs.append(result["messages"][-1].content)
+    return outputs
+
+def test_repeated_read_runs_once_per_turn():
+    runs = {"get_prices_for_items": 0}
+    outputs = asyncio.run(tool_loop(tools_only_graph(runs), "memo-repeat", [["get_prices_for_items"] * 3,
+                                                                            ["get_prices_for_items"]]))
+    assert runs == {"get_prices_for_items": 2}  # a new user message starts a new memo
+    assert outputs == ["get_prices_for_items run 1"] * 3 + ["get_prices_for_items run 2"]
+
+def test_write_clears_the_turn_memo():
+    runs = {"get_prices_for_items": 0, "save_order": 0}
+    asyncio.run(tool_loop(tools_only_graph(runs), "memo-write",
+                          [["get_prices_for_items", "get_prices_for_items", "save_order", "get_prices_for_items"]]))
+    assert runs == {"get_prices_for_items": 2, "save_order": 1}
+
+def test_reads_batched_with_a_write_are_not_memoized():
+    runs = {"check_order_status": 0, "cancel_order": 0}
+    graph, config = tools_only_graph(runs), {"configurable": {"thread_id": "memo-batch"}}
+
+    async def turn():
+        await graph.aupdate_state(config, {"messages": [HumanMessage(content="cancel 7 and show its status")]})
+        batch = [{"name": "cancel_order", "args": {"items": ["a"]}, "id": "w"},
+                 {"name": "check_order_status", "args": {"items": ["a"]}, "id": "r1"}]
+        await graph.ainvoke({"messages": [AIMessage(content="", tool_calls=batch)]}, config)
+        again = {"name": "check_order_status", "args": {"items": ["a"]}, "id": "r2"}
+        return (await graph.ainvoke({"messages": [AIMessage(content="", tool_calls=[again])]}, config))["messages"][-1]
+    assert asyncio.run(turn()).content == "check_order_status run 2"  # read again after the write
+    assert runs == {"check_order_status": 2, "cancel_order": 1}
+
+def test_graph_executes_each_distinct_read_once_per_turn():
+    FakeChatModel = register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    # Menu fetch, then the same price lookup three times with different case/order, then answer
+    script = [("get_full_menu", {}), ("get_prices_for_items", {"items": ["Cheese Burger", "Pepsi"]}),
+              ("get_prices_for_items", {"items": ["pepsi", "cheese burger"]}),
+              ("get_prices_for_items", {"items": ["Pepsi ", "Cheese Burger"]})]
+    ids = itertools.count()
+
+    class ScriptedModel(FakeChatModel):
+        def _result(self, messages) -> ChatResult:
+            step = 0
+            for message in reversed(messages):
+                if message.type == "human":
+                    break
+                step += message.type == "tool"
+            if step < len(script):
+                name, args = script[step]
+                reply = AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call-{next(ids)}"}])
+            else:
+                reply = AIMessage(content="Here you go! Anything else I can help with? 😊")
+            return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    get_llm_registry().register(DEFAULT_MODEL_NAME, ScriptedModel())
+    graph, config, turns = build_graph(), {"configurable": {"thread_id": "memo-graph"}}, 3
+    avoided = get_tool_memo().stats()["duplicates_avoided"]
+
+    async def conversation():
+        for i in range(turns):
+            await graph.ainvoke({"messages": [{"role": "user", "content": f"Price check number {i}, please explain"}]}, config)
+    asyncio.run(conversation())
+    # Without the memo: the chatbot's menu prefetch plus every scripted tool call
+    executed = turns * (len(script) + 1) - (get_tool_memo().stats()["duplicates_avoided"] - avoided)
+    assert executed == turns * 2  # one menu fetch and one price lookup per turn
@@ -0,0 +1,149 @@
+import asyncio, os, subprocess, sys, threading, time
+import pytest
+from scripts import tracing
+from scripts.benchmarks import register_fake_models
+from scripts.graph import build_graph
+from scripts.streaming import stream_turn
+from scripts.tracing import NOT_SAMPLED, TRACE_CONFIG_KEY, Tracer, parse_sample_rates, traced
+
+class Collect:
+    """Exporter keeping every exported span in memory."""
+
+    def __init__(self):
+        self.spans = []
+
+    def __call__(self, batch):
+        self.spans.extend(batch)
+
+@pytest.fixture
+def use_tracer(monkeypatch):
+    """Install a tracer as the process-wide one for the test."""
+    def install(exporter=None, **kwargs) -> Tracer:
+        kwargs.setdefault("sample_rates", {})
+        tracer = Tracer(exporter, **{"enabled": True, "sample_rate": 1.0, "flush_seconds": 0.01, **kwargs})
+        monkeypatch.setattr(tracing, "_tracer", tracer)
+        return tracer
+    return install
+
+def test_nested_spans_share_the_trace(use_tracer):
+    exporter = Collect()
+    tracer = use_tracer(exporter)
+    with tracer.span("turn") as turn:
+        with tracer.span("chatbot", model="fake") as chatbot:
+            pass
+    tracer.flush()
+    assert [s["name"] for s in exporter.spans] == ["chatbot", "turn"]
+    child, root = exporter.spans
+    assert root["parent_id"] is None and root["trace_id"] == root["span_id"] == turn.span_id
+    assert child["parent_id"] == turn.span_id and child["trace_id"] == turn.trace_id
+    assert child["dotted_order"].startswith(root["dotted_order"] + ".")
+    assert child["attributes"] == {"model": "fake"} and chatbot.span_id == child["span_id"]
+
+def test_traced_joins_the_span_passed_in_the_config(use_tracer):
+    exporter = Collect()
+    tracer = use_tracer(exporter)
+
+    @traced("node")
+    async def node(state, config=None):
+        return state
+
+    turn = tracer.start_span("turn")
+    assert asyncio.run(node({}, config={"configurable": {TRACE_CONFIG_KEY: turn}})) == {}
+    asyncio.run(node({}))  # no parent: a trace of its own
+    turn.end()
+    tracer.flush()
+    joined, alone, root = exporter.spans
+    assert joined["parent_id"] == root["span_id"] and joined["trace_id"] == root["trace_id"]
+    assert alone["parent_id"] is None and alone["trace_id"] != root["trace_id"]
+
+def test_graph_nodes_are_children_of_their_turn(use_tracer):
+    register_fake_models(chat_latency=0.0, guardrail_latency=0.0)
+    exporter = Collect()
+    tracer = use_tracer(exporter)
+    graph = build_graph()
+
+    async def conversation():
+        for i in range(3):
+            async for _ in stream_turn(graph, f"What do you recommend for table {i}?", "tracing-parents"):
+                pass
+    asyncio.run(conversation())
+    tracer.flush()
+    by_id = {s["span_id"]: s for s in exporter.spans}
+    chatbot_spans = [s for s in exporter.spans if s["name"] == "chatbot"]
+    assert len(chatbot_spans) >= 3
+    for span in chatbot_spans:
+        parent = by_id[span["parent_id"]]
+        assert parent["name"] == "turn" and span["trace_id"] == parent["trace_id"]
+
+def test_sampling_is_decided_once_per_trace(use_tracer):
+    draws = iter([0.05, 0.5])
+    tracer = use_tracer(Collect(), sample_rate=0.1, rng=lambda: next(draws))
+    with tracer.span("turn") as sampled:
+        assert tracer.start_span("chatbot").sampled  # children never draw again
+    with tracer.span("turn") as dropped:
+        assert tracer.start_span("chatbot") is NOT_SAMPLED
+    assert sampled.sampled and dropped is NOT_SAMPLED
+    assert tracer.stats()["traces"] == 2 and tracer.stats()["sampled"] == 1
+
+def test_per_root_sample_rates_override_the_default(use_tracer):
+    tracer = use_tracer(Collect(), sample_rate=1.0, sample_rates={"summarize_conversation": 0.0})
+    assert tracer.start_span("summarize_conversation") is NOT_SAMPLED
+    assert tracer.start_span("turn").sampled
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("turn=0.2, summarize_conversation=0.01,,chatbot=7,bad=x") == \
+        {"turn": 0.2, "summarize_conversation": 0.01, "chatbot": 1.0}
+    assert parse_sample_rates("") == {}
+
+def test_a_stalled_exporter_drops_instead_of_blocking(use_tracer):
+    release = threading.Event()
+    tracer = use_tracer(lambda batch: release.wait(5), queue_size=50)
+    start = time.perf_counter()
+    for _ in range(2000):
+        with tracer.span("burst"):
+            pass
+    elapsed = time.perf_counter() - start
+    release.set()
+    tracer.flush()
+    stats = tracer.stats()
+    assert elapsed < 1.0
+    assert stats["dropped"] > 0 and stats["spans"] + stats["dropped"] == 2000
+    assert stats["exported"] == stats["spans"]
+
+def test_export_errors_are_counted(use_tracer):
+    def failing(batch):
+        raise RuntimeError("collector down")
+    tracer = use_tracer(failing)
+    with tracer.span("turn"):
+        pass
+    tracer.flush()
+    assert tracer.stats()["export_errors"] == 1 and tracer.stats()["exported"] == 0
+
+def test_kill_switch_turns_spans_into_no_ops(use_tracer):
+    exporter = Collect()
+    tracer = use_tracer(exporter, enabled=False)
+    calls = []
+
+    @traced("lookup")
+    def lookup(item):
+        calls.append(item)
+        return item.upper()
+
+    with tracer.span("turn") as span:
+        assert span is NOT_SAMPLED and lookup("pepsi") == "PEPSI"
+    assert calls == ["pepsi"]
+    assert tracer.stats()["traces"] == tracer.stats()["spans"] == 0
+    tracer.enabled = True  # switched back on at runtime
+    lookup("cola")
+    tracer.flush()
+    assert [s["name"] for s in exporter.spans] == ["lookup"]
+
+@pytest.mark.parametrize("configured, expected", [(None, "false"), ("true", "true")])
+def test_inline_langsmith_tracing_defaults_to_off(configured, expected):
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("LANGSMITH_TRACING", "LANGCHAIN_TRACING"))}
+    if configured is not None:
+        env["LANGSMITH_TRACING"] = configured
+    code = ("import os, scripts.config; from langsmith.utils import tracing_is_enabled; "
+            "print(os.environ['LANGSMITH_TRACING'], tracing_is_enabled())")
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout.split()
+    assert out == [expected, str(expected == "true")]